@@ -5,12 +5,17 @@
 import discord
 from discord.ext import commands
 import random
-import string
 import time
 from datetime import datetime, UTC
 
 from logger import bot_logger as logger
-from utils import normalize_url
+from utils import normalize_url, join_within_limit
+from moderation import BannedWordMatcher
+from message_router import MessageRouter
+from leaderboard_view import LeaderboardView
+from memory_report import cache_memory_report
+from db_executor import DatabaseBusy
+from outbox import notification
 import config
 
 class AdminCommands(commands.Cog):
@@ -21,6 +26,9 @@ class AdminCommands(commands.Cog):
 
     def __init__(self, bot):
         self.bot = bot
+        self.banned_words = BannedWordMatcher(config.banned_words)
+        self.message_router = MessageRouter()
+        self._register_message_stages()
 
     # =========================
     #   PREMIUM EMBED GENERATORS
@@ -89,37 +97,15 @@ class AdminCommands(commands.Cog):
             description="These are the top community members who are growing the server! 🚀",
             color=discord.Color.gold()
         )
-        # Load referral data from database
-        referral_data = await self.bot.load_all_json(self.bot, "referral_data")
-
-        # Tally referrals per referrer, skipping self-referral and bot as referrer
-        referral_counts = {}
-        for user_id, referrer_id in referral_data.items():
-            # Exclude self-referrals (if any)
-            if user_id == referrer_id:
-                continue
-            user_obj = self.bot.get_user(int(referrer_id))
-            if user_obj is None:
-                continue  # User not found (may have left the server)
-            if user_obj.bot:
-                continue  # Exclude bots
-            # Optionally check admin/mod roles
-            guild = self.bot.get_guild(config.SERVER_ID)
-            if guild:
-                member = guild.get_member(int(referrer_id))
-                if member:
-                    if any(role.id in [config.ADMIN_ROLE_ID, config.MOD_ROLE_ID] for role in member.roles):
-                        continue  # Exclude admin/mod
-            referral_counts[referrer_id] = referral_counts.get(referrer_id, 0) + 1
-
-        # Sort by number of referrals
-        sorted_referrals = sorted(referral_counts.items(), key=lambda item: item[1], reverse=True)
+        # Top referrers come straight from the referral count index, which already
+        # skips self-referrals and hides bots, admins, mods and members who left.
+        sorted_referrals = self.bot.referrals.counts.top(10)
         if not sorted_referrals:
             embed.description = "The referral leaderboard is currently empty."
             return embed
         medals = ["🥇", "🥈", "🥉"]
         leaderboard_lines = []
-        for rank, (user_id, count) in enumerate(sorted_referrals[:10], 1):
+        for rank, (user_id, count) in enumerate(sorted_referrals, 1):
             if count == 0:
                 continue
             user = self.bot.get_user(int(user_id))
@@ -141,32 +127,19 @@ class AdminCommands(commands.Cog):
         if not guild:
             logger.error(f"❌ Guild with ID {config.SERVER_ID} not found.")
             return discord.Embed(description="Server not found. Please check configuration.")
-        # Load points data from database
-        users_points = await self.bot.load_all_json(self.bot, "users_points")
-        eligible_users = {}
-        for member in guild.members:
-            # Exclude bots
-            if member.bot:
-                continue
-            # Exclude admins and mods from leaderboard
-            if any(role.id in [config.ADMIN_ROLE_ID, config.MOD_ROLE_ID] for role in member.roles):
-                continue
-            user_data = users_points.get(str(member.id))
-            if user_data and user_data.get('all_time_points', 0) > 0:
-                eligible_users[str(member.id)] = user_data
-        sorted_points = sorted(eligible_users.items(), key=lambda item: item[1].get('all_time_points', 0), reverse=True)
+        # The rank index already excludes bots, admins and mods
+        top_points = self.bot.points_rank.top(10)
         embed = discord.Embed(
             title="💰 Points Leaderboard",
             description="Here are the top members with the most points! 💎",
             color=discord.Color.green()
         )
-        if not sorted_points:
+        if not top_points:
             embed.description = "The points leaderboard is currently empty. Start earning points!"
             return embed
         medals = ["🥇", "🥈", "🥉"]
         leaderboard_lines = []
-        for rank, (user_id, points_data) in enumerate(sorted_points[:10], 1):
-            points = points_data.get('all_time_points', 0)
+        for rank, (user_id, points) in enumerate(top_points, 1):
             user = self.bot.get_user(int(user_id))
             user_name = user.display_name if user else f"User ID: {user_id}"
             medal = medals[rank - 1] if rank <= 3 else "🏅"
@@ -185,32 +158,19 @@ class AdminCommands(commands.Cog):
         if not guild:
             logger.error(f"❌ Guild with ID {config.SERVER_ID} not found.")
             return discord.Embed(description="Server not found. Please check configuration.")
-        # Load XP data from database
-        user_xp = await self.bot.load_all_json(self.bot, "user_xp")
-        eligible_users = {}
-        for member in guild.members:
-            # Exclude bots
-            if member.bot:
-                continue
-            # Exclude admins and mods from leaderboard
-            if any(role.id in [config.ADMIN_ROLE_ID, config.MOD_ROLE_ID] for role in member.roles):
-                continue
-            user_data = user_xp.get(str(member.id))
-            if user_data and user_data.get('xp', 0) > 0:
-                eligible_users[str(member.id)] = user_data
-        sorted_xp = sorted(eligible_users.items(), key=lambda item: item[1].get('xp', 0), reverse=True)
+        # The rank index already excludes bots, admins and mods
+        top_xp = self.bot.xp_rank.top(10)
         embed = discord.Embed(
             title="🔥 XP Leaderboard",
             description="These members have the most Mana XP! 🌟",
             color=discord.Color.blue()
         )
-        if not sorted_xp:
+        if not top_xp:
             embed.description = "The XP leaderboard is currently empty."
             return embed
         medals = ["🥇", "🥈", "🥉"]
         leaderboard_lines = []
-        for rank, (user_id, xp_data) in enumerate(sorted_xp[:10], 1):
-            xp = xp_data.get('xp', 0)
+        for rank, (user_id, xp) in enumerate(top_xp, 1):
             user = self.bot.get_user(int(user_id))
             user_name = user.display_name if user else f"User ID: {user_id}"
             medal = medals[rank - 1] if rank <= 3 else "🏅"
@@ -220,46 +180,12 @@ class AdminCommands(commands.Cog):
         embed.timestamp = datetime.now(UTC)
         return embed
 
-    async def append_new_winner_to_history(self):
-        """
-        Moves winners from the temporary giveaway log to the permanent history log.
-        This function should be called after a new winner is added to the temporary log.
-        """
-        # ✅ STEP 1: Load the data from the database
-        temporary_winners = await self.bot.load_list_of_json("giveaway_logs")
-        all_time_winners = await self.bot.load_list_of_json("all_time_giveaway_logs")
-
-        if not temporary_winners:
-            logger.info("No new giveaway winners to append to history.")
-            return
-
-        # ✅ STEP 2: Append the new winners to the all-time log
-        all_time_winners.extend(temporary_winners)
-
-        # ✅ STEP 3: Implement the list size limit
-        if len(all_time_winners) > config.MAX_WINNERS_HISTORY:
-            entries_to_remove = len(all_time_winners) - config.MAX_WINNERS_HISTORY
-            del all_time_winners[:entries_to_remove]
-
-        # ✅ STEP 4: Clear the temporary log in memory
-        temporary_winners.clear()
-
-        logger.info("✅ New winners appended to the all-time log and temporary log cleared.")
-
-        # ✅ STEP 5: Save both lists back to the database (use updated lists!)
-        await self.bot.save_list_of_json("all_time_giveaway_logs", all_time_winners)
-        await self.bot.save_list_of_json("giveaway_logs", temporary_winners)
-
-        # 6. Call the helper function to update the history message
-        await self.bot.update_giveaway_winners_history_message()
-
     # === P O I N T S    H I S T O R Y    M E S S A G E ===
     async def update_points_history_message(self):
         """Periodically updates the point history message in a dedicated channel."""
 
         # ✅ STEP 1: Load the data from the database
         points_history = await self.bot.load_list_of_json("points_history")
-        bot_data = await self.bot.load_single_json("bot_data", "main", {})
 
         # 1. Access the channel ID from the bot object
         channel = self.bot.get_channel(config.POINTS_HISTORY_CHANNEL_ID)
@@ -292,13 +218,9 @@ class AdminCommands(commands.Cog):
             color=discord.Color.blue()
         )
 
-        # 3. Use the utility function to manage the message with the new embed
-        await self.bot.manage_periodic_message(
-            channel=channel,
-            bot_data=bot_data,  # Pass the loaded bot_data
-            message_id_key="history_message_id",
-            embed=history_embed
-        )
+        # 3. Use the live embed manager to update the message only if its content changed
+        await self.bot.live_embeds.publish(channel, "history_message_id", history_embed)
+        await self.bot.live_embeds.flush()
 
 #  === V E R I F I C A T I O N      M E C H A N I S M ===
     @commands.Cog.listener()
@@ -388,20 +310,14 @@ class AdminCommands(commands.Cog):
         """
         await ctx.message.delete()
 
-        # ✅ STEP 1: Load both datasets asynchronously from the database
-        users_points = await self.bot.load_all_json("user_points")
-        referral_data = await self.bot.load_all_json("referral_data")
-
-        # 1. Pre-process referral data for efficient lookup
-        referral_counts = {}
-        for user_id in referral_data.values():
-            referral_counts[user_id] = referral_counts.get(user_id, 0) + 1
+        # 1. Points are kept current in memory, and referral counts come from the referral index
+        users_points = self.bot.users_points
 
         # 2. Compile user data in a single list
         all_users_data = []
         for user_id, user_data in users_points.items():
             all_time_points = user_data.get("all_time_points", 0.0)
-            referral_count = referral_counts.get(user_id, 0)
+            referral_count = self.bot.referrals.count_of(user_id)
             all_users_data.append({
                 "id": user_id,
                 "points": all_time_points,
@@ -436,6 +352,244 @@ class AdminCommands(commands.Cog):
         embed.timestamp = datetime.now(UTC)
         await ctx.send(embed=embed)
 
+    @commands.command(name="slowqueries",
+                      help="(Admin Only) Shows recently captured slow database queries with their EXPLAIN plans.")
+    @commands.has_any_role(config.ADMIN_ROLE_ID)
+    async def slowqueries(self, ctx, count: int | str = 5, action: str = None):
+        """
+        (Admin Only) Shows the most recent slow queries captured by the database layer.
+        Usage: !slowqueries [count] [clear]
+        """
+        if isinstance(count, str):
+            if count.lower() != "clear":
+                raise commands.BadArgument(f"Expected a number of queries or `clear`, got `{count}`.")
+            count, action = 5, count
+        await ctx.message.delete()
+
+        entries = self.bot.get_slow_queries(max(1, min(count, 10)))
+        if action and action.lower() == "clear":
+            self.bot.clear_slow_queries()
+
+        embed = discord.Embed(
+            title="🐢 Slow Query Log",
+            description="The most recent queries that took longer than the configured threshold.",
+            color=discord.Color.dark_orange()
+        )
+        if not entries:
+            embed.description = "No slow queries have been captured yet."
+
+        for entry in entries:
+            plan = entry["plan"] or "Plan not captured (recently explained or unavailable)."
+            batch = f" • batch of {entry['batch_size']}" if entry["batch_size"] else ""
+            value = (f"`{entry['statement'][:200]}`\n"
+                     f"**Params:** {', '.join(entry['params']) or 'none'}{batch}\n"
+                     f"```{plan[:700]}```")
+            embed.add_field(name=f"⏱️ {entry['duration_ms']:.1f} ms • {entry['timestamp'][:19]}",
+                            value=value[:1024], inline=False)
+
+        embed.set_footer(text="Use `!slowqueries <count> clear` to reset the log after reviewing.")
+        embed.timestamp = datetime.now(UTC)
+        await ctx.send(embed=embed, delete_after=300)
+
+    @commands.command(name="dbqueue", help="(Admin Only) Shows the database executor lanes and queue waits.")
+    @commands.has_any_role(config.ADMIN_ROLE_ID)
+    async def dbqueue(self, ctx):
+        """(Admin Only) Shows how deep each database lane is, how long calls waited and how many were rejected."""
+        await ctx.message.delete()
+
+        embed = discord.Embed(
+            title="🗄️ Database Queue",
+            description="Interactive calls run ahead of background jobs. Calls to a full lane are rejected.",
+            color=discord.Color.dark_teal()
+        )
+        for lane in self.bot.get_db_queue_stats():
+            embed.add_field(
+                name=lane['lane'].capitalize(),
+                value=(f"**Waiting:** {lane['depth']:,}/{lane['max_depth']:,} • **Calls:** {lane['submitted']:,} • "
+                       f"**Rejected:** {lane['rejected']:,}\n"
+                       f"**Avg wait:** {lane['avg_wait_ms']:.1f} ms • **Max wait:** {lane['max_wait_ms']:.1f} ms"),
+                inline=False
+            )
+        embed.timestamp = datetime.now(UTC)
+        await ctx.send(embed=embed, delete_after=120)
+
+    @commands.command(name="stages", help="(Admin Only) Shows timing statistics for the on_message pipeline stages.")
+    @commands.has_any_role(config.ADMIN_ROLE_ID)
+    async def stages(self, ctx):
+        """(Admin Only) Shows how often each on_message stage ran and how long it took."""
+        await ctx.message.delete()
+
+        embed = discord.Embed(
+            title="🧭 Message Pipeline Stages",
+            description="Stages run cheapest first, and only in the channels they apply to.",
+            color=discord.Color.dark_teal()
+        )
+        for stage in self.message_router.stats():
+            embed.add_field(
+                name=f"{stage['name']} (cost {stage['cost']})",
+                value=(f"**Calls:** {stage['calls']:,} • **Failures:** {stage['failures']:,}\n"
+                       f"**Avg:** {stage['avg_ms']:.2f} ms • **Max:** {stage['max_ms']:.2f} ms"),
+                inline=False
+            )
+        embed.timestamp = datetime.now(UTC)
+        await ctx.send(embed=embed, delete_after=120)
+
+    @commands.command(name="refreshes", help="(Admin Only) Shows how often each live board was refreshed.")
+    @commands.has_any_role(config.ADMIN_ROLE_ID)
+    async def refreshes(self, ctx):
+        """(Admin Only) Shows refresh requests, refreshes and coalesced requests for each live board."""
+        await ctx.message.delete()
+
+        embed = discord.Embed(
+            title="🔄 Live Board Refreshes",
+            description=(f"Boards refresh when their data changes, at most once every "
+                         f"{config.BOARD_REFRESH_MIN_INTERVAL_SECONDS}s. Changes during that time are coalesced."),
+            color=discord.Color.dark_teal()
+        )
+        for board in self.bot.refresh_scheduler.stats():
+            embed.add_field(
+                name=board['name'],
+                value=(f"**Requests:** {board['requests']:,} • **Refreshes:** {board['refreshes']:,}\n"
+                       f"**Coalesced:** {board['coalesced']:,} • **Failures:** {board['failures']:,}"),
+                inline=False
+            )
+        embed.timestamp = datetime.now(UTC)
+        await ctx.send(embed=embed, delete_after=120)
+
+    @commands.command(name="jobs", help="(Admin Only) Shows the background job schedule and run statistics.")
+    @commands.has_any_role(config.ADMIN_ROLE_ID)
+    async def jobs(self, ctx):
+        """(Admin Only) Shows when each background job runs next, how long it took and how often it failed."""
+        await ctx.message.delete()
+
+        embed = discord.Embed(
+            title="🗓️ Background Jobs",
+            description="Schedules survive restarts, and missed runs are caught up once.",
+            color=discord.Color.dark_teal()
+        )
+        for job in self.bot.scheduler.stats():
+            next_run = f"<t:{int(job['next_run'].timestamp())}:R>" if job['next_run'] else "Not scheduled"
+            last_ms = f"{job['last_duration_ms']:.0f} ms" if job['last_duration_ms'] is not None else "—"
+            value = (f"**Next:** {next_run} • **Runs:** {job['runs']:,} • **Failures:** {job['failures']:,}\n"
+                     f"**Last:** {last_ms} • **Max:** {job['max_duration_ms']:.0f} ms")
+            if job['last_error']:
+                value += f"\n**Last error:** `{job['last_error'][:200]}`"
+            embed.add_field(name=job['name'], value=value, inline=False)
+        embed.timestamp = datetime.now(UTC)
+        await ctx.send(embed=embed, delete_after=120)
+
+    @commands.command(name="logqueues", help="(Admin Only) Shows the outbound log channel queues.")
+    @commands.has_any_role(config.ADMIN_ROLE_ID)
+    async def logqueues(self, ctx):
+        """(Admin Only) Shows how many log entries each log channel queue has sent, dropped or still holds."""
+        await ctx.message.delete()
+
+        embed = discord.Embed(
+            title="📬 Log Channel Queues",
+            description="Log entries are batched up to 10 per message and sent in the background.",
+            color=discord.Color.dark_teal()
+        )
+        for queue in self.bot.log_pipeline.stats():
+            embed.add_field(
+                name=f"#{queue['channel_id']}",
+                value=(f"**Pending:** {queue['pending']:,} • **Messages:** {queue['sent_messages']:,} • "
+                       f"**Entries:** {queue['sent_embeds']:,}\n"
+                       f"**Dropped:** {queue['dropped']:,} • **Failures:** {queue['failures']:,}\n"
+                       f"**Via webhook:** {queue['webhook_sends']:,} • **Fallback:** {queue['fallback_sends']:,}"),
+                inline=False
+            )
+        if not embed.fields:
+            embed.description += "\nNo log entries have been queued yet."
+        outbox = self.bot.outbox.stats()
+        embed.add_field(
+            name="Notification Outbox",
+            value=(f"**Sent:** {outbox['sent']:,} • **Retried:** {outbox['retried']:,} • "
+                   f"**Undeliverable:** {outbox['parked']:,}"),
+            inline=False
+        )
+        audit = self.bot.command_audit.stats()
+        embed.add_field(
+            name="Command Audit",
+            value=(f"**Pending:** {audit['pending']:,} • **Recorded:** {audit['recorded']:,} • "
+                   f"**Processed:** {audit['processed']:,} • **Dropped:** {audit['dropped']:,}"),
+            inline=False
+        )
+        embed.timestamp = datetime.now(UTC)
+        await ctx.send(embed=embed, delete_after=120)
+
+    @commands.command(name="joins", help="(Admin Only) Shows join burst and invite tracking statistics.")
+    @commands.has_any_role(config.ADMIN_ROLE_ID)
+    async def joins(self, ctx):
+        """(Admin Only) Shows how joins were batched and how many invite fetches referral tracking needed."""
+        await ctx.message.delete()
+
+        queue = self.bot.join_queue.stats()
+        invites = self.bot.invite_tracker.stats()
+        embed = discord.Embed(
+            title="🚪 Member Joins",
+            description="🔴 Join burst mode is **active**." if queue['burst_active'] else "🟢 No join burst right now.",
+            color=discord.Color.dark_teal()
+        )
+        embed.add_field(
+            name="Join Queue",
+            value=(f"**Joins:** {queue['joins']:,} • **Batches:** {queue['batches']:,} • "
+                   f"**Largest batch:** {queue['largest_batch']:,}\n"
+                   f"**Referrals:** {queue['referrals']:,} • **Bursts:** {queue['bursts']:,}"),
+            inline=False
+        )
+        embed.add_field(
+            name="Invite Tracking",
+            value=(f"**Tracked invites:** {invites['tracked_invites']:,} • **Invite fetches:** {invites['fetches']:,}\n"
+                   f"**Attributed:** {invites['attributed']:,} • **Ambiguous:** {invites['ambiguous']:,}"),
+            inline=False
+        )
+        embed.timestamp = datetime.now(UTC)
+        await ctx.send(embed=embed, delete_after=120)
+
+    @commands.command(name="memory", help="(Admin Only) Shows how much memory each cache holds.")
+    @commands.has_any_role(config.ADMIN_ROLE_ID)
+    async def memory(self, ctx):
+        """(Admin Only) Shows the approximate size of the Discord caches and the bot's own caches."""
+        await ctx.message.delete()
+
+        report = cache_memory_report(self.bot)
+        total = sum(size for _, _, size in report)
+        embed = discord.Embed(
+            title="🧠 Cache Memory",
+            description=(f"About **{total / 1024 / 1024:.2f} MB** held in caches. "
+                         f"Lean member cache is **{'on' if config.LEAN_MEMBER_CACHE else 'off'}**."),
+            color=discord.Color.dark_teal()
+        )
+        for name, count, size in report:
+            embed.add_field(name=name, value=f"{count:,} entries • ~{size / 1024 / 1024:.2f} MB", inline=True)
+        embed.timestamp = datetime.now(UTC)
+        await ctx.send(embed=embed, delete_after=120)
+
+    @commands.command(name="shards", help="(Admin Only) Shows readiness and latency for each gateway shard.")
+    @commands.has_any_role(config.ADMIN_ROLE_ID)
+    async def shards(self, ctx):
+        """(Admin Only) Shows each gateway shard's readiness, latency, guilds and reconnects."""
+        await ctx.message.delete()
+
+        embed = discord.Embed(
+            title="🛰️ Gateway Shards",
+            description=("Running as an **AutoShardedBot**." if config.AUTO_SHARDING
+                         else "Running on a single gateway connection."),
+            color=discord.Color.dark_teal()
+        )
+        for shard in self.bot.shard_tracker.stats():
+            status = "🟢 Ready" if shard['ready'] else ("🟡 Connecting" if shard['connected'] else "🔴 Down")
+            latency = f"{shard['latency_ms']:.0f} ms" if shard['latency_ms'] is not None else "n/a"
+            embed.add_field(
+                name=f"Shard {shard['shard_id']} — {status}",
+                value=(f"**Latency:** {latency} • **Guilds:** {shard['guilds']:,}\n"
+                       f"**Connects:** {shard['connects']:,} • **Disconnects:** {shard['disconnects']:,} • "
+                       f"**Resumes:** {shard['resumes']:,}"),
+                inline=False
+            )
+        embed.timestamp = datetime.now(UTC)
+        await ctx.send(embed=embed, delete_after=120)
+
 #==============================================
     #MANUALLY ADDPOINTS BY ADMIN ONLY
 #==============================================
@@ -457,42 +611,24 @@ class AdminCommands(commands.Cog):
                            delete_after=10)
             return
 
-        # Load data from DB
-        admin_points = await self.bot.load_single_json(self.bot, "admin_points", "main", {})
-        users_points = await self.bot.load_all_json(self.bot, "users_points")
-        giveaway_winners_log = await self.bot.load_list_of_json(self.bot, "giveaway_logs")
-        all_time_giveaway_winners_log = await self.bot.load_list_of_json(self.bot, "all_time_giveaway_logs")
+        # A member mentioned twice is only credited once, so count the deduplicated awards
+        members = list({member.id: member for member in members}.values())
+        awards = {member.id: points_to_add for member in members}
+        total_points = sum(awards.values())
 
-        total_points = points_to_add * len(members)
-        if admin_points.get("balance", 0) < total_points:
+        # Validate the admin balance, credit everyone and log the transactions in one go
+        result = await self.bot.award_points(awards, purpose, giveaway=True)
+        if result["status"] == "insufficient":
             await ctx.send("❌ Admin balance too low.", delete_after=10)
             return
-
-        winners_list = []
-        for member in members:
-            user_id = str(member.id)
-            users_points.setdefault(user_id, {"all_time_points": 0.0, "available_points": 0.0})
-            users_points[user_id]["all_time_points"] += points_to_add
-            users_points[user_id]["available_points"] += points_to_add
-            await self.bot.log_points_transaction(user_id, points_to_add, purpose)
-            winner_entry = {"user_id": user_id, "points": points_to_add, "purpose": purpose,
-                            "timestamp": datetime.now(UTC).isoformat()}
-            giveaway_winners_log.append(winner_entry)
-            all_time_giveaway_winners_log.append(winner_entry)
-            winners_list.append(member.mention)
-
-        admin_points["balance"] -= total_points
-        admin_points["in_circulation"] += total_points
-
-        # Save data back to DB
-        await self.bot.save_all_json(self.bot, "users_points", users_points)
-        await self.bot.save_single_json(self.bot, "admin_points", "main", admin_points)
-        await self.bot.save_list_of_json(self.bot, "giveaway_logs", giveaway_winners_log)
-        await self.bot.save_list_of_json(self.bot, "all_time_giveaway_logs", all_time_giveaway_winners_log)
+        if result["status"] != "ok":
+            await ctx.send("❌ An error occurred while awarding points. Nothing was changed.", delete_after=10)
+            return
+        winners_list = [member.mention for member in members]
 
         embed = discord.Embed(title="🎉 Points Awarded!", description=f"The following user(s) have been awarded points:",
                               color=discord.Color.gold())
-        embed.add_field(name="User(s)", value=', '.join(winners_list), inline=False)
+        embed.add_field(name="User(s)", value=join_within_limit(winners_list, ", "), inline=False)
         embed.add_field(name="Points per User", value=f"**{points_to_add:.2f}**", inline=True)
         embed.add_field(name="Total Points Awarded", value=f"**{total_points:.2f}**", inline=True)
         embed.add_field(name="Purpose", value=purpose, inline=False)
@@ -552,51 +688,24 @@ class AdminCommands(commands.Cog):
             await ctx.send("❌ Error: Could not find any valid user and point pairs.", delete_after=20)
             return
 
-        # 3. Load admin_points and users_points from database (refactor: don't use self.bot.* as source of truth)
-        admin_points = await self.bot.load_single_json("admin_points", "main", {})
-        users_points = await self.bot.load_all_json("users_points")
-        giveaway_winners_log = await self.bot.load_list_of_json("giveaway_logs")
-        all_time_giveaway_winners_log = await self.bot.load_list_of_json("all_time_giveaway_logs")
-
-        # 4. Validate the transaction
+        # 3. Validate the admin balance, credit everyone and log the transactions in one go
         total_points = sum(points_to_award.values())
-        if admin_points.get("balance", 0) < total_points:
+        result = await self.bot.award_points({member.id: points for member, points in points_to_award.items()},
+                                             purpose, giveaway=True)
+        if result["status"] == "insufficient":
             await ctx.send(f"❌ Error: Admin balance is too low to award a total of {total_points:.2f} points.",
                            delete_after=20)
             return
+        if result["status"] != "ok":
+            await ctx.send("❌ An error occurred while awarding points. Nothing was changed.", delete_after=20)
+            return
+        winners_list = [f"{member.mention} ({points:.2f})" for member, points in points_to_award.items()]
 
-        # 5. Process the transaction in memory (using loaded data)
-        winners_list = []
-        for member, points in points_to_award.items():
-            user_id = str(member.id)
-
-            users_points.setdefault(user_id, {"all_time_points": 0.0, "available_points": 0.0})
-            users_points[user_id]["all_time_points"] += points
-            users_points[user_id]["available_points"] += points
-
-            await self.bot.log_points_transaction(user_id, points, purpose)
-
-            winner_entry = {"user_id": user_id, "points": points, "purpose": purpose,
-                            "timestamp": datetime.now(UTC).isoformat()}
-            giveaway_winners_log.append(winner_entry)
-            all_time_giveaway_winners_log.append(winner_entry)
-
-            winners_list.append(f"{member.mention} ({points:.2f})")
-
-        admin_points["balance"] -= total_points
-        admin_points["in_circulation"] += total_points
-
-        # 6. Save all updated tables
-        await self.bot.save_all_json("users_points", users_points)
-        await self.bot.save_single_json("admin_points", "main", admin_points)
-        await self.bot.save_list_of_json("giveaway_logs", giveaway_winners_log)
-        await self.bot.save_list_of_json("all_time_giveaway_logs", all_time_giveaway_winners_log)
-
-        # 7. Send a confirmation embed
+        # 4. Send a confirmation embed
         embed = discord.Embed(title="🎉 Points Awarded!",
                               description=f"The following user(s) have been awarded points:",
                               color=discord.Color.gold())
-        embed.add_field(name="Winners", value='\n'.join(winners_list), inline=False)
+        embed.add_field(name="Winners", value=join_within_limit(winners_list), inline=False)
         embed.add_field(name="Purpose", value=purpose, inline=False)
         embed.set_footer(text=f"Action by {ctx.author.name}")
         embed.timestamp = datetime.now(UTC)
@@ -608,61 +717,15 @@ class AdminCommands(commands.Cog):
     @commands.Cog.listener()
     async def on_member_join(self, member):
         """Event handler for member joins, primarily for referral tracking."""
-        if member.bot:
-            return
-
-        # ✅ STEP 1: Load data from the database. We no longer rely on self.bot.referred_users as the source of truth.
-        referred_users = set(await self.bot.load_list_values("referred_users", "user_id"))
-        pending_referrals = await self.bot.load_all_json("pending_referrals")
+        if member.guild.id == config.SERVER_ID:
+            self.bot.eligibility.update(member)
 
-        user_id = str(member.id)
-        if user_id in referred_users:
-            logger.info(f"User {member.name} has rejoined but has already been referred. Skipping referral check.")
+        if member.bot:
             return
 
-        guild = member.guild
-
-        # Get the invites AFTER the user joined
-        invites_after_join = await guild.invites()
-
-        # Get the invites BEFORE the user joined from the cache
-        invites_before_join = self.bot.invite_cache.get(guild.id, [])
-        referrer = None
-
-        # Use a more efficient dictionary-based lookup for comparison
-        invites_before_dict = {invite.code: invite.uses for invite in invites_before_join}
-
-        for invite_after in invites_after_join:
-            uses_before = invites_before_dict.get(invite_after.code, 0)
-            if invite_after.uses > uses_before:
-                referrer = invite_after.inviter
-                break
-
-        # Important: Update the cache for the next time someone joins
-        self.bot.invite_cache[guild.id] = invites_after_join
-
-        if referrer and referrer.id != self.bot.user.id:
-            pending_referrals[str(member.id)] = str(referrer.id)
-
-            logger.info(f"New pending referral for {member.name}. Referrer: {referrer.name}")
-
-            # ✅ STEP 2: Save the updated pending referrals list back to the database
-            await self.bot.save_all_json("pending_referrals", pending_referrals)
-
-            # ✅ FIX: Send the message to the referral channel instead of the user's DMs
-            channel = self.bot.get_channel(config.REFERRAL_CHANNEL_ID)
-            if channel:
-                try:
-                    embed = discord.Embed(
-                        title="✨ New Referral!",
-                        description=f"🎉 **{member.mention}** was just referred by {referrer.mention}!",
-                        color=discord.Color.gold()
-                    )
-                    embed.set_footer(text="Awaiting verification. They'll receive their points soon!")
-                    embed.timestamp = datetime.now(UTC)
-                    await channel.send(embed=embed)
-                except discord.Forbidden:
-                    logger.error(f"❌ Bot missing permissions to send message to referral channel.")
+        # Referral attribution, the pending-referral write and the announcement run on the join queue,
+        # which batches them during join bursts.
+        self.bot.join_queue.add(member)
 
     # === MEMBER UPDATE (REFERRAL) ===
     @commands.Cog.listener()
@@ -671,6 +734,9 @@ class AdminCommands(commands.Cog):
         Handles member updates, primarily for referral rewards and
         role-based actions.
         """
+        if after.guild.id == config.SERVER_ID and before.roles != after.roles:
+            self.bot.eligibility.update(after)
+
         if after.bot:
             return
 
@@ -685,11 +751,11 @@ class AdminCommands(commands.Cog):
         # ✅ STEP 1: Load all necessary data at the beginning of the function
         # This ensures that we have the most up-to-date information from the database
         # and a "transaction" can be completed safely.
-        pending_referrals = await self.bot.load_all_json("pending_referrals")
-        referred_users = set(await self.bot.load_list_values("referred_users", "user_id"))
-        admin_points = await self.bot.load_single_json("admin_points", "main", {})
-        users_points = await self.bot.load_all_json("users_points")
-        referral_data = await self.bot.load_all_json("referral_data")
+        pending_referrals = await self.bot.load_all_json(self.bot, "pending_referrals")
+        referred_users = set(await self.bot.load_list_values(self.bot, "referred_users", "user_id"))
+        admin_points = await self.bot.load_single_json(self.bot, "admin_points", "main", {})
+        users_points = await self.bot.load_all_json(self.bot, "users_points")
+        referral_data = await self.bot.load_all_json(self.bot, "referral_data")
 
         # --- Welcome Message Logic for Newly 'Tivated' Users ---
         if config.TIVATED_ROLE_ID in [role.id for role in new_roles]:
@@ -740,6 +806,9 @@ class AdminCommands(commands.Cog):
                 new_member_points = config.NEW_MEMBER_POINTS_PER_ROLE.get(role.id, 0.0)
 
                 referrer_member = after.guild.get_member(int(referrer_id))
+                # The referrer may have left the server since the join; the reward is still theirs.
+                referrer_name = referrer_member.display_name if referrer_member else f"user {referrer_id}"
+                referrer_mention = referrer_member.mention if referrer_member else f"<@{referrer_id}>"
                 if referrer_member and any(role.id == config.ADMIN_ROLE_ID for role in referrer_member.roles):
                     referrer_points = 0.0
 
@@ -763,40 +832,51 @@ class AdminCommands(commands.Cog):
                     users_points.setdefault(referrer_id, {"all_time_points": 0.0, "available_points": 0.0})
                     users_points[referrer_id]["all_time_points"] += referrer_points
                     users_points[referrer_id]["available_points"] += referrer_points
+                    self.bot.points_rank.set_score(user_id, users_points[user_id]["all_time_points"])
+                    self.bot.points_rank.set_score(referrer_id, users_points[referrer_id]["all_time_points"])
 
                     admin_points["balance"] -= total_points_to_award
                     admin_points["in_circulation"] += total_points_to_award
                     referral_data[user_id] = referrer_id
 
-                    await self.bot.save_all_json("users_points", users_points)
-                    await self.bot.save_single_json("admin_points", "main", admin_points)
-                    await self.bot.save_all_json("referral_data", referral_data)
+                    await self.bot.save_all_json(self.bot, "users_points", users_points)
+                    await self.bot.save_single_json(self.bot, "admin_points", "main", admin_points)
+                    await self.bot.save_all_json(self.bot, "referral_data", referral_data)
+                    # Keep the in-memory copies current, since they are written back on logout.
+                    self.bot.users_points[user_id] = users_points[user_id]
+                    self.bot.users_points[referrer_id] = users_points[referrer_id]
+                    self.bot.admin_points = admin_points
+                    self.bot.referral_data[user_id] = referrer_id
+                    self.bot.referrals.record(user_id, referrer_id)
+                    self.bot.refresh_scheduler.mark_dirty("referral_leaderboard")
 
                     # ✅ STEP 3: Now that data is saved, modify and save the other tables.
                     # We can now safely delete the user from pending and add it into referred.
                     del pending_referrals[user_id]
                     referred_users.add(user_id)
-                    await self.bot.save_all_json("pending_referrals", pending_referrals)
-                    await self.bot.save_list_values("referred_users", list(referred_users), "user_id")
+                    await self.bot.save_all_json(self.bot, "pending_referrals", pending_referrals)
+                    await self.bot.save_list_values(self.bot, "referred_users", list(referred_users), "user_id")
+                    self.bot.pending_referrals.pop(user_id, None)
+                    self.bot.referred_users.add(user_id)
 
                     # Log the transactions using the refactored helper function
                     if new_member_points > 0:
                         await self.bot.log_points_transaction(user_id, new_member_points,
-                                                              f"Joined via referral by {referrer_member.display_name}")
+                                                              f"Joined via referral by {referrer_name}")
                     if referrer_points > 0:
                         await self.bot.log_points_transaction(referrer_id, referrer_points,
                                                               f"Successful referral of {after.display_name}")
 
-                    logger.info(f"Successful referral awarded to {referrer_member.display_name}.")
+                    logger.info(f"Successful referral awarded to {referrer_name}.")
 
                     # Send the final successful referral embed
                     if channel:
                         embed = discord.Embed(
                             title="🎉 Successful Referral!",
                             description=(
-                                f"🔥 {referrer_member.mention} just referred {after.mention}!\n\n"
+                                f"🔥 {referrer_mention} just referred {after.mention}!\n\n"
                                 f"💰 **Rewards Distributed:**\n"
-                                f"• {referrer_member.mention} earned **{referrer_points:.2f} points** 🪙\n"
+                                f"• {referrer_mention} earned **{referrer_points:.2f} points** 🪙\n"
                                 f"• {after.mention} earned **{new_member_points:.2f} points** 🎁"
                             ),
                             color=discord.Color.green()
@@ -836,6 +916,22 @@ class AdminCommands(commands.Cog):
                 logger.error(f"❌ Permission error: Bot could not remove roles from {after.name}.")
 
 
+    # === MEMBER REMOVE ===
+    @commands.Cog.listener()
+    async def on_member_remove(self, member):
+        """Drops members who leave from the cached leaderboard eligibility."""
+        if member.guild.id == config.SERVER_ID:
+            self.bot.eligibility.remove(str(member.id))
+
+    # === INVITE INDEX ===
+    @commands.Cog.listener()
+    async def on_invite_create(self, invite):
+        self.bot.invite_tracker.add(invite)
+
+    @commands.Cog.listener()
+    async def on_invite_delete(self, invite):
+        self.bot.invite_tracker.remove(invite)
+
     # === INVITE LINK MECHANISM ===
     @commands.command(name="invite", help="Generates a unique referral link for the user.")
     async def invite_link(self, ctx):
@@ -850,11 +946,8 @@ class AdminCommands(commands.Cog):
                 delete_after=10)
             return
 
-        # 2. Search for an existing invite link
-        existing_invites = await ctx.guild.invites()
-        user_invite = next(
-            (invite for invite in existing_invites if invite.inviter == ctx.author and invite.max_uses == 0), None
-        )
+        # 2. Search for an existing invite link in the invite index
+        user_invite = self.bot.invite_tracker.permanent_invite_of(ctx.guild.id, ctx.author.id)
 
         if user_invite:
             await ctx.send(
@@ -867,6 +960,7 @@ class AdminCommands(commands.Cog):
             invite = await ctx.channel.create_invite(
                 max_uses=0, max_age=0, reason="Referral link for a user"
             )
+            self.bot.invite_tracker.add(invite)
             await ctx.send(
                 f"🔗 Here is your personal referral link, {ctx.author.mention}: `{invite.url}`\n"
                 "Share this link with friends to earn bonus points when they join!",
@@ -886,10 +980,8 @@ class AdminCommands(commands.Cog):
                            delete_after=10)
             return
 
-        # ✅ FIX: Load the referral data from the database
-        referral_data = await self.bot.load_all_json("referral_data")
         referrer_id = str(ctx.author.id)
-        referred_members = [user_id for user_id, ref_id in referral_data.items() if ref_id == referrer_id]
+        referred_members = self.bot.referrals.referees_of(referrer_id)
 
         embed = discord.Embed(
             title="👥 Your Referrals",
@@ -1044,73 +1136,64 @@ class AdminCommands(commands.Cog):
             await ctx.send(embed=error_embed, delete_after=15)
             return
 
-        # ✅ FIX: Load all necessary data from the database at the start
-        submissions = await self.bot.load_list_of_json("submissions")
-        admin_points = await self.bot.load_single_json("admin_points", "main", {})
-        users_points = await self.bot.load_all_json("users_points")
-        approved_proofs = await self.bot.load_list_of_json("approved_proofs")
-
         user_id = str(member.id)
         action = action.lower()
 
         # 2. Validate the submission
-        if user_id not in submissions:
+        submission = await self.bot.load_single_json(self.bot, "submissions", user_id)
+        if not submission:
             no_submission_embed = discord.Embed(title="❌ Error",
                                                 description="No pending submission found for this user.",
                                                 color=discord.Color.red())
             await ctx.send(embed=no_submission_embed, delete_after=10)
             return
 
-        submission = submissions[user_id]
-        reply_channel = self.bot.get_channel(submission.get("channel_id", config.TASK_SUBMIT_CHANNEL_ID))
-
-        if not reply_channel:
+        reply_channel_id = submission.get("channel_id", config.TASK_SUBMIT_CHANNEL_ID)
+        if not self.bot.get_channel(reply_channel_id):
             logger.warning(f"Could not find reply channel for user {user_id}. Falling back to command channel.")
-            reply_channel = ctx.channel
+            reply_channel_id = ctx.channel.id
 
         if action == "approve":
             points_to_award = submission["points_requested"]
 
-            # 3. Critical Safety Check
-            if admin_points["balance"] < points_to_award:
+            user_embed = discord.Embed(title="✅ Submission Approved!",
+                                       description=f"Your engagement proof has been approved. You earned **{points_to_award:.2f} points**!",
+                                       color=discord.Color.green())
+            # The reply is written before the commit, so it points to !points rather than quoting a balance.
+            user_embed.add_field(name="Your New Total", value="Use `!points` to see your updated balance.",
+                                 inline=False)
+            user_embed.set_footer(text="Thank you for your contribution!")
+
+            # 3. Credit the user, debit the admin balance, record the proofs and queue the reply in one
+            # transaction; the balance check happens under the row lock.
+            result = await self.bot.commit_economy_change(
+                self.bot, user_id,
+                {"all_time_points": points_to_award, "available_points": points_to_award},
+                {"balance": -points_to_award, "in_circulation": points_to_award},
+                [notification(reply_channel_id, member.mention, user_embed)],
+                ledger=(points_to_award, "Task submission approved"),
+                delete_submission=True,
+                approved_proofs=submission.get("normalized_proof_urls", [])
+            )
+            if result["status"] == "insufficient":
                 balance_embed = discord.Embed(title="❌ Approval Failed",
                                               description=f"Admin balance is too low to award **{points_to_award:.2f}** points.",
                                               color=discord.Color.red())
                 await ctx.send(embed=balance_embed, delete_after=10)
                 return
+            if result["status"] != "ok":
+                await ctx.send("❌ An error occurred while approving the submission. Nothing was changed.",
+                               delete_after=10)
+                return
+            self.bot.outbox.wake()
 
-            # 4. Process the approval transaction on the loaded data
-            users_points.setdefault(user_id, {"all_time_points": 0.0, "available_points": 0.0})
-            users_points[user_id]["all_time_points"] += points_to_award
-            users_points[user_id]["available_points"] += points_to_award
-
-            admin_points["balance"] -= points_to_award
-            admin_points["in_circulation"] += points_to_award
-
-            for url in submission.get("normalized_proof_urls", []):
-                if url not in approved_proofs:
-                    approved_proofs.append(url)
-
-            # ✅ FIX: Save the updated data immediately after the transaction
-            await self.bot.save_all_json("users_points", users_points)
-            await self.bot.save_single_json("admin_points", "main", admin_points)
-            await self.bot.save_list_of_json("approved_proofs", approved_proofs)
-
-            # 5. Log the transaction and clear the submission from the loaded data
-            await self.bot.log_points_transaction(user_id, points_to_award, "Task submission approved")
-            del submissions[user_id]
-
-            # ✅ FIX: Save the updated submissions dictionary
-            await self.bot.save_list_of_json("submissions", submissions)
-
-            user_embed = discord.Embed(title="✅ Submission Approved!",
-                                       description=f"Your engagement proof has been approved. You earned **{points_to_award:.2f} points**!",
-                                       color=discord.Color.green())
-            user_embed.add_field(name="Your New Total",
-                                 value=f"**{users_points[user_id]['available_points']:.2f} points**",
-                                 inline=False)
-            user_embed.set_footer(text="Thank you for your contribution!")
-            await reply_channel.send(f"{member.mention}", embed=user_embed)
+            # 4. Bring the in-memory copies up to date and queue the transaction log
+            self.bot.users_points[user_id] = result["user"]
+            self.bot.admin_points = result["admin_points"]
+            self.bot.submissions.pop(user_id, None)
+            self.bot.points_rank.set_score(user_id, result["user"]["all_time_points"])
+            await self.bot.log_points_transaction(user_id, points_to_award, "Task submission approved",
+                                                  write_ledger=False)
 
             mod_embed = discord.Embed(title="✅ Action Logged",
                                       description=f"**Approved** submission for {member.mention}.",
@@ -1120,14 +1203,19 @@ class AdminCommands(commands.Cog):
             await ctx.send(embed=mod_embed, delete_after=15)
 
         elif action == "reject":
-            # ✅ FIX: Load the submissions dictionary, modify it, and save it.
-            del submissions[user_id]
-            await self.bot.save_list_of_json("submissions", submissions)
-
             user_embed = discord.Embed(title="🚫 Submission Rejected",
                                        description="Your engagement proof has been rejected. Please review your proof and submit again if needed.",
                                        color=discord.Color.red())
-            await reply_channel.send(f"{member.mention}", embed=user_embed)
+            result = await self.bot.commit_economy_change(
+                self.bot, user_id, {}, {}, [notification(reply_channel_id, member.mention, user_embed)],
+                delete_submission=True
+            )
+            if result["status"] != "ok":
+                await ctx.send("❌ An error occurred while rejecting the submission. Nothing was changed.",
+                               delete_after=10)
+                return
+            self.bot.outbox.wake()
+            self.bot.submissions.pop(user_id, None)
 
             mod_embed = discord.Embed(title="✅ Action Logged",
                                       description=f"**Rejected** submission for {member.mention}.",
@@ -1251,35 +1339,17 @@ class AdminCommands(commands.Cog):
             await ctx.send(embed=error_embed, delete_after=10)
             return
 
-        # ✅ FIX: Load the user points table from the database
-        users_points = await self.bot.load_all_json("users_points")
-
         target_member = member if member else ctx.author
         user_id = str(target_member.id)
-        user_data = users_points.get(user_id, {"all_time_points": 0.0, "available_points": 0.0})
+
+        # Only the target user's row is loaded; the rank comes from the rank index (admins/mods excluded)
+        user_data = await self.bot.load_single_json(self.bot, "users_points", user_id,
+                                                    {"all_time_points": 0.0, "available_points": 0.0})
         all_time_points = user_data.get("all_time_points", 0.0)
         available_points = user_data.get("available_points", 0.0)
 
-        # 2. Filter out admins/mods from ranking calculation
-        allowed_roles = [config.ADMIN_ROLE_ID, config.MOD_ROLE_ID]
-        eligible_users = {}
-        for uid, data in users_points.items():
-            member_obj = ctx.guild.get_member(int(uid))
-            if member_obj and not any(role.id in allowed_roles for role in member_obj.roles) and data.get(
-                    'all_time_points', 0) > 0:
-                eligible_users[uid] = data
-
-        sorted_users = sorted(
-            eligible_users.items(),
-            key=lambda item: item[1].get('all_time_points', 0),
-            reverse=True
-        )
-
-        rank = "Unranked"
-        for i, (uid, _) in enumerate(sorted_users, 1):
-            if uid == user_id:
-                rank = f"#{i}"
-                break
+        rank_position = self.bot.points_rank.rank_of(user_id)
+        rank = f"#{rank_position}" if rank_position else "Unranked"
 
         # 3. Build and send the embed
         usd_value = available_points * config.POINTS_TO_USD
@@ -1297,13 +1367,46 @@ class AdminCommands(commands.Cog):
         await ctx.send(embed=embed, delete_after=30)
 
     # -------------------------------- R A N K I N G --- S Y S T E M ---------------------------------------
+    def _points_ranking(self, window: str):
+        """
+        Resolves an optional leaderboard window argument to its points rank index and label.
+        Returns (None, None) for an unknown window.
+        """
+        window = (window or "all").lower()
+        if window in ("all", "alltime", "all-time"):
+            return self.bot.points_rank, "all-time"
+        if window in config.LEADERBOARD_WINDOWS:
+            return self.bot.points_windows.index(window), window
+        return None, None
+
+    async def _send_unknown_window(self, ctx, window: str):
+        options = ", ".join(f"`{name}`" for name in ["all", *config.LEADERBOARD_WINDOWS])
+        await ctx.send(f"❌ Unknown leaderboard window `{window}`. Choose one of: {options}.", delete_after=15)
+
+    async def _send_leaderboard_view(self, ctx, window: str, start_at_viewer: bool = False):
+        """Sends a paginated points leaderboard rendered from the shared ranking snapshot for the window."""
+        points_rank, window_label = self._points_ranking(window)
+        if points_rank is None:
+            await self._send_unknown_window(ctx, window)
+            return
+        if not len(points_rank):
+            await ctx.send("The leaderboard is currently empty. Start earning points!", delete_after=20)
+            return
+
+        # Admins/mods are already excluded from the rank index
+        snapshot = self.bot.leaderboard_snapshots.get(("points", window_label), points_rank, window_label)
+        page = (snapshot.page_of(str(ctx.author.id)) or 0) if start_at_viewer else 0
+        view = LeaderboardView(self.bot, snapshot, ctx.author, page)
+        view.message = await ctx.send(embed=view.build_embed(), view=view)
+
 #=================
     #USER RANKING
 #=================
-    @commands.command(name="rank", help="Shows the user's rank and the top 10 leaderboards.")
+    @commands.command(name="rank", help="Shows the user's rank on the paginated leaderboard. "
+                                        "Optional window: all, daily, weekly or monthly.")
     @commands.cooldown(1, 60, commands.BucketType.user)
-    async def rank(self, ctx):
-        """Shows the user's rank and the top 10 leaderboards."""
+    async def rank(self, ctx, window: str = "all"):
+        """Shows the user's rank on the paginated leaderboard for the chosen window."""
         await ctx.message.delete()
         if ctx.channel.id != config.LEADERBOARD_CHANNEL_ID:
             error_embed = discord.Embed(title="❌ Incorrect Channel",
@@ -1312,64 +1415,18 @@ class AdminCommands(commands.Cog):
             await ctx.send(embed=error_embed, delete_after=10)
             return
 
-        # ✅ FIX: Load the user points from the database
-        users_points = await self.bot.load_all_json("users_points")
-
-        user_id = str(ctx.author.id)
-        user_data = users_points.get(user_id, {"all_time_points": 0.0})
-        user_score = user_data.get("all_time_points", 0.0)
-
-        # Filter and sort the eligible users
-        eligible_users = {}
-        for uid, data in users_points.items():
-            member = ctx.guild.get_member(int(uid))
-            if member and not any(
-                    role.id in [config.ADMIN_ROLE_ID, config.MOD_ROLE_ID] for role in member.roles) and data.get(
-                'all_time_points', 0) > 0:
-                eligible_users[uid] = data
-
-        if not eligible_users:
-            await ctx.send("The leaderboard is currently empty. Start earning points!", delete_after=20)
-            return
-
-        sorted_users = sorted(eligible_users.items(), key=lambda item: item[1].get('all_time_points', 0.0),
-                              reverse=True)
-        rank_position = next((i for i, (uid, _) in enumerate(sorted_users, start=1) if uid == user_id), None)
-
-        # Build and send the embed
-        embed = discord.Embed(title="🏆 ManaVerse Global Rankings",
-                              description=f"Your progress and the **Top 10 Legends** of {ctx.guild.name}.",
-                              color=discord.Color.gold())
-        if rank_position:
-            embed.add_field(name="👑 Your Rank", value=f"**#{rank_position}** with **{user_score:.2f} points**",
-                            inline=False)
-        else:
-            embed.add_field(name="👑 Your Rank", value="You are not ranked yet. Start earning points!", inline=False)
-
-        medals = ["🥇", "🥈", "🥉"]
-        leaderboard_text = ""
-        for i, (uid, data) in enumerate(sorted_users[:10]):
-            member = ctx.guild.get_member(int(uid))
-            username = member.name if member else f"Unknown User ({uid})"
-            if uid == user_id:
-                username = f"⭐ **{username}** ⭐"
-            medal = medals[i] if i < len(medals) else "🏅"
-            leaderboard_text += f"{medal} **#{i + 1} – {username}**: {data['all_time_points']:.2f} MVpts\n"
-
-        embed.add_field(name="🌟 Top 10 Mana Legends", value=leaderboard_text, inline=False)
-        embed.set_footer(text="Grind, engage, and claim your spot at the top!",
-                         icon_url=ctx.guild.icon.url if ctx.guild.icon else None)
-        embed.timestamp = datetime.now(UTC)
-        await ctx.send(embed=embed)
+        # Opens the paginated leaderboard on the page that holds the user's rank
+        await self._send_leaderboard_view(ctx, window, start_at_viewer=True)
 
 #=====================
     #USER LEADERBOARD
 #=====================
     @commands.command(name="leaderboard",
-                      help="Displays the top 10 users by all-time points in a premium embed format.")
+                      help="Displays a paginated leaderboard of users by points. "
+                           "Optional window: all, daily, weekly or monthly.")
     @commands.cooldown(1, 60, commands.BucketType.user)
-    async def leaderboard(self, ctx):
-        """Displays the top 10 users by all-time points in a premium embed format."""
+    async def leaderboard(self, ctx, window: str = "all"):
+        """Displays a paginated leaderboard of users by points earned in the chosen window."""
         # Delete the user's command message
         await ctx.message.delete()
 
@@ -1381,40 +1438,8 @@ class AdminCommands(commands.Cog):
             await ctx.send(embed=error_embed, delete_after=10)
             return
 
-        # ✅ FIX: Load the user points from the database
-        users_points = await self.bot.load_all_json("users_points")
-
-        # 2. Filter and sort the eligible users
-        eligible_users = {}
-        for user_id, data in users_points.items():
-            member = ctx.guild.get_member(int(user_id))
-            if member and not any(
-                    role.id in [config.ADMIN_ROLE_ID, config.MOD_ROLE_ID] for role in member.roles) and data[
-                'all_time_points'] > 0:
-                eligible_users[user_id] = data
-
-        if not eligible_users:
-            await ctx.send("The leaderboard is currently empty. Start earning points!", delete_after=20)
-            return
-
-        sorted_users = sorted(eligible_users.items(), key=lambda item: item[1]['all_time_points'], reverse=True)
-
-        # 3. Build and send the embed
-        embed = discord.Embed(title="🏆 ManaVerse Leaderboard 🏆",
-                              description="The **Top 10 Legends** ranked by all-time points.",
-                              color=discord.Color.gold())
-        medals = ["🥇", "🥈", "🥉"]
-        ribbons = ["🎗️"] * 7
-        for i, (user_id, data) in enumerate(sorted_users[:10]):
-            member = ctx.guild.get_member(int(user_id))
-            username = member.display_name if member else f"User ID: {user_id}"
-            all_time_points = data['all_time_points']
-            rank_symbol = medals[i] if i < 3 else f"{ribbons[0]} #{i + 1}"
-            embed.add_field(name=f"{rank_symbol} {username}", value=f"**{all_time_points:.2f} MVpts**", inline=False)
-
-        embed.set_footer(text="Climb the ranks by earning points and show your dominance! 🚀")
-        embed.timestamp = datetime.now(UTC)
-        await ctx.send(embed=embed)
+        # 2. Open the paginated leaderboard on the first page
+        await self._send_leaderboard_view(ctx, window)
 
 #========================
     #USER XP LEADERBOARD
@@ -1432,9 +1457,6 @@ class AdminCommands(commands.Cog):
                            delete_after=15)
             return
 
-        # ✅ FIX: Load the user XP data from the database
-        user_xp = await self.bot.load_all_json("user_xp")
-
         target_member = member if member else ctx.author
         user_id = str(target_member.id)
         guild = self.bot.get_guild(config.SERVER_ID)
@@ -1443,17 +1465,11 @@ class AdminCommands(commands.Cog):
             await ctx.send("❌ Error: Could not find the server. Please check the SERVER_ID constant.", delete_after=15)
             return
 
-        allowed_roles = [config.ADMIN_ROLE_ID, config.MOD_ROLE_ID]
-        all_users = []
-        # ✅ FIX: Use the loaded user_xp dictionary instead of the in-memory one
-        for uid, data in user_xp.items():
-            member_obj = guild.get_member(int(uid))
-            if member_obj and not any(role.id in allowed_roles for role in member_obj.roles):
-                all_users.append((uid, data.get("xp", 0)))
-
-        sorted_xp_users = sorted(all_users, key=lambda item: item[1], reverse=True)
-        xp_balance = user_xp.get(user_id, {}).get("xp", 0)
-        user_rank = next((i for i, (uid, _) in enumerate(sorted_xp_users) if uid == user_id), None)
+        # The XP index is updated on every message, so it includes XP that has not been flushed yet.
+        xp_rank = self.bot.xp_rank
+        xp_balance = xp_rank.score_of(user_id)
+        rank_position = xp_rank.rank_of(user_id)
+        user_rank = rank_position - 1 if rank_position else None
 
         if xp_balance == 0:
             embed = discord.Embed(title="📊 XP Tracker",
@@ -1476,7 +1492,7 @@ class AdminCommands(commands.Cog):
                               color=discord.Color.blue())
         embed.add_field(name="Total XP", value=f"**{xp_balance:,} XP**", inline=True)
         if user_rank is not None:
-            embed.add_field(name="Rank", value=f"**#{user_rank + 1}** out of {len(sorted_xp_users)}", inline=True)
+            embed.add_field(name="Rank", value=f"**#{user_rank + 1}** out of {len(xp_rank)}", inline=True)
         else:
             embed.add_field(name="Rank", value="Unranked", inline=True)
 
@@ -1580,11 +1596,8 @@ class AdminCommands(commands.Cog):
             await ctx.send(embed=embed, delete_after=10)
             return
 
-        # ✅ FIX: Load the user points from the database
-        users_points = await self.bot.load_all_json("users_points")
-
         user_id = str(ctx.author.id)
-        user_data = users_points.get(user_id, {})
+        user_data = await self.bot.load_single_json(self.bot, "users_points", user_id, {})
         pending_payout = user_data.get("pending_payout")
 
         # 2. Validate the pending request
@@ -1596,10 +1609,10 @@ class AdminCommands(commands.Cog):
             return
 
         if time.time() - pending_payout["timestamp"] > config.CONFIRMATION_TIMEOUT:
-            if "pending_payout" in user_data:
-                del user_data["pending_payout"]
-                users_points[user_id] = user_data
-                await self.bot.save_all_json("users_points", users_points)
+            result = await self.bot.commit_economy_change(self.bot, user_id, {}, {}, [],
+                                                          remove_keys=["pending_payout"])
+            if result["status"] == "ok":
+                self.bot.users_points[user_id] = result["user"]
 
             embed = discord.Embed(title="❌ Request Timed Out",
                                   description="Your payout request timed out. Please start a new request with `!requestpayout`.",
@@ -1607,38 +1620,38 @@ class AdminCommands(commands.Cog):
             await ctx.send(embed=embed, delete_after=10)
             return
 
-        total_deduction = pending_payout["total_deduction"]
-        balance = user_data.get("available_points", 0.0)
-        if balance < total_deduction:
+        # 3. Deduct the points and queue the moderator notification in one transaction;
+        # the balance is checked again under the row lock.
+        mod_embed = discord.Embed(title="📤 New Payout Request",
+                                  description="A new payout request has been submitted for review.",
+                                  color=discord.Color.blue(), timestamp=datetime.now(UTC))
+        mod_embed.add_field(name="User", value=f"{ctx.author.mention} (`{ctx.author.name}`)", inline=False)
+        mod_embed.add_field(name="UID", value=f"**`{pending_payout['uid']}`**", inline=True)
+        mod_embed.add_field(name="Exchange", value=f"**`{pending_payout['exchange'].capitalize()}`**", inline=True)
+        mod_embed.add_field(name="Requested Amount", value=f"**{pending_payout['amount']:.2f} points**",
+                            inline=False)
+        mod_embed.add_field(name="Total Deduction", value=f"**{pending_payout['total_deduction']:.2f} points**",
+                            inline=False)
+        mod_embed.set_footer(text="Use `!paid <@user>` to confirm this payment.")
+
+        result = await self.bot.commit_economy_change(
+            self.bot, user_id, {"available_points": -pending_payout["total_deduction"]}, {},
+            [notification(config.MOD_PAYMENT_REVIEW_CHANNEL_ID, embed=mod_embed)]
+        )
+        if result["status"] == "insufficient":
             embed = discord.Embed(title="❌ Insufficient Balance",
                                   description="You no longer meet the minimum balance for payout.",
                                   color=discord.Color.red())
             await ctx.send(embed=embed, delete_after=10)
             return
+        if result["status"] != "ok":
+            await ctx.send("❌ An error occurred while submitting your payout. Nothing was changed.", delete_after=10)
+            return
+        self.bot.outbox.wake()
+        user_data = result["user"]
+        self.bot.users_points[user_id] = user_data
 
-        # 3. Process the transaction on the loaded data
-        user_data["available_points"] -= total_deduction
-        users_points[user_id] = user_data
-        await self.bot.save_all_json("users_points", users_points)
-
-        # 4. Notify the user and moderators
-        mod_channel = self.bot.get_channel(config.MOD_PAYMENT_REVIEW_CHANNEL_ID)
-        if mod_channel:
-            mod_embed = discord.Embed(title="📤 New Payout Request",
-                                      description="A new payout request has been submitted for review.",
-                                      color=discord.Color.blue(), timestamp=datetime.now(UTC))
-            mod_embed.add_field(name="User", value=f"{ctx.author.mention} (`{ctx.author.name}`)", inline=False)
-            mod_embed.add_field(name="UID", value=f"**`{pending_payout['uid']}`**", inline=True)
-            mod_embed.add_field(name="Exchange", value=f"**`{pending_payout['exchange'].capitalize()}`**", inline=True)
-            mod_embed.add_field(name="Requested Amount", value=f"**{pending_payout['amount']:.2f} points**",
-                                inline=False)
-            mod_embed.add_field(name="Total Deduction", value=f"**{pending_payout['total_deduction']:.2f} points**",
-                                inline=False)
-            mod_embed.set_footer(text="Use `!paid <@user>` to confirm this payment.")
-            await mod_channel.send(embed=mod_embed)
-        else:
-            logger.warning(f"Could not find mod channel with ID: {config.MOD_PAYMENT_REVIEW_CHANNEL_ID}")
-
+        # 4. Confirm to the user; moderators are notified through the outbox
         user_embed = discord.Embed(title="✅ Payout Submitted",
                                    description=f"Your payout request for **{pending_payout['amount']:.2f} points** has been successfully submitted for review.",
                                    color=discord.Color.green())
@@ -1660,12 +1673,8 @@ class AdminCommands(commands.Cog):
         if ctx.channel.id != config.MOD_PAYMENT_REVIEW_CHANNEL_ID:
             return
 
-        # ✅ FIX: Load both user and admin points from the database
-        users_points = await self.bot.load_all_json("users_points")
-        admin_points = await self.bot.load_single_json("admin_points", "main", {})
-
         user_id = str(member.id)
-        user_data = users_points.get(user_id, {})
+        user_data = await self.bot.load_single_json(self.bot, "users_points", user_id, {})
         pending_payout = user_data.get("pending_payout")
 
         if not pending_payout:
@@ -1676,13 +1685,6 @@ class AdminCommands(commands.Cog):
             return
 
         requested_amount = pending_payout["amount"]
-        if admin_points.get("balance", 0) < requested_amount:
-            embed = discord.Embed(title="❌ Transaction Failed",
-                                  description="The admin's balance is insufficient to burn the requested amount.",
-                                  color=discord.Color.red())
-            await ctx.send(embed=embed, delete_after=10)
-            return
-
         payout_channel = self.bot.get_channel(config.PAYOUT_REQUEST_CHANNEL_ID)
         if not payout_channel:
             embed = discord.Embed(title="❌ Configuration Error",
@@ -1691,22 +1693,8 @@ class AdminCommands(commands.Cog):
             await ctx.send(embed=embed, delete_after=10)
             return
 
-        # 2. Process the transaction on the loaded data
+        # 2. Burn the points, clear the request and queue the user's notification in one transaction
         fee = pending_payout["fee"]
-
-        admin_points["balance"] -= requested_amount
-        admin_points["in_circulation"] -= requested_amount
-        admin_points["burned"] = admin_points.get("burned", 0) + requested_amount
-        admin_points["treasury"] = admin_points.get("treasury", 0) + fee
-
-        del user_data["pending_payout"]
-        users_points[user_id] = user_data
-
-        # ✅ FIX: Save both updated dictionaries to the database
-        await self.bot.save_all_json("users_points", users_points)
-        await self.bot.save_single_json("admin_points", "main", admin_points)
-
-        # 3. Notify the user and moderator
         user_embed = discord.Embed(title="💸 Payout Processed!",
                                    description=f"🎉 {member.mention}, great news! Your payout request has been **successfully processed**.",
                                    color=discord.Color.green())
@@ -1715,8 +1703,37 @@ class AdminCommands(commands.Cog):
         user_embed.set_thumbnail(url=member.avatar.url if member.avatar else member.default_avatar.url)
         user_embed.set_footer(text="Thank you for being part of the community 🌍")
         user_embed.timestamp = datetime.now(UTC)
-        await payout_channel.send(embed=user_embed)
 
+        result = await self.bot.commit_economy_change(
+            self.bot, user_id, {},
+            {"balance": -requested_amount, "in_circulation": -requested_amount, "burned": requested_amount,
+             "treasury": fee},
+            [notification(payout_channel.id, embed=user_embed)],
+            remove_keys=["pending_payout"],
+            # Refused if another moderator finalized this request after it was read above
+            expect={"pending_payout": pending_payout}
+        )
+        if result["status"] == "stale":
+            embed = discord.Embed(title="❌ Already Processed",
+                                  description=f"**{member.mention}**'s payout request was already finalized or has changed.",
+                                  color=discord.Color.red())
+            await ctx.send(embed=embed, delete_after=10)
+            return
+        if result["status"] == "insufficient":
+            embed = discord.Embed(title="❌ Transaction Failed",
+                                  description="The admin's balance is insufficient to burn the requested amount.",
+                                  color=discord.Color.red())
+            await ctx.send(embed=embed, delete_after=10)
+            return
+        if result["status"] != "ok":
+            await ctx.send("❌ An error occurred while finalizing the payout. Nothing was changed.", delete_after=10)
+            return
+        self.bot.outbox.wake()
+        self.bot.users_points[user_id] = result["user"]
+        self.bot.admin_points = result["admin_points"]
+        self.bot.refresh_scheduler.mark_dirty("economy")
+
+        # 3. Confirm to the moderator; the user is notified through the outbox
         mod_embed = discord.Embed(title="✅ Payout Finalized",
                                   description=f"A payout success message has been sent to **{member.mention}**.",
                                   color=discord.Color.green())
@@ -1938,6 +1955,7 @@ class AdminCommands(commands.Cog):
             users_points.setdefault(user_id, {"all_time_points": 0.0, "available_points": 0.0})
             users_points[user_id]["all_time_points"] += points_to_award
             users_points[user_id]["available_points"] += points_to_award
+            self.bot.points_rank.set_score(user_id, users_points[user_id]["all_time_points"])
 
             quest_data[str(quest_number)]["status"] = "approved"
 
@@ -2049,6 +2067,7 @@ class AdminCommands(commands.Cog):
         users_points.setdefault(user_id, {"all_time_points": 0.0, "available_points": 0.0})
         users_points[user_id]["all_time_points"] += points_to_add
         users_points[user_id]["available_points"] += points_to_add
+        self.bot.points_rank.set_score(user_id, users_points[user_id]["all_time_points"])
 
         # Deduct points from the admin balance
         admin_points["balance"] -= points_to_add
@@ -2198,6 +2217,7 @@ class AdminCommands(commands.Cog):
             admin_points["in_circulation"] -= burn
 
         self.bot.mb_add_use(user_id, mysterybox_uses)
+        self.bot.points_rank.set_score(user_id, users_points[user_id]["all_time_points"])
 
         # ✅ FIX: Save all updated data back to the database
         await self.bot.save_all_json("users_points", users_points)
@@ -2205,9 +2225,10 @@ class AdminCommands(commands.Cog):
         await self.bot.save_all_json("mysterybox_uses", mysterybox_uses)
 
         # 3. Notifications and Logging
-        log_ch = self.bot.get_channel(config.COMMAND_LOG_CHANNEL_ID)
-        if log_ch:
-            await log_ch.send(f"🎁 Mystery Box used by <@{user_id}> — reward: **{reward}** MVpts")
+        self.bot.log_pipeline.post(config.COMMAND_LOG_CHANNEL_ID, discord.Embed(
+            description=f"🎁 Mystery Box used by <@{user_id}> — reward: **{reward}** MVpts",
+            color=discord.Color.purple()
+        ))
 
         color = discord.Color.green() if reward >= config.MYSTERYBOX_COST else discord.Color.orange()
         embed = discord.Embed(
@@ -2222,33 +2243,24 @@ class AdminCommands(commands.Cog):
 
     @commands.Cog.listener()
     async def on_command(self, ctx):
-        """Logs every command that is successfully completed."""
-
-        # Log the command to the centralized logger
-        logger.info(
-            f"Command '{ctx.command.name}' executed by {ctx.author.name} "
-            f"(ID: {ctx.author.id}) in channel {ctx.channel.name}."
-        )
-
-        log_channel = ctx.guild.get_channel(config.COMMAND_LOG_CHANNEL_ID)
-        if log_channel:
-            embed = discord.Embed(
-                title="Command Executed",
-                description=f"**User:** {ctx.author.mention}\n"
-                            f"**Command:** `{ctx.command.name}`\n"
-                            f"**Channel:** {ctx.channel.mention}",
-                color=discord.Color.blue()
-            )
-            embed.set_footer(text=f"User ID: {ctx.author.id}")
-            await log_channel.send(embed=embed)
+        """Queues an audit entry for every command; logging and the audit embed happen in the background."""
+        self.bot.command_audit.record(ctx)
 
     @commands.Cog.listener()
     async def on_command_error(self, ctx, error):
         # Log the full error for debugging purposes
         logger.error(f"❌ An error occurred with command '{ctx.command}': {error}")
+        if not isinstance(error, commands.CommandNotFound):
+            self.bot.command_audit.record(ctx, error)
 
         # Handle specific errors with user-friendly messages
-        if isinstance(error, commands.CommandOnCooldown):
+        if isinstance(error, commands.CommandInvokeError) and isinstance(error.original, DatabaseBusy):
+            await ctx.send(
+                f"⏳ {ctx.author.mention}, the bot is very busy right now. Please try again in a few seconds.",
+                delete_after=10
+            )
+
+        elif isinstance(error, commands.CommandOnCooldown):
             seconds = int(error.retry_after)
             await ctx.send(
                 f"⚠️ {ctx.author.mention}, you're on cooldown for this command. Try again in **{seconds} seconds**.",
@@ -2282,213 +2294,215 @@ class AdminCommands(commands.Cog):
                 delete_after=15
             )
 
+    # =========================
+    #   MESSAGE PIPELINE
+    # =========================
+
+    def _register_message_stages(self):
+        """
+        Registers the on_message pipeline stages. Stages run cheapest first and only in the
+        channels they apply to; a stage returning True stops the remaining ones.
+        """
+        router = self.message_router
+        # Tickets, VIP posts and payments have their own handling and never went through XP or the word filter.
+        general_only = [config.SUPPORT_CHANNEL_ID, config.ENGAGEMENT_CHANNEL_ID, config.PAYMENT_CHANNEL_ID]
+        router.register("moderation", self._moderation_stage, cost=0, exclude_channels=general_only)
+        router.register("xp", self._xp_stage, cost=1, exclude_channels=general_only)
+        router.register("gm_mv", self._gm_mv_stage, cost=5, channels=[config.GM_MV_CHANNEL_ID],
+                        predicate=lambda message: message.content.lower().strip() in ("gm", "mv"))
+        router.register("vip_posts", self._vip_post_stage, cost=5, channels=[config.ENGAGEMENT_CHANNEL_ID])
+        router.register("tickets", self._ticket_stage, cost=10, channels=[config.SUPPORT_CHANNEL_ID])
+
     @commands.Cog.listener()
     async def on_message(self, message):
         if message.author.bot:
             return
+        await self.message_router.dispatch(message)
 
-        # --- 1. Ticket System Logic (if applicable) ---
-        if message.channel.id == config.SUPPORT_CHANNEL_ID:
-            # ✅ FIX: Load active tickets using the correct key
-            active_tickets = await self.bot.load_all_json("active_tickets")
-            user_id = message.author.id
-
-            if user_id in active_tickets.values():
-                embed = discord.Embed(
-                    title="❌ Active Ticket Found",
-                    description="You already have an active ticket. Please close it before opening a new one.",
-                    color=discord.Color.red()
-                )
-                await message.channel.send(embed=embed, delete_after=20)
-                logger.info(f"Blocked new ticket from {message.author.name}. Active ticket already exists.")
-                await message.delete()
-                return
+    async def _moderation_stage(self, message):
+        """Banned words check. Runs first, so offending messages never reach any DB work."""
+        if not self.banned_words.find(message.content):
+            return False
 
-            guild = message.guild
-            user = message.author
-            ticket_name = f"ticket-{user.name.lower()}"
+        await message.delete()
+        await message.channel.send(f'🚫 {message.author.mention}, that message contains a banned word!',
+                                   delete_after=20)
+        logger.info(f"Deleted message from {message.author.name} containing a banned word.")
+        return True
 
-            overwrites = {
-                guild.default_role: discord.PermissionOverwrite(view_channel=False),
-                guild.get_role(config.ADMIN_ROLE_ID): discord.PermissionOverwrite(view_channel=True),
-                guild.get_role(config.MOD_ROLE_ID): discord.PermissionOverwrite(view_channel=True),
-                user: discord.PermissionOverwrite(view_channel=True, send_messages=True),
-                guild.get_member(self.bot.user.id): discord.PermissionOverwrite(view_channel=True,
-                                                                                send_messages=True)
-            }
+    async def _xp_stage(self, message):
+        """Awards XP for every message outside the ticket, VIP and payment channels."""
+        user_id = str(message.author.id)
+        # XP is buffered in memory and flushed to the database in batches by the tasks cog.
+        xp_earned = random.randint(5, 15)
+        self.bot.xp_accumulator.add(user_id, xp_earned)
+        self.bot.xp_rank.add(user_id, xp_earned)
+        self.bot.xp_windows.record(user_id, xp_earned)
+        return False
 
-            try:
-                ticket_channel = await guild.create_text_channel(
-                    ticket_name,
-                    category=guild.get_channel(config.TICKETS_CATEGORY_ID),
-                    overwrites=overwrites
-                )
-
-                welcome_embed = discord.Embed(
-                    title="🎫 New Support Ticket",
-                    description=f"Thank you for reaching out, {user.mention}. A support team member will be with you shortly.",
-                    color=discord.Color.blue(),
-                    timestamp=datetime.now(UTC)
-                )
-                welcome_embed.add_field(name="Original Message", value=f"> {message.content}", inline=False)
-                welcome_embed.set_footer(text="A team member will respond soon.")
-
-                await ticket_channel.send(f"{user.mention}", embed=welcome_embed)
-                await ticket_channel.send(
-                    f"Support team, you have a new ticket from {user.mention}! Use `!close` to close this ticket.")
-
-                confirm_embed = discord.Embed(
-                    title="Ticket Created! 🎉",
-                    description=f"Your ticket has been created at {ticket_channel.mention}. A support team member will be with you shortly.",
-                    color=discord.Color.green()
-                )
-                await message.channel.send(embed=confirm_embed, delete_after=30)
-
-                await message.delete()
-
-                active_tickets[ticket_channel.id] = user.id
-                await self.bot.save_all_json("active_tickets", active_tickets)
-
-                logger.info(f"Created new ticket for {user.name} in channel #{ticket_channel.name}.")
+    async def _gm_mv_stage(self, message):
+        """Awards the daily GM/MV points in the designated channel."""
+        user_id = str(message.author.id)
+        today = str(datetime.now(UTC).date())
 
-            except discord.Forbidden:
-                logger.error("Bot is missing permissions to create channels or manage roles.")
-                embed = discord.Embed(
-                    title="❌ Permissions Error",
-                    description="An error occurred. I don't have the permissions to create a ticket.",
-                    color=discord.Color.red()
-                )
-                await message.channel.send(embed=embed, delete_after=20)
-            except Exception as e:
-                logger.error(f"❌ An unhandled error occurred in ticket creation: {e}")
-                embed = discord.Embed(
-                    title="❌ An Error Occurred",
-                    description="An unexpected error occurred while creating the ticket.",
-                    color=discord.Color.red()
-                )
-                await message.channel.send(embed=embed, delete_after=20)
-            return
-
-        # --- 2. VIP Post Logic ---
-        if message.channel.id == config.ENGAGEMENT_CHANNEL_ID:
-            # ✅ FIX: Load vip posts data for persistence
-            vip_posts = await self.bot.load_all_json("vip_posts")
-
-            member = message.author
-            is_mod_or_admin = any(role.id in [config.ADMIN_ROLE_ID, config.MOD_ROLE_ID] for role in member.roles)
-
-            if is_mod_or_admin:
-                await self.bot.process_commands(message)
-                return
+        # ✅ FIX: Load all necessary data from the database
+        users_points = await self.bot.load_all_json("users_points")
+        admin_points = await self.bot.load_single_json("admin_points", "main", {})
+        gm_log = await self.bot.load_all_json("gm_log")
+
+        if gm_log.get(user_id) != today:
+            is_author_admin = any(role.id == config.ADMIN_ROLE_ID for role in message.author.roles)
+
+            if is_author_admin:
+                # ✅ FIX: Modify loaded admin_points
+                admin_points["balance"] -= config.GM_MV_POINTS_REWARD
+                admin_points["my_points"] += config.GM_MV_POINTS_REWARD
+                admin_points["in_circulation"] += config.GM_MV_POINTS_REWARD
+                await self.bot.save_single_json("admin_points", "main", admin_points)
+                self.bot.refresh_scheduler.mark_dirty("economy")
+            else:
+                # ✅ FIX: Check and modify loaded admin_points and users_points
+                if admin_points["balance"] < config.GM_MV_POINTS_REWARD:
+                    logger.warning("⚠️ Admin balance is too low to award GM points. Skipping.")
+                    await message.channel.send("⚠️ An error occurred. Please contact an admin.",
+                                               delete_after=10)
+                    return True
+                user_data = users_points.setdefault(user_id, {"all_time_points": 0.0,
+                                                              "available_points": 0.0})
+                user_data["all_time_points"] += config.GM_MV_POINTS_REWARD
+                user_data["available_points"] += config.GM_MV_POINTS_REWARD
+                self.bot.points_rank.set_score(user_id, user_data["all_time_points"])
+                admin_points["balance"] -= config.GM_MV_POINTS_REWARD
+                admin_points["in_circulation"] += config.GM_MV_POINTS_REWARD
+
+            await self.bot.log_points_transaction(user_id, config.GM_MV_POINTS_REWARD, "GM points")
+
+            # ✅ FIX: Update and save all three data tables
+            gm_log[user_id] = today
+            await self.bot.save_all_json("users_points", users_points)
+            await self.bot.save_single_json("admin_points", "main", admin_points)
+            await self.bot.save_all_json("gm_log", gm_log)
 
-            user_id = str(member.id)
-            vip_posts.setdefault(user_id, {"count": 0, "last_date": ""})
+            embed = discord.Embed(
+                title="🎉 GM/MV Points Awarded! 🎉",
+                description=f"Congratulations, {message.author.mention}! You've been rewarded **{config.GM_MV_POINTS_REWARD:.2f} points** for your GM/MV message.",
+                color=discord.Color.gold()
+            )
+            embed.set_image(url="https://media.tenor.com/Fw5m_qY3S2gAAAAC/puffed-celebration.gif")
+            embed.set_footer(
+                text=f"Your new balance is {users_points.get(user_id, {}).get('available_points', 0):.2f} points" if not is_author_admin else "Points have been added to your balance.")
+            embed.timestamp = datetime.now(UTC)
+            await message.channel.send(embed=embed, delete_after=20)
+        return True
 
-            today = str(datetime.now(UTC).date())
-            if vip_posts[user_id]["last_date"] != today:
-                vip_posts[user_id]["count"] = 0
-                vip_posts[user_id]["last_date"] = today
+    async def _vip_post_stage(self, message):
+        """Enforces the VIP-only posting rule and daily post limit in the engagement channel."""
+        member = message.author
+        is_mod_or_admin = any(role.id in [config.ADMIN_ROLE_ID, config.MOD_ROLE_ID] for role in member.roles)
 
-            if config.VIP_ROLE_ID not in [role.id for role in member.roles]:
-                await message.delete()
-                await message.channel.send(f"❌ {member.mention}, only **VIP members** can post in this channel!",
-                                           delete_after=10)
-                logger.info(f"Deleted message from non-VIP user {member.name} in engagement channel.")
+        if is_mod_or_admin:
+            await self.bot.process_commands(message)
+            return True
 
-                # ✅ FIX: Save the updated vip_posts before returning
-                await self.bot.save_all_json("vip_posts", vip_posts)
-                return
+        if config.VIP_ROLE_ID not in [role.id for role in member.roles]:
+            await message.delete()
+            await message.channel.send(f"❌ {member.mention}, only **VIP members** can post in this channel!",
+                                       delete_after=10)
+            logger.info(f"Deleted message from non-VIP user {member.name} in engagement channel.")
+            return True
+
+        # One atomic upsert per post; counters are keyed by UTC date, so they reset at midnight on their own.
+        post_count = await self.bot.increment_vip_post_count(self.bot, str(member.id), datetime.now(UTC).date())
+        if post_count is not None and post_count > 3:
+            await message.delete()
+            await message.channel.send(
+                f"🚫 {member.mention}, you've reached your daily post limit in this channel (3 per day).",
+                delete_after=20)
+            logger.info(f"Deleted message from {member.name} for exceeding VIP daily limit.")
+        return True
+
+    async def _ticket_stage(self, message):
+        """Opens a support ticket for messages posted in the support channel."""
+        # ✅ FIX: Load active tickets using the correct key
+        active_tickets = await self.bot.load_all_json("active_tickets")
+        user_id = message.author.id
 
-            vip_posts[user_id]["count"] += 1
-
-            if vip_posts[user_id]["count"] > 3:
-                await message.delete()
-                await message.channel.send(
-                    f"🚫 {member.mention}, you've reached your daily post limit in this channel (3 per day).",
-                    delete_after=20)
-                logger.info(f"Deleted message from {member.name} for exceeding VIP daily limit.")
-
-            # ✅ FIX: Save the updated vip_posts dictionary
-            await self.bot.save_all_json("vip_posts", vip_posts)
-            return
-
-        # The Payment Message Logic is already safe as it doesn't modify data.
-        if message.channel.id == config.PAYMENT_CHANNEL_ID:
-            # This logic block is fine as-is.
-            return
-
-        # Process only GM/MV points in the designated channel
-        if message.channel.id == config.GM_MV_CHANNEL_ID:
-            content = message.content.lower().strip()
-            if content == "gm" or content == "mv":
-                user_id = str(message.author.id)
-                today = str(datetime.now(UTC).date())
-
-                # ✅ FIX: Load all necessary data from the database
-                users_points = await self.bot.load_all_json("users_points")
-                admin_points = await self.bot.load_single_json("admin_points", "main", {})
-                gm_log = await self.bot.load_all_json("gm_log")
-
-                if gm_log.get(user_id) != today:
-                    is_author_admin = any(role.id == config.ADMIN_ROLE_ID for role in message.author.roles)
-
-                    if is_author_admin:
-                        # ✅ FIX: Modify loaded admin_points
-                        admin_points["balance"] -= config.GM_MV_POINTS_REWARD
-                        admin_points["my_points"] += config.GM_MV_POINTS_REWARD
-                        admin_points["in_circulation"] += config.GM_MV_POINTS_REWARD
-                        await self.bot.save_single_json("admin_points", "main", admin_points)
-                    else:
-                        # ✅ FIX: Check and modify loaded admin_points and users_points
-                        if admin_points["balance"] < config.GM_MV_POINTS_REWARD:
-                            logger.warning("⚠️ Admin balance is too low to award GM points. Skipping.")
-                            await message.channel.send("⚠️ An error occurred. Please contact an admin.",
-                                                       delete_after=10)
-                            return
-                        user_data = users_points.setdefault(user_id, {"all_time_points": 0.0,
-                                                                      "available_points": 0.0})
-                        user_data["all_time_points"] += config.GM_MV_POINTS_REWARD
-                        user_data["available_points"] += config.GM_MV_POINTS_REWARD
-                        admin_points["balance"] -= config.GM_MV_POINTS_REWARD
-                        admin_points["in_circulation"] += config.GM_MV_POINTS_REWARD
-
-                    await self.bot.log_points_transaction(user_id, config.GM_MV_POINTS_REWARD, "GM points")
-
-                    # ✅ FIX: Update and save all three data tables
-                    gm_log[user_id] = today
-                    await self.bot.save_all_json("users_points", users_points)
-                    await self.bot.save_single_json("admin_points", "main", admin_points)
-                    await self.bot.save_all_json("gm_log", gm_log)
+        if user_id in active_tickets.values():
+            embed = discord.Embed(
+                title="❌ Active Ticket Found",
+                description="You already have an active ticket. Please close it before opening a new one.",
+                color=discord.Color.red()
+            )
+            await message.channel.send(embed=embed, delete_after=20)
+            logger.info(f"Blocked new ticket from {message.author.name}. Active ticket already exists.")
+            await message.delete()
+            return True
+
+        guild = message.guild
+        user = message.author
+        ticket_name = f"ticket-{user.name.lower()}"
+
+        overwrites = {
+            guild.default_role: discord.PermissionOverwrite(view_channel=False),
+            guild.get_role(config.ADMIN_ROLE_ID): discord.PermissionOverwrite(view_channel=True),
+            guild.get_role(config.MOD_ROLE_ID): discord.PermissionOverwrite(view_channel=True),
+            user: discord.PermissionOverwrite(view_channel=True, send_messages=True),
+            guild.get_member(self.bot.user.id): discord.PermissionOverwrite(view_channel=True,
+                                                                            send_messages=True)
+        }
 
-                    embed = discord.Embed(
-                        title="🎉 GM/MV Points Awarded! 🎉",
-                        description=f"Congratulations, {message.author.mention}! You've been rewarded **{config.GM_MV_POINTS_REWARD:.2f} points** for your GM/MV message.",
-                        color=discord.Color.gold()
-                    )
-                    embed.set_image(url="https://media.tenor.com/Fw5m_qY3S2gAAAAC/puffed-celebration.gif")
-                    embed.set_footer(
-                        text=f"Your new balance is {users_points.get(user_id, {}).get('available_points', 0):.2f} points" if not is_author_admin else "Points have been added to your balance.")
-                    embed.timestamp = datetime.now(UTC)
-                    await message.channel.send(embed=embed, delete_after=20)
+        try:
+            ticket_channel = await guild.create_text_channel(
+                ticket_name,
+                category=guild.get_channel(config.TICKETS_CATEGORY_ID),
+                overwrites=overwrites
+            )
 
-        # --- 4. XP and Moderation Logic (applies to ALL messages) ---
-        user_id = str(message.author.id)
-        # ✅ FIX: Load user_xp and save immediately after modification
-        user_xp = await self.bot.load_all_json("user_xp")
-        user_xp.setdefault(user_id, {"xp": 0})
-        xp_earned = random.randint(5, 15)
-        user_xp[user_id]["xp"] += xp_earned
+            welcome_embed = discord.Embed(
+                title="🎫 New Support Ticket",
+                description=f"Thank you for reaching out, {user.mention}. A support team member will be with you shortly.",
+                color=discord.Color.blue(),
+                timestamp=datetime.now(UTC)
+            )
+            welcome_embed.add_field(name="Original Message", value=f"> {message.content}", inline=False)
+            welcome_embed.set_footer(text="A team member will respond soon.")
+
+            await ticket_channel.send(f"{user.mention}", embed=welcome_embed)
+            await ticket_channel.send(
+                f"Support team, you have a new ticket from {user.mention}! Use `!close` to close this ticket.")
 
-        await self.bot.save_all_json("user_xp", user_xp)
+            confirm_embed = discord.Embed(
+                title="Ticket Created! 🎉",
+                description=f"Your ticket has been created at {ticket_channel.mention}. A support team member will be with you shortly.",
+                color=discord.Color.green()
+            )
+            await message.channel.send(embed=confirm_embed, delete_after=30)
 
-        # Banned Words Check
-        cleaned_content = message.content.lower().translate(str.maketrans('', '', string.punctuation))
-        if any(word in config.banned_words for word in cleaned_content.split()):
             await message.delete()
-            await message.channel.send(f'🚫 {message.author.mention}, that message contains a banned word!',
-                                       delete_after=20)
-            logger.info(f"Deleted message from {message.author.name} containing a banned word.")
-            return
+
+            active_tickets[ticket_channel.id] = user.id
+            await self.bot.save_all_json("active_tickets", active_tickets)
+
+            logger.info(f"Created new ticket for {user.name} in channel #{ticket_channel.name}.")
+
+        except discord.Forbidden:
+            logger.error("Bot is missing permissions to create channels or manage roles.")
+            embed = discord.Embed(
+                title="❌ Permissions Error",
+                description="An error occurred. I don't have the permissions to create a ticket.",
+                color=discord.Color.red()
+            )
+            await message.channel.send(embed=embed, delete_after=20)
+        except Exception as e:
+            logger.error(f"❌ An unhandled error occurred in ticket creation: {e}")
+            embed = discord.Embed(
+                title="❌ An Error Occurred",
+                description="An unexpected error occurred while creating the ticket.",
+                color=discord.Color.red()
+            )
+            await message.channel.send(embed=embed, delete_after=20)
+        return True
+
 
 async def setup(bot):
     await bot.add_cog(AdminCommands(bot))
\ No newline at end of file
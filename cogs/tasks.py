@@ -1,5 +1,5 @@
 import discord
-from discord.ext import commands, tasks
+from discord.ext import commands
 from logger import bot_logger as logger
 import config
 from datetime import datetime, UTC
@@ -12,24 +12,29 @@ class TasksCog(commands.Cog):
 
     def cog_load(self):
         logger.info("Starting background tasks...")
-        self.update_economy_message.start()
-        self.update_leaderboards.start()
-        self.weekly_xp_bonus.start()
-        self.update_giveaway_winners_history.start()
-        self.reset_vip_posts.start()
-        logger.info("All background tasks started.")
+        refresh = self.bot.refresh_scheduler
+        refresh.register("economy", self.update_economy_message)
+        refresh.register("points_leaderboard", self.update_points_leaderboard)
+        refresh.register("referral_leaderboard", self.update_referral_leaderboard)
+        refresh.register("xp_leaderboard", self.update_xp_leaderboard)
+        refresh.register("giveaway_hall_of_fame", self.bot.hall_of_fame.refresh)
+        scheduler = self.bot.scheduler
+        scheduler.register("flush_xp", self.flush_xp, seconds=config.XP_FLUSH_INTERVAL_SECONDS, persistent=False)
+        scheduler.register("weekly_xp_bonus", self.weekly_xp_bonus, hours=168,
+                           jitter_seconds=config.SCHEDULER_JITTER_SECONDS)
+        logger.info("All background tasks registered.")
 
     def cog_unload(self):
         logger.info("Cancelling background tasks...")
-        self.update_economy_message.cancel()
-        self.update_leaderboards.cancel()
-        self.weekly_xp_bonus.cancel()
-        self.update_giveaway_winners_history.cancel()
-        self.reset_vip_posts.cancel()
+        self.bot.refresh_scheduler.unregister_all()
+        self.bot.scheduler.unregister_all()
+
+    @commands.Cog.listener()
+    async def on_ready(self):
+        # Boards are otherwise only refreshed when their data changes; bring them up to date after (re)connecting.
+        self.bot.refresh_scheduler.mark_dirty(*self.bot.refresh_scheduler.boards)
 
-    @tasks.loop(minutes=5)
     async def update_economy_message(self):
-        await self.bot.wait_until_ready()
         commands_cog = self.bot.get_cog("AdminCommands")
         if not commands_cog:
             logger.error("❌ AdminCommands cog not found. Cannot generate economy embed.")
@@ -42,35 +47,24 @@ class TasksCog(commands.Cog):
                 return
 
             economy_embed = await commands_cog.get_economy_embed()
-            bot_data = await self.bot.load_single_json(self.bot, "bot_data", "main", {})
-            economy_message_id = bot_data.get("economy_message_id")
-
-            if economy_message_id:
-                try:
-                    message = await channel.fetch_message(economy_message_id)
-                    await message.edit(embed=economy_embed)
-                    logger.info("✅ Economy message updated successfully.")
-                except discord.NotFound:
-                    message = await channel.send(embed=economy_embed)
-                    bot_data["economy_message_id"] = message.id
-                    logger.info("✅ Old economy message not found. A new one has been sent.")
-                except discord.Forbidden:
-                    logger.error(
-                        f"❌ Bot missing permissions to edit message in channel ({config.FIRST_ODOGWU_CHANNEL_ID}).")
-            else:
-                message = await channel.send(embed=economy_embed)
-                bot_data["economy_message_id"] = message.id
-                logger.info("✅ New economy message sent and its ID saved.")
-
-            await self.bot.save_single_json(self.bot, "bot_data", "main", bot_data)
+            if await self.bot.live_embeds.publish(channel, "economy_message_id", economy_embed):
+                logger.info("✅ Economy message updated successfully.")
+            await self.bot.live_embeds.flush()
         except discord.Forbidden:
             logger.error(f"❌ Bot missing permissions to send messages in channel ({config.FIRST_ODOGWU_CHANNEL_ID}).")
         except Exception as e:
             logger.error(f"❌ An unexpected error occurred in the economy update task: {e}", exc_info=True)
 
-    @tasks.loop(minutes=5)
-    async def update_leaderboards(self):
-        await self.bot.wait_until_ready()
+    async def update_points_leaderboard(self):
+        await self._update_leaderboard("points_leaderboard_message_id", "get_points_leaderboard_embed")
+
+    async def update_referral_leaderboard(self):
+        await self._update_leaderboard("referral_leaderboard_message_id", "get_referral_leaderboard_embed")
+
+    async def update_xp_leaderboard(self):
+        await self._update_leaderboard("xp_leaderboard_message_id", "get_xp_leaderboard_embed")
+
+    async def _update_leaderboard(self, message_id_key, embed_method):
         try:
             commands_cog = self.bot.get_cog("AdminCommands")
             if not commands_cog:
@@ -83,89 +77,40 @@ class TasksCog(commands.Cog):
                     f"❌ Error: Leaderboard channel not found (ID: {config.PERIODIC_LEADERBOARD_CHANNEL_ID}).")
                 return
 
-            bot_data = await self.bot.load_single_json(self.bot, "bot_data", "main", {})
-
-            await self.bot.manage_periodic_message(
-                channel=channel,
-                bot_data=bot_data,
-                message_id_key="points_leaderboard_message_id",
-                embed=await commands_cog.get_points_leaderboard_embed(),
-                pin=True
-            )
-            await self.bot.manage_periodic_message(
-                channel=channel,
-                bot_data=bot_data,
-                message_id_key="referral_leaderboard_message_id",
-                embed=await commands_cog.get_referral_leaderboard_embed(),
-                pin=True
-            )
-            await self.bot.manage_periodic_message(
-                channel=channel,
-                bot_data=bot_data,
-                message_id_key="xp_leaderboard_message_id",
-                embed=await commands_cog.get_xp_leaderboard_embed(),
-                pin=True
-            )
-
-            await self.bot.save_single_json(self.bot, "bot_data", "main", bot_data)
-            logger.info("✅ All leaderboards updated successfully.")
+            embed = await getattr(commands_cog, embed_method)()
+            if await self.bot.live_embeds.publish(channel, message_id_key, embed, pin=True):
+                logger.info(f"✅ Leaderboard '{message_id_key}' updated successfully.")
+            await self.bot.live_embeds.flush()
         except discord.Forbidden:
             logger.error("Bot is missing permissions to send, edit, or pin messages in the leaderboard channel.")
         except Exception as e:
             logger.error(f"❌ An unexpected error occurred in the leaderboard update task: {e}")
 
-    @tasks.loop(hours=168)
     async def weekly_xp_bonus(self):
-        await self.bot.wait_until_ready()
         logger.info("Starting weekly XP bonus award.")
         guild = self.bot.get_guild(config.SERVER_ID)
         if not guild:
             logger.error("Error: Server not found. Cannot award weekly XP bonus.")
             return
 
-        users_points = await self.bot.load_all_json(self.bot, "users_points")
-        user_xp = await self.bot.load_all_json(self.bot, "user_xp")
-        admin_points = await self.bot.load_single_json(self.bot, "admin_points", "main", {})
-
-        eligible = {}
-        allowed_roles = [config.ADMIN_ROLE_ID, config.MOD_ROLE_ID]
-        for uid, data in user_xp.items():
-            xp_val = data.get("xp", 0) if isinstance(data, dict) else data
-            if xp_val >= 500:
-                member = guild.get_member(int(uid))
-                if member and not any(role.id in allowed_roles for role in member.roles):
-                    eligible[uid] = xp_val
-        top_users = sorted(eligible.items(), key=lambda x: x[1], reverse=True)[:3]
+        # Rank by XP earned over the last 7 days; the index already excludes admins and mods
+        weekly_xp = self.bot.xp_windows.index("weekly")
+        top_users = [(uid, xp_val) for uid, xp_val in weekly_xp.top(3) if xp_val >= 500]
 
         if not top_users:
             logger.info("No eligible users for weekly XP bonus this week.")
             return
 
         points_to_award_per_user = 200
-        total_points_to_award = len(top_users) * points_to_award_per_user
-
-        if admin_points.get("balance", 0) < total_points_to_award:
+        result = await self.bot.award_points({uid: points_to_award_per_user for uid, _ in top_users},
+                                             "Weekly XP bonus")
+        if result["status"] == "insufficient":
             logger.warning("⚠️ Admin balance is too low to award weekly XP bonus. Skipping.")
             return
-
-        commands_cog = self.bot.get_cog("AdminCommands")
-        if not commands_cog:
-            logger.error("❌ AdminCommands cog not found. Cannot log transactions.")
+        if result["status"] != "ok":
+            logger.error("❌ Weekly XP bonus could not be awarded. Nothing was changed.")
             return
 
-        for uid, _ in top_users:
-            user_id = str(uid)
-            users_points.setdefault(user_id, {"all_time_points": 0.0, "available_points": 0.0})
-            users_points[user_id]["all_time_points"] += points_to_award_per_user
-            users_points[user_id]["available_points"] += points_to_award_per_user
-            await commands_cog.log_points_transaction(user_id, float(points_to_award_per_user), "Weekly XP bonus")
-
-        admin_points["balance"] -= total_points_to_award
-        admin_points["in_circulation"] += total_points_to_award
-
-        await self.bot.save_all_json(self.bot, "users_points", users_points)
-        await self.bot.save_single_json(self.bot, "admin_points", "main", admin_points)
-
         reward_channel = self.bot.get_channel(config.XP_REWARD_CHANNEL_ID)
         if reward_channel:
             mentions = []
@@ -207,64 +152,16 @@ class TasksCog(commands.Cog):
             logger.error(f"XP Reward Channel (ID: {config.XP_REWARD_CHANNEL_ID}) not found.")
         logger.info("Weekly XP bonus awarded.")
 
-    @tasks.loop(hours=168)
-    async def update_giveaway_winners_history(self):
-        await self.bot.wait_until_ready()
-
-        giveaway_winners_log = await self.bot.load_list_of_json(self.bot, "giveaway_logs")
-        all_time_giveaway_winners_log = await self.bot.load_list_of_json(self.bot, "all_time_giveaway_logs")
-
-        if not giveaway_winners_log:
-            logger.info("No new giveaway winners to update. Skipping.")
-            return
-
-        channel = self.bot.get_channel(config.GIVEAWAY_CHANNEL_ID)
-        if not channel:
-            logger.error(f"❌ Error: Giveaway channel with ID {config.GIVEAWAY_CHANNEL_ID} not found.")
-            return
-
-        all_time_giveaway_winners_log.extend(giveaway_winners_log)
-
-        embed = discord.Embed(
-            title="🎉 All-Time Giveaway Winners 🎉",
-            description="Here’s the full hall of fame for all giveaways so far 🏆",
-            color=discord.Color.gold()
-        )
-        for winner in all_time_giveaway_winners_log:
-            user = self.bot.get_user(int(winner['user_id']))
-            user_name = user.mention if user else f"User ID: {winner['user_id']}"
-            embed.add_field(
-                name=f"✨ {user_name}",
-                value=f"**{winner['points']:.2f} points** 🎁\n*Reason:* {winner['purpose']}",
-                inline=False
-            )
-        embed.set_footer(text="Updated automatically as giveaways happen 🚀")
-        embed.timestamp = datetime.now(UTC)
-
-        bot_data = await self.bot.load_single_json(self.bot, "bot_data", "main", {})
-        await self.bot.manage_periodic_message(
-            channel=channel,
-            bot_data=bot_data,
-            message_id_key="giveaway_history_message_id",
-            embed=embed,
-            pin=False
-        )
-        await self.bot.save_single_json(self.bot, "bot_data", "main", bot_data)
-
-        giveaway_winners_log.clear()
-        await self.bot.save_list_of_json(self.bot, "giveaway_logs", giveaway_winners_log)
-        await self.bot.save_list_of_json(self.bot, "all_time_giveaway_logs", all_time_giveaway_winners_log)
-        logger.info("✅ Giveaway history updated and temporary log cleared.")
-
-    @tasks.loop(hours=24)
-    async def reset_vip_posts(self):
-        await self.bot.wait_until_ready()
+    async def flush_xp(self):
         try:
-            vip_posts = {}
-            await self.bot.save_all_json(self.bot, "vip_posts", vip_posts)
-            logger.info("🔄 VIP post limit reset.")
+            flushed = await self.bot.xp_accumulator.flush()
+            if flushed:
+                logger.info(f"✅ Flushed pending XP for {flushed} user(s).")
+                self.bot.refresh_scheduler.mark_dirty("xp_leaderboard")
+            await self.bot.xp_windows.flush()
+            await self.bot.points_windows.flush()
         except Exception as e:
-            logger.error(f"❌ An error occurred during the VIP post reset task: {e}")
+            logger.error(f"❌ An error occurred during the XP flush task: {e}")
 
 async def setup(bot):
     await bot.add_cog(TasksCog(bot))
\ No newline at end of file
@@ -0,0 +1,142 @@
+import asyncio
+import time
+from collections import Counter
+from datetime import datetime, UTC
+
+import discord
+
+import config
+from logger import bot_logger as logger
+
+
+class AuditEvent:
+    """What the audit worker needs from a command context, captured without any awaits."""
+
+    __slots__ = ("command", "user_id", "user_name", "channel_id", "channel_name", "error", "at")
+
+    def __init__(self, ctx, error=None):
+        self.command = ctx.command.qualified_name if ctx.command else (ctx.invoked_with or "unknown")
+        self.user_id = ctx.author.id
+        self.user_name = ctx.author.name
+        self.channel_id = ctx.channel.id
+        self.channel_name = getattr(ctx.channel, "name", "DM")
+        self.error = f"{type(error).__name__}: {error}"[:1000] if error is not None else None
+        self.at = datetime.now(UTC)
+
+
+class CommandAuditQueue:
+    """
+    Command audit logging kept off the event dispatch path.
+
+    `record` only puts an event on a bounded queue; a background worker writes the log line,
+    builds the audit embed and hands it to the log pipeline. When the queue is full the
+    `COMMAND_AUDIT_OVERFLOW` policy drops either the oldest queued event or the new one, and
+    every dropped event is counted. Every `COMMAND_AUDIT_DIGEST_MINUTES` a digest of command
+    usage, errors and drops is posted to the command log channel.
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.queue = asyncio.Queue(maxsize=config.COMMAND_AUDIT_QUEUE_SIZE)
+        self.recorded = 0
+        self.processed = 0
+        self.dropped = 0
+        self.dropped_total = 0
+        self.commands = Counter()
+        self.errors = Counter()
+        self.digest_started = datetime.now(UTC)
+        self._next_digest = time.monotonic() + config.COMMAND_AUDIT_DIGEST_MINUTES * 60
+        self._worker = None
+
+    def record(self, ctx, error=None):
+        event = AuditEvent(ctx, error)
+        self.recorded += 1
+        if self.queue.full():
+            self.dropped += 1
+            self.dropped_total += 1
+            if config.COMMAND_AUDIT_OVERFLOW == "drop_newest":
+                return
+            self.queue.get_nowait()
+        self.queue.put_nowait(event)
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run())
+
+    async def _run(self):
+        while True:
+            timeout = max(self._next_digest - time.monotonic(), 0.0)
+            try:
+                event = await asyncio.wait_for(self.queue.get(), timeout=timeout)
+            except asyncio.TimeoutError:
+                self._post_digest()
+                continue
+            try:
+                self._process(event)
+            except Exception as e:
+                logger.error(f"❌ Failed to process command audit event: {e}", exc_info=True)
+
+    def _process(self, event: AuditEvent):
+        self.processed += 1
+        if event.error is None:
+            self.commands[event.command] += 1
+            logger.info(
+                f"Command '{event.command}' executed by {event.user_name} "
+                f"(ID: {event.user_id}) in channel {event.channel_name}."
+            )
+            embed = discord.Embed(
+                title="Command Executed",
+                description=f"**User:** <@{event.user_id}>\n"
+                            f"**Command:** `{event.command}`\n"
+                            f"**Channel:** <#{event.channel_id}>",
+                color=discord.Color.blue()
+            )
+        else:
+            self.errors[event.command] += 1
+            embed = discord.Embed(
+                title="Command Failed",
+                description=f"**User:** <@{event.user_id}>\n"
+                            f"**Command:** `{event.command}`\n"
+                            f"**Channel:** <#{event.channel_id}>\n"
+                            f"**Error:** {event.error}",
+                color=discord.Color.red()
+            )
+        embed.set_footer(text=f"User ID: {event.user_id}")
+        embed.timestamp = event.at
+        self.bot.log_pipeline.post(config.COMMAND_LOG_CHANNEL_ID, embed)
+
+    def _post_digest(self):
+        self._next_digest = time.monotonic() + config.COMMAND_AUDIT_DIGEST_MINUTES * 60
+        if self.commands or self.errors or self.dropped:
+            top = "\n".join(f"`{name}` — {count:,}" for name, count in self.commands.most_common(10))
+            failing = "\n".join(f"`{name}` — {count:,}" for name, count in self.errors.most_common(10))
+            embed = discord.Embed(
+                title="📊 Command Audit Digest",
+                description=f"Since {discord.utils.format_dt(self.digest_started, 'f')}: "
+                            f"**{sum(self.commands.values()):,}** commands, "
+                            f"**{sum(self.errors.values()):,}** errors, "
+                            f"**{self.dropped:,}** audit events dropped.",
+                color=discord.Color.dark_blue()
+            )
+            embed.add_field(name="Most Used", value=top or "None", inline=False)
+            embed.add_field(name="Most Errors", value=failing or "None", inline=False)
+            embed.timestamp = datetime.now(UTC)
+            self.bot.log_pipeline.post(config.COMMAND_LOG_CHANNEL_ID, embed)
+        self.commands.clear()
+        self.errors.clear()
+        self.dropped = 0
+        self.digest_started = datetime.now(UTC)
+
+    async def close(self):
+        """Hands every queued event to the log pipeline, e.g. before logging out."""
+        if self._worker is not None:
+            self._worker.cancel()
+            self._worker = None
+        while not self.queue.empty():
+            self._process(self.queue.get_nowait())
+
+    def stats(self):
+        return {
+            "pending": self.queue.qsize(),
+            "recorded": self.recorded,
+            "processed": self.processed,
+            "dropped": self.dropped_total,
+        }
@@ -69,6 +69,70 @@ NEW_MEMBER_POINTS_PER_ROLE = {
     1399095296725614673: 1500.0,
     1399077199109423125: 2000.0
 }
+# During join bursts, joins within this window are diffed against a single invite fetch.
+INVITE_JOIN_COALESCE_SECONDS = 2
+# Joins within the window that switch on burst mode, and how often burst batches are processed.
+JOIN_BURST_THRESHOLD = 10
+JOIN_BURST_WINDOW_SECONDS = 60
+JOIN_BURST_BATCH_SECONDS = 5
+
+# --- XP Configuration ---
+XP_FLUSH_INTERVAL_SECONDS = 30
+
+# --- Scheduler Configuration ---
+SCHEDULER_MAX_CONCURRENCY = 2
+# Scheduled runs start up to this many seconds late, so jobs that share an interval do not fire together.
+SCHEDULER_JITTER_SECONDS = 300
+
+# --- Leaderboard Windows ---
+# Rolling windows (in days) served from daily score buckets, alongside the all-time rankings.
+LEADERBOARD_WINDOWS = {"daily": 1, "weekly": 7, "monthly": 30}
+LEADERBOARD_PAGE_SIZE = 10
+# Paginated leaderboards share one ranking snapshot for this long before it is taken again.
+LEADERBOARD_SNAPSHOT_TTL_SECONDS = 30
+LEADERBOARD_VIEW_TIMEOUT_SECONDS = 180
+# Live leaderboard/economy messages refresh when their data changes, at most once per board this often.
+BOARD_REFRESH_MIN_INTERVAL_SECONDS = 30
+
+# --- Log Channel Pipeline ---
+# Log embeds are batched per channel: sent when 10 are queued or this long after the first one.
+LOG_BATCH_INTERVAL_SECONDS = 2
+LOG_MIN_SEND_INTERVAL_SECONDS = 1.0
+LOG_QUEUE_MAX_PENDING = 500
+# Post log batches through a per-channel webhook (needs Manage Webhooks), falling back to normal sends.
+LOG_USE_WEBHOOKS = False
+LOG_WEBHOOK_NAME = "1stBot Logs"
+# Command audit events wait here for the background audit worker.
+COMMAND_AUDIT_QUEUE_SIZE = 1000
+# "drop_oldest" or "drop_newest" once the audit queue is full.
+COMMAND_AUDIT_OVERFLOW = "drop_oldest"
+COMMAND_AUDIT_DIGEST_MINUTES = 60
+
+# --- Database ---
+# Queries slower than this are kept in a ring buffer with their EXPLAIN plan (see !slowqueries).
+SLOW_QUERY_THRESHOLD_MS = 250
+SLOW_QUERY_BUFFER_SIZE = 50
+SLOW_QUERY_EXPLAIN_COOLDOWN = 60.0
+# Worker threads for database calls, and how many calls each lane may queue before new ones are rejected.
+DB_EXECUTOR_WORKERS = 8
+DB_QUEUE_MAX_INTERACTIVE = 200
+DB_QUEUE_MAX_BACKGROUND = 50
+
+# --- Gateway & Caches ---
+# Lean mode drops the presence intent and voice states from the member cache.
+# The bot only reads member IDs, roles and names, so nothing depends on them.
+LEAN_MEMBER_CACHE = True
+# Run the bot as an AutoShardedBot. SHARD_COUNT = None uses the shard count Discord recommends.
+AUTO_SHARDING = False
+SHARD_COUNT = None
+
+# --- Notification Outbox ---
+# Notifications committed with economy changes are delivered in the background and retried with backoff.
+OUTBOX_POLL_SECONDS = 30
+OUTBOX_BATCH_SIZE = 20
+OUTBOX_MAX_ATTEMPTS = 8
+OUTBOX_RETRY_BASE_SECONDS = 5
+OUTBOX_RETRY_MAX_SECONDS = 600
 
 # --- Reaction Award Feature ---
 REACTION_CATEGORY_IDS = [1399082427338592336, 1400397422450184223]
@@ -76,6 +140,8 @@ REACTION_EMOJI = "🌟"
 MIN_REACTION_POINTS = 50.0
 MAX_REACTION_POINTS = 150.0
 MAX_WINNERS_HISTORY = 50
+# Giveaway winners per hall-of-fame message (Discord allows at most 25 embed fields).
+HALL_OF_FAME_PAGE_SIZE = 20
 
 # --- Static Configurations ---
 POINT_VALUES = {"like": 20, "retweet": 30, "comment": 15}
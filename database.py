@@ -1,11 +1,17 @@
 import os
 import json
+import functools
+import time
+import threading
+from collections import deque
 import psycopg2
 from psycopg2 import sql
 from psycopg2.extras import RealDictCursor
-from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, UTC
 
+from db_executor import PriorityExecutor, DatabaseBusy, db_busy_raises
+import config
+
 try:
     from logger import bot_logger as logger
 except ImportError:
@@ -14,10 +20,22 @@ except ImportError:
     logger = logging.getLogger("bot")
     logging.basicConfig(level=logging.INFO)
 
-executor = ThreadPoolExecutor()
+# --- Database Executor ---
+# Every database call runs on this pool; interactive calls are served before background ones,
+# and a call to a full lane is rejected instead of waiting (see _run_db).
+executor = PriorityExecutor(
+    max_workers=config.DB_EXECUTOR_WORKERS,
+    max_interactive=config.DB_QUEUE_MAX_INTERACTIVE,
+    max_background=config.DB_QUEUE_MAX_BACKGROUND,
+)
 
 DATABASE_URL = os.environ.get("DATABASE_URL")
 
+# --- Slow Query Capture ---
+_slow_queries = deque(maxlen=config.SLOW_QUERY_BUFFER_SIZE)
+_slow_queries_lock = threading.Lock()
+_last_explained = {}
+
 
 def _get_db_connection():
     if not DATABASE_URL:
@@ -30,6 +48,120 @@ def _get_db_connection():
         return None
 
 
+def _param_shape(params):
+    """Describes query parameters by type and size, without exposing their values."""
+    shape = []
+    for param in params or ():
+        if param is None:
+            shape.append("None")
+        elif isinstance(param, (str, bytes, list, tuple, set, dict)):
+            shape.append(f"{type(param).__name__}[{len(param)}]")
+        else:
+            shape.append(type(param).__name__)
+    return shape
+
+
+def _explain_plan(conn, query, params):
+    """
+    Runs EXPLAIN (ANALYZE, BUFFERS) for a statement inside a savepoint that is always rolled back,
+    so writes are never applied twice. Falls back to a plain EXPLAIN if the analyzed run fails.
+    """
+    statement = query if isinstance(query, sql.Composable) else sql.SQL(query)
+    cur = conn.cursor()
+    try:
+        for prefix in ("EXPLAIN (ANALYZE, BUFFERS) ", "EXPLAIN "):
+            cur.execute("SAVEPOINT slow_query_explain;")
+            try:
+                cur.execute(sql.SQL(prefix) + statement, params)
+                return "\n".join(row["QUERY PLAN"] for row in cur.fetchall())
+            except psycopg2.Error as e:
+                logger.warning(f"⚠️ Could not capture plan with '{prefix.strip()}': {e}")
+            finally:
+                cur.execute("ROLLBACK TO SAVEPOINT slow_query_explain;")
+        return None
+    finally:
+        cur.close()
+
+
+def _record_slow_query(cur, query, params, duration_ms, batch_size=None):
+    statement = query.as_string(cur.connection) if isinstance(query, sql.Composable) else query
+    statement = " ".join(statement.split())
+
+    now = time.monotonic()
+    with _slow_queries_lock:
+        explain = now - _last_explained.get(statement, float("-inf")) >= config.SLOW_QUERY_EXPLAIN_COOLDOWN
+        if explain:
+            _last_explained[statement] = now
+
+    plan = None
+    if explain:
+        try:
+            plan = _explain_plan(cur.connection, query, params)
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to capture plan for slow query: {e}")
+
+    entry = {
+        "timestamp": datetime.now(UTC).isoformat(),
+        "duration_ms": round(duration_ms, 2),
+        "statement": statement,
+        "params": _param_shape(params),
+        "batch_size": batch_size,
+        "plan": plan
+    }
+    with _slow_queries_lock:
+        _slow_queries.append(entry)
+    logger.warning(f"🐢 Slow query ({duration_ms:.1f} ms): {statement[:200]}")
+
+
+def _execute(cur, query, params=None):
+    """Executes a statement, capturing it in the slow-query buffer if it exceeds the threshold."""
+    start = time.perf_counter()
+    cur.execute(query, params)
+    duration_ms = (time.perf_counter() - start) * 1000
+    if duration_ms >= config.SLOW_QUERY_THRESHOLD_MS:
+        _record_slow_query(cur, query, params, duration_ms)
+
+
+def _execute_batch(cur, query, records):
+    """Batched counterpart of _execute; the plan is captured using the first record."""
+    start = time.perf_counter()
+    psycopg2.extras.execute_batch(cur, query, records)
+    duration_ms = (time.perf_counter() - start) * 1000
+    if duration_ms >= config.SLOW_QUERY_THRESHOLD_MS and records:
+        _record_slow_query(cur, query, records[0], duration_ms, batch_size=len(records))
+
+
+def _execute_values(cur, query, records, fetch=False):
+    """
+    Multi-row VALUES counterpart of _execute; the plan is captured using the first record.
+    Returns the fetched rows when `fetch` is True.
+    """
+    start = time.perf_counter()
+    rows = psycopg2.extras.execute_values(cur, query, records, page_size=max(len(records), 1), fetch=fetch)
+    duration_ms = (time.perf_counter() - start) * 1000
+    if duration_ms >= config.SLOW_QUERY_THRESHOLD_MS and records:
+        # A single tuple parameter renders as one "(...)" row for the VALUES %s placeholder.
+        _record_slow_query(cur, query, (tuple(records[0]),), duration_ms, batch_size=len(records))
+    return rows
+
+
+def get_slow_queries(limit: int = None):
+    """Returns captured slow queries, newest first."""
+    with _slow_queries_lock:
+        entries = list(reversed(_slow_queries))
+    return entries[:limit] if limit else entries
+
+
+def clear_slow_queries():
+    with _slow_queries_lock:
+        _slow_queries.clear()
+
+
+def get_db_queue_stats():
+    """Returns depth, rejections and queue-wait statistics for each executor lane."""
+    return executor.stats()
+
+
 def _init_db_sync():
     conn = _get_db_connection()
     if not conn: return
@@ -140,6 +272,16 @@ def _init_db_sync():
                         data JSONB
                     );
                     """)
+        cur.execute("""
+                    CREATE TABLE IF NOT EXISTS score_buckets
+                    (
+                        metric  TEXT    NOT NULL,
+                        bucket  DATE    NOT NULL,
+                        user_id TEXT    NOT NULL,
+                        amount  NUMERIC NOT NULL DEFAULT 0,
+                        PRIMARY KEY (metric, bucket, user_id)
+                    );
+                    """)
         cur.execute("""
                     CREATE TABLE IF NOT EXISTS approved_proofs
                     (
@@ -166,6 +308,42 @@ def _init_db_sync():
                         user_id TEXT PRIMARY KEY
                     );
                     """)
+        cur.execute("""
+                    CREATE TABLE IF NOT EXISTS vip_post_counts
+                    (
+                        user_id   TEXT    NOT NULL,
+                        post_date DATE    NOT NULL,
+                        count     INTEGER NOT NULL DEFAULT 0,
+                        PRIMARY KEY (user_id, post_date)
+                    );
+                    """)
+        cur.execute("""
+                    CREATE TABLE IF NOT EXISTS scheduled_jobs
+                    (
+                        name             TEXT PRIMARY KEY,
+                        next_run         TIMESTAMPTZ,
+                        last_run         TIMESTAMPTZ,
+                        last_duration_ms DOUBLE PRECISION,
+                        runs             BIGINT NOT NULL DEFAULT 0,
+                        failures         BIGINT NOT NULL DEFAULT 0,
+                        last_error       TEXT
+                    );
+                    """)
+        cur.execute("""
+                    CREATE TABLE IF NOT EXISTS outbox
+                    (
+                        id           BIGSERIAL PRIMARY KEY,
+                        channel_id   BIGINT      NOT NULL,
+                        content      TEXT,
+                        embed        JSONB,
+                        attempts     INTEGER     NOT NULL DEFAULT 0,
+                        next_attempt TIMESTAMPTZ DEFAULT now(),
+                        last_error   TEXT,
+                        created_at   TIMESTAMPTZ NOT NULL DEFAULT now()
+                    );
+                    """)
+        cur.execute("CREATE INDEX IF NOT EXISTS outbox_due_idx ON outbox (next_attempt) "
+                    "WHERE next_attempt IS NOT NULL;")
 
         conn.commit()
         cur.close()
@@ -189,7 +367,7 @@ def _save_single_json_sync(table_name: str, key: str, data: dict):
                         DO UPDATE
                         SET data = EXCLUDED.data;
                         """).format(table=sql.Identifier(table_name), pk_column=sql.Identifier(pk_column))
-        cur.execute(query, (key, json.dumps(data)))
+        _execute(cur, query, (key, json.dumps(data)))
         conn.commit()
         cur.close()
         logger.info(f"✅ Data saved to '{table_name}' with key '{key}'.")
@@ -209,7 +387,7 @@ def _load_single_json_sync(table_name: str, key: str, default_value=None):
         query = sql.SQL("SELECT data FROM {table} WHERE {pk_column} = %s;").format(
             table=sql.Identifier(table_name), pk_column=sql.Identifier(pk_column)
         )
-        cur.execute(query, (key,))
+        _execute(cur, query, (key,))
         row = cur.fetchone()
         cur.close()
         if row and row['data'] is not None:
@@ -231,7 +409,7 @@ def _save_all_json_sync(table_name: str, data_dict: dict):
                                                 'gm_log', 'quest_submissions', 'submissions'] else 'key'
 
         delete_query = sql.SQL("DELETE FROM {table};").format(table=sql.Identifier(table_name))
-        cur.execute(delete_query)
+        _execute(cur, delete_query)
 
         if data_dict:
             insert_query = sql.SQL("""
@@ -243,7 +421,7 @@ def _save_all_json_sync(table_name: str, data_dict: dict):
                 (key, json.dumps(value)) for key, value in data_dict.items()
             ]
 
-            psycopg2.extras.execute_batch(cur, insert_query, records_to_insert)
+            _execute_batch(cur, insert_query, records_to_insert)
 
         conn.commit()
         cur.close()
@@ -264,7 +442,7 @@ def _load_all_json_sync(table_name: str):
         query = sql.SQL("SELECT {pk_column}, data FROM {table};").format(
             table=sql.Identifier(table_name), pk_column=sql.Identifier(pk_column)
         )
-        cur.execute(query)
+        _execute(cur, query)
         rows = cur.fetchall()
         cur.close()
         data_dict = {row[pk_column]: row['data'] for row in rows}
@@ -276,13 +454,411 @@ def _load_all_json_sync(table_name: str):
         if conn: conn.close()
 
 
+def _increment_json_field_sync(table_name: str, field: str, deltas: dict) -> bool:
+    """Adds each delta to a numeric JSONB field server-side, creating missing rows, in a single transaction."""
+    conn = _get_db_connection()
+    if not conn: return False
+    try:
+        cur = conn.cursor()
+        pk_column = 'user_id' if table_name in ['users_points', 'user_xp', 'referral_data', 'pending_referrals',
+                                                'gm_log', 'quest_submissions', 'submissions'] else 'key'
+        query = sql.SQL("""
+                        INSERT INTO {table} ({pk_column}, data)
+                        VALUES (%s, jsonb_build_object({field}, %s)) ON CONFLICT ({pk_column})
+                        DO UPDATE
+                        SET data = jsonb_set(
+                            COALESCE({table}.data, '{{}}'::jsonb),
+                            ARRAY[{field}],
+                            to_jsonb(COALESCE(({table}.data ->> {field})::numeric, 0)
+                                     + (EXCLUDED.data ->> {field})::numeric)
+                        );
+                        """).format(table=sql.Identifier(table_name), pk_column=sql.Identifier(pk_column),
+                                    field=sql.Literal(field))
+        records = [(key, delta) for key, delta in deltas.items()]
+        if records:
+            _execute_batch(cur, query, records)
+        conn.commit()
+        cur.close()
+        logger.info(f"✅ Incremented '{field}' for {len(records)} row(s) in '{table_name}'.")
+        return True
+    except Exception as e:
+        logger.error(f"❌ _increment_json_field_sync on '{table_name}' failed: {e}")
+        return False
+    finally:
+        if conn: conn.close()
+
+
+def _increment_score_buckets_sync(metric: str, buckets: dict) -> bool:
+    """Adds {bucket_date: {user_id: amount}} to the daily score buckets of a metric in a single transaction."""
+    conn = _get_db_connection()
+    if not conn: return False
+    try:
+        cur = conn.cursor()
+        query = """
+                INSERT INTO score_buckets (metric, bucket, user_id, amount)
+                VALUES (%s, %s, %s, %s) ON CONFLICT (metric, bucket, user_id)
+                DO UPDATE SET amount = score_buckets.amount + EXCLUDED.amount;
+                """
+        records = [(metric, bucket, user_id, amount)
+                   for bucket, scores in buckets.items() for user_id, amount in scores.items()]
+        if records:
+            _execute_batch(cur, query, records)
+        conn.commit()
+        cur.close()
+        return True
+    except Exception as e:
+        logger.error(f"❌ _increment_score_buckets_sync for '{metric}' failed: {e}")
+        return False
+    finally:
+        if conn: conn.close()
+
+
+def _load_score_buckets_sync(metric: str, since):
+    """Returns {bucket_date: {user_id: amount}} for every bucket of a metric from `since` onwards."""
+    conn = _get_db_connection()
+    if not conn: return {}
+    try:
+        cur = conn.cursor()
+        _execute(cur, "SELECT bucket, user_id, amount FROM score_buckets WHERE metric = %s AND bucket >= %s;",
+                 (metric, since))
+        rows = cur.fetchall()
+        cur.close()
+        buckets = {}
+        for row in rows:
+            buckets.setdefault(row['bucket'], {})[row['user_id']] = float(row['amount'])
+        return buckets
+    except Exception as e:
+        logger.error(f"❌ _load_score_buckets_sync for '{metric}' failed: {e}")
+        return {}
+    finally:
+        if conn: conn.close()
+
+
+def _prune_score_buckets_sync(metric: str, before):
+    conn = _get_db_connection()
+    if not conn: return
+    try:
+        cur = conn.cursor()
+        _execute(cur, "DELETE FROM score_buckets WHERE metric = %s AND bucket < %s;", (metric, before))
+        conn.commit()
+        cur.close()
+    except Exception as e:
+        logger.error(f"❌ _prune_score_buckets_sync for '{metric}' failed: {e}")
+    finally:
+        if conn: conn.close()
+
+
+def _load_scheduled_jobs_sync():
+    """Returns the persisted state of every scheduled job, keyed by job name."""
+    conn = _get_db_connection()
+    if not conn: return {}
+    try:
+        cur = conn.cursor()
+        _execute(cur, "SELECT name, next_run, last_run, last_duration_ms, runs, failures, last_error "
+                      "FROM scheduled_jobs;")
+        rows = cur.fetchall()
+        cur.close()
+        return {row['name']: dict(row) for row in rows}
+    except Exception as e:
+        logger.error(f"❌ _load_scheduled_jobs_sync failed: {e}")
+        return {}
+    finally:
+        if conn: conn.close()
+
+
+def _save_scheduled_job_sync(state: dict):
+    conn = _get_db_connection()
+    if not conn: return
+    try:
+        cur = conn.cursor()
+        query = """
+                INSERT INTO scheduled_jobs (name, next_run, last_run, last_duration_ms, runs, failures, last_error)
+                VALUES (%(name)s, %(next_run)s, %(last_run)s, %(last_duration_ms)s, %(runs)s, %(failures)s,
+                        %(last_error)s) ON CONFLICT (name)
+                DO UPDATE SET next_run = EXCLUDED.next_run, last_run = EXCLUDED.last_run,
+                              last_duration_ms = EXCLUDED.last_duration_ms, runs = EXCLUDED.runs,
+                              failures = EXCLUDED.failures, last_error = EXCLUDED.last_error;
+                """
+        _execute(cur, query, state)
+        conn.commit()
+        cur.close()
+    except Exception as e:
+        logger.error(f"❌ _save_scheduled_job_sync for '{state.get('name')}' failed: {e}")
+    finally:
+        if conn: conn.close()
+
+
+def _increment_vip_post_count_sync(user_id: str, post_date):
+    """
+    Atomically counts one post for a user on a date and returns the new count, or None on failure.
+    Counters from earlier dates are deleted in the same statement, so they expire without a reset job.
+    """
+    conn = _get_db_connection()
+    if not conn: return None
+    try:
+        cur = conn.cursor()
+        _execute(cur, """
+                      WITH expired AS (DELETE FROM vip_post_counts WHERE post_date < %(post_date)s)
+                      INSERT INTO vip_post_counts (user_id, post_date, count)
+                      VALUES (%(user_id)s, %(post_date)s, 1) ON CONFLICT (user_id, post_date)
+                      DO UPDATE SET count = vip_post_counts.count + 1
+                      RETURNING count;
+                      """, {"user_id": user_id, "post_date": post_date})
+        count = cur.fetchone()['count']
+        conn.commit()
+        cur.close()
+        return count
+    except Exception as e:
+        logger.error(f"❌ _increment_vip_post_count_sync failed: {e}")
+        return None
+    finally:
+        if conn: conn.close()
+
+
+def _award_points_sync(awards: dict, purpose: str, giveaway: bool = False) -> dict:
+    """
+    Credits {user_id: amount} from the admin balance in a single transaction: the balance is checked
+    once under a row lock, every user is credited with one multi-row upsert, and one ledger row per
+    user is written in a single batch (plus hall-of-fame rows when `giveaway` is set).
+
+    Returns {"status": "ok", "all_time_points": {user_id: total}, "admin_points": {...}},
+    or {"status": "insufficient" | "error"}.
+    """
+    conn = _get_db_connection()
+    if not conn: return {"status": "error"}
+    try:
+        cur = conn.cursor()
+        total = sum(awards.values())
+
+        _execute(cur, "SELECT data FROM admin_points WHERE key = 'main' FOR UPDATE;")
+        row = cur.fetchone()
+        admin_points = row['data'] if row and row['data'] else {}
+        if admin_points.get("balance", 0) < total:
+            conn.rollback()
+            return {"status": "insufficient", "admin_points": admin_points}
+
+        rows = _execute_values(cur, """
+                               INSERT INTO users_points (user_id, data)
+                               VALUES %s ON CONFLICT (user_id)
+                               DO UPDATE
+                               SET data = COALESCE(users_points.data, '{}'::jsonb) || jsonb_build_object(
+                                   'all_time_points', COALESCE((users_points.data ->> 'all_time_points')::numeric, 0)
+                                                      + (EXCLUDED.data ->> 'all_time_points')::numeric,
+                                   'available_points', COALESCE((users_points.data ->> 'available_points')::numeric, 0)
+                                                       + (EXCLUDED.data ->> 'available_points')::numeric)
+                               RETURNING user_id, data;
+                               """,
+                               [(user_id, json.dumps({"all_time_points": amount, "available_points": amount}))
+                                for user_id, amount in awards.items()],
+                               fetch=True)
+        all_time_points = {row['user_id']: float(row['data']['all_time_points']) for row in rows}
+
+        admin_points["balance"] = admin_points.get("balance", 0) - total
+        admin_points["in_circulation"] = admin_points.get("in_circulation", 0) + total
+        _execute(cur, "UPDATE admin_points SET data = %s WHERE key = 'main';", (json.dumps(admin_points),))
+
+        timestamp = datetime.now(UTC).isoformat()
+        ledger = [(json.dumps({"user_id": user_id, "amount": amount, "purpose": purpose, "timestamp": timestamp}),)
+                  for user_id, amount in awards.items()]
+        _execute_values(cur, "INSERT INTO points_history (data) VALUES %s;", ledger)
+        if giveaway:
+            winners = [(json.dumps({"user_id": user_id, "points": amount, "purpose": purpose, "timestamp": timestamp}),)
+                       for user_id, amount in awards.items()]
+            _execute_values(cur, "INSERT INTO all_time_giveaway_logs (data) VALUES %s;", winners)
+
+        conn.commit()
+        cur.close()
+        logger.info(f"✅ Awarded {total:.2f} points to {len(awards)} user(s) for {purpose}.")
+        return {"status": "ok", "all_time_points": all_time_points, "admin_points": admin_points}
+    except Exception as e:
+        conn.rollback()
+        logger.error(f"❌ _award_points_sync failed: {e}")
+        return {"status": "error"}
+    finally:
+        if conn: conn.close()
+
+
+def _commit_economy_change_sync(user_id: str, user_deltas: dict, admin_deltas: dict, notifications: list,
+                                remove_keys=(), ledger=None, delete_submission=False, approved_proofs=(),
+                                expect=None) -> dict:
+    """
+    Applies one user's economy change and queues its Discord notifications in a single transaction.
+
+    The user's row and the admin row are locked, the deltas applied and `remove_keys` dropped from
+    the user's data. The change is refused if either balance would go negative, or if `expect`
+    ({key: value}) no longer matches the user's locked data, e.g. a request another moderator
+    already finalized. `ledger` is an
+    optional (amount, purpose) points_history entry. `notifications` are outbox rows
+    ({"channel_id", "content", "embed"}) that the outbox dispatcher sends after the commit, so a
+    crash can never leave a change committed without its notifications.
+
+    Returns {"status": "ok", "user": {...}, "admin_points": {...}}, or {"status": "insufficient" | "stale" | "error"}.
+    """
+    conn = _get_db_connection()
+    if not conn: return {"status": "error"}
+    try:
+        cur = conn.cursor()
+
+        user = None
+        if user_deltas or remove_keys or expect:
+            _execute(cur, "SELECT data FROM users_points WHERE user_id = %s FOR UPDATE;", (user_id,))
+            row = cur.fetchone()
+            user = row['data'] if row and row['data'] else {"all_time_points": 0.0, "available_points": 0.0}
+            if expect and any(user.get(key) != value for key, value in expect.items()):
+                conn.rollback()
+                return {"status": "stale"}
+            for field, delta in user_deltas.items():
+                user[field] = user.get(field, 0.0) + delta
+            for key in remove_keys:
+                user.pop(key, None)
+
+        admin_points = None
+        if admin_deltas:
+            _execute(cur, "SELECT data FROM admin_points WHERE key = 'main' FOR UPDATE;")
+            row = cur.fetchone()
+            admin_points = row['data'] if row and row['data'] else {}
+            for field, delta in admin_deltas.items():
+                admin_points[field] = admin_points.get(field, 0.0) + delta
+
+        if (user and user.get("available_points", 0.0) < 0) or \
+                (admin_points and admin_points.get("balance", 0.0) < 0):
+            conn.rollback()
+            return {"status": "insufficient"}
+
+        if user is not None:
+            _execute(cur, """
+                     INSERT INTO users_points (user_id, data)
+                     VALUES (%s, %s) ON CONFLICT (user_id)
+                     DO UPDATE SET data = EXCLUDED.data;
+                     """, (user_id, json.dumps(user)))
+        if admin_points is not None:
+            _execute(cur, "UPDATE admin_points SET data = %s WHERE key = 'main';", (json.dumps(admin_points),))
+        if ledger:
+            amount, purpose = ledger
+            _execute(cur, "INSERT INTO points_history (data) VALUES (%s);", (json.dumps({
+                "user_id": user_id, "amount": amount, "purpose": purpose, "timestamp": datetime.now(UTC).isoformat()
+            }),))
+        if delete_submission:
+            _execute(cur, "DELETE FROM submissions WHERE user_id = %s;", (user_id,))
+        if approved_proofs:
+            _execute_values(cur, "INSERT INTO approved_proofs (normalized_url) VALUES %s ON CONFLICT DO NOTHING;",
+                            [(url,) for url in approved_proofs])
+        if notifications:
+            _execute_values(cur, "INSERT INTO outbox (channel_id, content, embed) VALUES %s;",
+                            [(n["channel_id"], n.get("content"), json.dumps(n["embed"]) if n.get("embed") else None)
+                             for n in notifications])
+
+        conn.commit()
+        cur.close()
+        logger.info(f"✅ Economy change committed for user {user_id} with {len(notifications)} notification(s).")
+        return {"status": "ok", "user": user, "admin_points": admin_points}
+    except Exception as e:
+        conn.rollback()
+        logger.error(f"❌ _commit_economy_change_sync failed: {e}")
+        return {"status": "error"}
+    finally:
+        if conn: conn.close()
+
+
+def _load_due_outbox_sync(limit: int) -> list:
+    """Returns outbox messages that are due for a delivery attempt, oldest first."""
+    conn = _get_db_connection()
+    if not conn: return []
+    try:
+        cur = conn.cursor()
+        _execute(cur, "SELECT id, channel_id, content, embed, attempts FROM outbox "
+                      "WHERE next_attempt <= now() ORDER BY id LIMIT %s;", (limit,))
+        rows = cur.fetchall()
+        cur.close()
+        return [dict(row) for row in rows]
+    except Exception as e:
+        logger.error(f"❌ _load_due_outbox_sync failed: {e}")
+        return []
+    finally:
+        if conn: conn.close()
+
+
+def _complete_outbox_sync(message_id: int) -> bool:
+    conn = _get_db_connection()
+    if not conn: return False
+    try:
+        cur = conn.cursor()
+        _execute(cur, "DELETE FROM outbox WHERE id = %s;", (message_id,))
+        conn.commit()
+        cur.close()
+        return True
+    except Exception as e:
+        logger.error(f"❌ _complete_outbox_sync failed: {e}")
+        return False
+    finally:
+        if conn: conn.close()
+
+
+def _fail_outbox_sync(message_id: int, error: str, retry_at) -> bool:
+    """Records a failed attempt; a `retry_at` of None parks the message as undeliverable."""
+    conn = _get_db_connection()
+    if not conn: return False
+    try:
+        cur = conn.cursor()
+        _execute(cur, "UPDATE outbox SET attempts = attempts + 1, last_error = %s, next_attempt = %s "
+                      "WHERE id = %s;", (error[:500], retry_at, message_id))
+        conn.commit()
+        cur.close()
+        return True
+    except Exception as e:
+        logger.error(f"❌ _fail_outbox_sync failed: {e}")
+        return False
+    finally:
+        if conn: conn.close()
+
+
+def _filter_referred_users_sync(user_ids: list) -> set:
+    """Returns the subset of `user_ids` that has already been referred."""
+    conn = _get_db_connection()
+    if not conn: return set()
+    try:
+        cur = conn.cursor()
+        _execute(cur, "SELECT user_id FROM referred_users WHERE user_id = ANY(%s);", (list(user_ids),))
+        rows = cur.fetchall()
+        cur.close()
+        return {row['user_id'] for row in rows}
+    except Exception as e:
+        logger.error(f"❌ _filter_referred_users_sync failed: {e}")
+        return set()
+    finally:
+        if conn: conn.close()
+
+
+def _upsert_pending_referrals_sync(referrals: dict) -> bool:
+    """Writes {user_id: referrer_id} pending referrals with one multi-row upsert."""
+    conn = _get_db_connection()
+    if not conn: return False
+    try:
+        cur = conn.cursor()
+        records = [(user_id, json.dumps(referrer_id)) for user_id, referrer_id in referrals.items()]
+        if records:
+            _execute_values(cur, """
+                INSERT INTO pending_referrals (user_id, data) VALUES %s
+                ON CONFLICT (user_id) DO UPDATE SET data = EXCLUDED.data;
+            """, records)
+        conn.commit()
+        cur.close()
+        logger.info(f"✅ Saved {len(records)} pending referral(s).")
+        return True
+    except Exception as e:
+        logger.error(f"❌ _upsert_pending_referrals_sync failed: {e}")
+        return False
+    finally:
+        if conn: conn.close()
+
+
 def _save_list_values_sync(table_name: str, data_list: list, column_name: str):
     conn = _get_db_connection()
     if not conn: return
     try:
         cur = conn.cursor()
         delete_query = sql.SQL("DELETE FROM {table};").format(table=sql.Identifier(table_name))
-        cur.execute(delete_query)
+        _execute(cur, delete_query)
 
         if data_list:
             insert_query = sql.SQL("INSERT INTO {table} ({column_name}) VALUES (%s);").format(
@@ -290,7 +866,7 @@ def _save_list_values_sync(table_name: str, data_list: list, column_name: str):
                 column_name=sql.Identifier(column_name)
             )
             records_to_insert = [(item,) for item in data_list]
-            psycopg2.extras.execute_batch(cur, insert_query, records_to_insert)
+            _execute_batch(cur, insert_query, records_to_insert)
 
         conn.commit()
         cur.close()
@@ -310,7 +886,7 @@ def _load_list_values_sync(table_name: str, column_name: str):
             column_name=sql.Identifier(column_name),
             table=sql.Identifier(table_name)
         )
-        cur.execute(query)
+        _execute(cur, query)
         rows = cur.fetchall()
         cur.close()
         return [row[column_name] for row in rows]
@@ -327,7 +903,7 @@ def _save_list_of_json_sync(table_name: str, data_list: list):
     try:
         cur = conn.cursor()
         delete_query = sql.SQL("DELETE FROM {table};").format(table=sql.Identifier(table_name))
-        cur.execute(delete_query)
+        _execute(cur, delete_query)
 
         if data_list:
             insert_query = sql.SQL("""
@@ -339,7 +915,7 @@ def _save_list_of_json_sync(table_name: str, data_list: list):
                 (json.dumps(item),) for item in data_list
             ]
 
-            psycopg2.extras.execute_batch(cur, insert_query, records_to_insert)
+            _execute_batch(cur, insert_query, records_to_insert)
 
         conn.commit()
         cur.close()
@@ -350,13 +926,13 @@ def _save_list_of_json_sync(table_name: str, data_list: list):
         if conn: conn.close()
 
 
-def _load_list_of_json_sync(table_name: str):
+def _load_list_of_json_sync(table_name: str, offset: int = 0):
     conn = _get_db_connection()
     if not conn: return []
     try:
         cur = conn.cursor()
-        query = sql.SQL("SELECT data FROM {table};").format(table=sql.Identifier(table_name))
-        cur.execute(query)
+        query = sql.SQL("SELECT data FROM {table} ORDER BY id OFFSET %s;").format(table=sql.Identifier(table_name))
+        _execute(cur, query, (offset,))
         rows = cur.fetchall()
         cur.close()
         return [row['data'] for row in rows]
@@ -367,48 +943,122 @@ def _load_list_of_json_sync(table_name: str):
         if conn: conn.close()
 
 
+async def _run_db(bot, failure, func, *args):
+    """
+    Runs `func` on the database executor. When its lane is full, commands get DatabaseBusy so
+    they can ask the user to retry; every other caller gets `failure`, the same value the call
+    returns when the database itself fails, so its existing failure handling applies.
+    """
+    try:
+        return await bot.loop.run_in_executor(executor, func, *args)
+    except DatabaseBusy as e:
+        if db_busy_raises.get():
+            raise
+        logger.warning(f"⚠️ {e} Skipped {getattr(func, 'func', func).__name__}.")
+        return failure
+
+
 async def init_db(bot):
-    await bot.loop.run_in_executor(executor, _init_db_sync)
+    await _run_db(bot, None, _init_db_sync)
 
 
 async def load_single_json(bot, table_name: str, key: str, default_value=None):
-    return await bot.loop.run_in_executor(executor, _load_single_json_sync, table_name, key, default_value)
+    return await _run_db(bot, default_value, _load_single_json_sync, table_name, key, default_value)
 
 
 async def save_single_json(bot, table_name: str, key: str, data):
-    await bot.loop.run_in_executor(executor, _save_single_json_sync, table_name, key, data)
+    await _run_db(bot, None, _save_single_json_sync, table_name, key, data)
 
 
 async def load_all_json(bot, table_name: str):
-    return await bot.loop.run_in_executor(executor, _load_all_json_sync, table_name)
+    return await _run_db(bot, {}, _load_all_json_sync, table_name)
 
 
 async def save_all_json(bot, table_name: str, data_dict: dict):
-    await bot.loop.run_in_executor(executor, _save_all_json_sync, table_name, data_dict)
+    await _run_db(bot, None, _save_all_json_sync, table_name, data_dict)
+
+
+async def increment_json_field(bot, table_name: str, field: str, deltas: dict) -> bool:
+    return await _run_db(bot, False, _increment_json_field_sync, table_name, field, deltas)
+
+
+async def increment_score_buckets(bot, metric: str, buckets: dict) -> bool:
+    return await _run_db(bot, False, _increment_score_buckets_sync, metric, buckets)
+
+
+async def load_score_buckets(bot, metric: str, since):
+    return await _run_db(bot, {}, _load_score_buckets_sync, metric, since)
+
+
+async def prune_score_buckets(bot, metric: str, before):
+    await _run_db(bot, None, _prune_score_buckets_sync, metric, before)
+
+
+async def load_scheduled_jobs(bot):
+    return await _run_db(bot, {}, _load_scheduled_jobs_sync)
+
+
+async def save_scheduled_job(bot, state: dict):
+    await _run_db(bot, None, _save_scheduled_job_sync, state)
+
+
+async def increment_vip_post_count(bot, user_id: str, post_date):
+    return await _run_db(bot, None, _increment_vip_post_count_sync, user_id, post_date)
+
+
+async def award_points(bot, awards: dict, purpose: str, giveaway: bool = False) -> dict:
+    return await _run_db(bot, {"status": "error"}, _award_points_sync, awards, purpose, giveaway)
+
+
+async def commit_economy_change(bot, user_id: str, user_deltas: dict, admin_deltas: dict, notifications: list,
+                                **options) -> dict:
+    return await _run_db(bot, {"status": "error"}, functools.partial(
+        _commit_economy_change_sync, user_id, user_deltas, admin_deltas, notifications, **options))
+
+
+async def load_due_outbox(bot, limit: int) -> list:
+    return await _run_db(bot, [], _load_due_outbox_sync, limit)
+
+
+async def complete_outbox(bot, message_id: int) -> bool:
+    return await _run_db(bot, False, _complete_outbox_sync, message_id)
+
+
+async def fail_outbox(bot, message_id: int, error: str, retry_at) -> bool:
+    return await _run_db(bot, False, _fail_outbox_sync, message_id, error, retry_at)
+
+
+async def filter_referred_users(bot, user_ids: list) -> set:
+    return await _run_db(bot, set(), _filter_referred_users_sync, user_ids)
+
+
+async def upsert_pending_referrals(bot, referrals: dict) -> bool:
+    return await _run_db(bot, False, _upsert_pending_referrals_sync, referrals)
 
 
 async def load_list_values(bot, table_name: str, column_name: str):
-    return await bot.loop.run_in_executor(executor, _load_list_values_sync, table_name, column_name)
+    return await _run_db(bot, [], _load_list_values_sync, table_name, column_name)
 
 
 async def save_list_values(bot, table_name: str, data_list: list, column_name: str):
-    await bot.loop.run_in_executor(executor, _save_list_values_sync, table_name, data_list, column_name)
+    await _run_db(bot, None, _save_list_values_sync, table_name, data_list, column_name)
 
 
 async def save_list_of_json(bot, table_name: str, data_list: list):
-    await bot.loop.run_in_executor(executor, _save_list_of_json_sync, table_name, data_list)
+    await _run_db(bot, None, _save_list_of_json_sync, table_name, data_list)
 
 
-async def load_list_of_json(bot, table_name: str):
-    return await bot.loop.run_in_executor(executor, _load_list_of_json_sync, table_name)
+async def load_list_of_json(bot, table_name: str, offset: int = 0):
+    """Loads rows in insertion order, skipping the first `offset` rows."""
+    return await _run_db(bot, [], _load_list_of_json_sync, table_name, offset)
 
 
 async def approved_proof_exists(bot, normalized_url: str) -> bool:
-    conn = await bot.loop.run_in_executor(executor, _get_db_connection)
+    conn = await _run_db(bot, None, _get_db_connection)
     if not conn: return False
     try:
         cur = conn.cursor()
-        cur.execute("SELECT 1 FROM approved_proofs WHERE normalized_url = %s;", (normalized_url,))
+        _execute(cur, "SELECT 1 FROM approved_proofs WHERE normalized_url = %s;", (normalized_url,))
         exists = cur.fetchone() is not None
         cur.close()
         return exists
@@ -420,11 +1070,12 @@ async def approved_proof_exists(bot, normalized_url: str) -> bool:
 
 
 async def add_approved_proof(bot, normalized_url: str) -> bool:
-    conn = await bot.loop.run_in_executor(executor, _get_db_connection)
+    conn = await _run_db(bot, None, _get_db_connection)
     if not conn: return False
     try:
         cur = conn.cursor()
-        cur.execute(
+        _execute(
+            cur,
             "INSERT INTO approved_proofs (normalized_url) VALUES (%s) ON CONFLICT DO NOTHING;",
             (normalized_url,)
         )
@@ -440,11 +1091,12 @@ async def add_approved_proof(bot, normalized_url: str) -> bool:
 
 
 async def add_processed_reaction_if_new(bot, reaction_identifier: str) -> bool:
-    conn = await bot.loop.run_in_executor(executor, _get_db_connection)
+    conn = await _run_db(bot, None, _get_db_connection)
     if not conn: return False
     try:
         cur = conn.cursor()
-        cur.execute(
+        _execute(
+            cur,
             "INSERT INTO processed_reactions (reaction_identifier) VALUES (%s) ON CONFLICT DO NOTHING;",
             (reaction_identifier,)
         )
@@ -471,7 +1123,7 @@ def _log_points_transaction_sync(user_id: str, amount: float, purpose: str = Non
             "timestamp": datetime.now(UTC).isoformat()
         }
         query = sql.SQL("INSERT INTO points_history (data) VALUES (%s);").format()
-        cur.execute(query, (json.dumps(transaction_data),))
+        _execute(cur, query, (json.dumps(transaction_data),))
         conn.commit()
         cur.close()
         logger.info(f"✅ Transaction logged for user {user_id}: {amount} for {purpose}.")
@@ -482,4 +1134,4 @@ def _log_points_transaction_sync(user_id: str, amount: float, purpose: str = Non
 
 
 async def log_points_transaction(bot, user_id: str, amount: float, purpose: str = None):
-    await bot.loop.run_in_executor(executor, _log_points_transaction_sync, user_id, amount, purpose)
\ No newline at end of file
+    await _run_db(bot, None, _log_points_transaction_sync, user_id, amount, purpose)
\ No newline at end of file
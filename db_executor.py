@@ -0,0 +1,115 @@
+import contextvars
+import itertools
+import queue
+import threading
+import time
+from concurrent.futures import Executor, Future
+
+INTERACTIVE = 0
+BACKGROUND = 1
+LANE_NAMES = {INTERACTIVE: "interactive", BACKGROUND: "background"}
+
+# Database calls made while this is BACKGROUND (scheduled jobs, board refreshes) queue behind interactive ones.
+db_priority = contextvars.ContextVar("db_priority", default=INTERACTIVE)
+# Only commands can ask the user to retry, so only they see DatabaseBusy; the bot sets this before each command.
+db_busy_raises = contextvars.ContextVar("db_busy_raises", default=False)
+
+
+class DatabaseBusy(RuntimeError):
+    """Raised instead of queueing a database call when its lane is already full."""
+
+
+class _LaneStats:
+    def __init__(self, max_depth: int):
+        self.max_depth = max_depth
+        self.depth = 0
+        self.submitted = 0
+        self.rejected = 0
+        self.completed = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+
+class PriorityExecutor(Executor):
+    """
+    A fixed pool of worker threads fed from one priority queue with an interactive and a
+    background lane.
+
+    Interactive calls always run before queued background calls. Each lane has its own depth
+    limit; a call submitted to a full lane raises `DatabaseBusy` right away rather than piling
+    up behind work that cannot finish in time. The lane comes from `db_priority`, so
+    `loop.run_in_executor` callers need no changes.
+    """
+
+    def __init__(self, max_workers: int, max_interactive: int, max_background: int):
+        self.max_workers = max_workers
+        self.lanes = {INTERACTIVE: _LaneStats(max_interactive), BACKGROUND: _LaneStats(max_background)}
+        self._queue = queue.PriorityQueue()
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+        self._threads = []
+        self._shutdown = False
+
+    def submit(self, fn, /, *args, **kwargs):
+        lane = db_priority.get()
+        stats = self.lanes[lane]
+        with self._lock:
+            if self._shutdown:
+                raise RuntimeError("cannot schedule new database calls after shutdown")
+            if stats.depth >= stats.max_depth:
+                stats.rejected += 1
+                raise DatabaseBusy(f"The {LANE_NAMES[lane]} database queue is full ({stats.max_depth} waiting).")
+            stats.depth += 1
+            stats.submitted += 1
+            if len(self._threads) < self.max_workers:
+                thread = threading.Thread(target=self._worker, name=f"db-worker-{len(self._threads)}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+        future = Future()
+        self._queue.put((lane, next(self._sequence), time.perf_counter(), future, fn, args, kwargs))
+        return future
+
+    def _worker(self):
+        while True:
+            lane, _, enqueued, future, fn, args, kwargs = self._queue.get()
+            if future is None:
+                return
+            wait = time.perf_counter() - enqueued
+            stats = self.lanes[lane]
+            with self._lock:
+                stats.depth -= 1
+                stats.completed += 1
+                stats.total_wait += wait
+                stats.max_wait = max(stats.max_wait, wait)
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(fn(*args, **kwargs))
+            except BaseException as e:
+                future.set_exception(e)
+
+    def shutdown(self, wait=True, *, cancel_futures=False):
+        with self._lock:
+            self._shutdown = True
+            threads = list(self._threads)
+        # Sentinels sort after every queued call, so queued work still runs first.
+        for _ in threads:
+            self._queue.put((BACKGROUND + 1, next(self._sequence), 0.0, None, None, None, None))
+        if wait:
+            for thread in threads:
+                thread.join()
+
+    def stats(self):
+        return [
+            {
+                "lane": LANE_NAMES[lane],
+                "depth": stats.depth,
+                "max_depth": stats.max_depth,
+                "submitted": stats.submitted,
+                "rejected": stats.rejected,
+                "avg_wait_ms": stats.total_wait / stats.completed * 1000 if stats.completed else 0.0,
+                "max_wait_ms": stats.max_wait * 1000,
+            }
+            for lane, stats in self.lanes.items()
+        ]
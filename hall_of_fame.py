@@ -0,0 +1,69 @@
+import discord
+
+import config
+from logger import bot_logger as logger
+
+RENDERED_COUNT_KEY = "giveaway_history_rendered"
+
+
+def page_message_key(page: int) -> str:
+    # Page 1 keeps the key of the original single hall-of-fame message, so it is edited in place.
+    return "giveaway_history_message_id" if page == 0 else f"giveaway_history_message_id_{page}"
+
+
+def build_page_embed(bot, page: int, winners, first_number: int) -> discord.Embed:
+    embed = discord.Embed(
+        title=f"🎉 All-Time Giveaway Winners — Page {page + 1} 🎉",
+        description="Here’s the full hall of fame for all giveaways so far 🏆" if page == 0 else None,
+        color=discord.Color.gold()
+    )
+    for winner in winners:
+        user = bot.get_user(int(winner['user_id']))
+        user_name = user.mention if user else f"User ID: {winner['user_id']}"
+        embed.add_field(
+            name=f"✨ {user_name}",
+            value=f"**{winner['points']:.2f} points** 🎁\n*Reason:* {winner['purpose']}",
+            inline=False
+        )
+    embed.set_footer(text=f"Winners #{first_number}–#{first_number + len(winners) - 1} • "
+                          f"Updated automatically as giveaways happen 🚀")
+    return embed
+
+
+class HallOfFame:
+    """
+    Renders the append-only all-time giveaway log across numbered hall-of-fame messages.
+
+    Each message holds one page of winners. Earlier pages never change, so a refresh only
+    loads the winners from the newest rendered page onwards, edits that page and sends new
+    pages as they fill up.
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+
+    async def refresh(self):
+        channel = self.bot.get_channel(config.GIVEAWAY_CHANNEL_ID)
+        if not channel:
+            logger.error(f"❌ Error: Giveaway channel with ID {config.GIVEAWAY_CHANNEL_ID} not found.")
+            return
+
+        page_size = config.HALL_OF_FAME_PAGE_SIZE
+        rendered = self.bot.bot_data.get(RENDERED_COUNT_KEY, 0)
+        first_page = rendered // page_size
+        winners = await self.bot.load_list_of_json(self.bot, "all_time_giveaway_logs", first_page * page_size)
+        total = first_page * page_size + len(winners)
+        if total == rendered:
+            logger.info("No new giveaway winners to add to the hall of fame. Skipping.")
+            return
+
+        for start in range(0, len(winners), page_size):
+            page = first_page + start // page_size
+            embed = build_page_embed(self.bot, page, winners[start:start + page_size], page * page_size + 1)
+            await self.bot.live_embeds.publish(channel, page_message_key(page), embed)
+        await self.bot.live_embeds.flush()
+
+        self.bot.bot_data[RENDERED_COUNT_KEY] = total
+        await self.bot.save_single_json(self.bot, "bot_data", "main", self.bot.bot_data)
+        logger.info(f"✅ Giveaway hall of fame updated ({total} winners across "
+                    f"{-(-total // page_size)} page(s)).")
@@ -0,0 +1,147 @@
+import asyncio
+import time
+
+import discord
+
+import config
+from logger import bot_logger as logger
+
+
+class InviteEntry:
+    __slots__ = ("code", "url", "uses", "max_uses", "inviter_id")
+
+    def __init__(self, invite: discord.Invite):
+        self.code = invite.code
+        self.url = invite.url
+        self.uses = invite.uses or 0
+        self.max_uses = invite.max_uses or 0
+        self.inviter_id = invite.inviter.id if invite.inviter else None
+
+
+class InviteTracker:
+    """
+    Invite usage per guild, kept current from invite create/delete events, and the join worker
+    that works out which invite each new member used.
+
+    Joins are queued per guild, and one worker per guild means joins never race on the cached
+    uses. Normally each join is diffed as soon as it arrives. While `coalescing` is on (the join
+    queue turns it on during join bursts), the worker waits `INVITE_JOIN_COALESCE_SECONDS` so the
+    burst is diffed against a single `guild.invites()` fetch. A join is only attributed when the
+    diff is unambiguous: every use gained in the batch belongs to one inviter. Otherwise it stays
+    unattributed rather than crediting the wrong member.
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.invites = {}
+        self._deleted = {}
+        self._surplus = {}
+        self._pending = {}
+        self._workers = {}
+        self.coalescing = False
+        self.joins = 0
+        self.fetches = 0
+        self.attributed = 0
+        self.ambiguous = 0
+
+    async def refresh(self, guild: discord.Guild):
+        try:
+            invites = await guild.invites()
+        except discord.Forbidden:
+            logger.warning(f"⚠️ Missing Manage Server permission in guild {guild.id}. Referral tracking is off.")
+            return
+        self.fetches += 1
+        self.invites[guild.id] = {invite.code: InviteEntry(invite) for invite in invites}
+
+    def add(self, invite: discord.Invite):
+        if invite.guild is not None:
+            self.invites.setdefault(invite.guild.id, {})[invite.code] = InviteEntry(invite)
+
+    def remove(self, invite: discord.Invite):
+        if invite.guild is None:
+            return
+        entry = self.invites.get(invite.guild.id, {}).pop(invite.code, None)
+        if entry is not None:
+            # A limited invite is deleted when its last use is taken, so the next diff still needs it.
+            self._deleted.setdefault(invite.guild.id, {})[invite.code] = entry
+
+    def permanent_invite_of(self, guild_id: int, user_id: int):
+        return next((entry for entry in self.invites.get(guild_id, {}).values()
+                     if entry.inviter_id == user_id and entry.max_uses == 0), None)
+
+    async def resolve_inviter(self, member: discord.Member):
+        """Returns the ID of the member whose invite `member` joined through, or None if unknown."""
+        guild = member.guild
+        self.joins += 1
+        surplus = self._surplus.get(guild.id)
+        if (surplus is not None and not self._pending.get(guild.id)
+                and time.monotonic() - surplus[1] > config.INVITE_JOIN_COALESCE_SECONDS):
+            # Join events lag their invite uses by moments, so a batch starting later did not use these.
+            del self._surplus[guild.id]
+        future = asyncio.get_running_loop().create_future()
+        self._pending.setdefault(guild.id, []).append(future)
+        worker = self._workers.get(guild.id)
+        if worker is None or worker.done():
+            self._workers[guild.id] = asyncio.create_task(self._run(guild))
+        return await future
+
+    async def _run(self, guild: discord.Guild):
+        while self._pending.get(guild.id):
+            if self.coalescing:
+                await asyncio.sleep(config.INVITE_JOIN_COALESCE_SECONDS)
+            try:
+                invites = await guild.invites()
+                self.fetches += 1
+            except discord.HTTPException as e:
+                logger.error(f"❌ Failed to fetch invites for guild {guild.id}: {e}")
+                invites = None
+            # Joins that arrived during the fetch are already counted in it, so they belong to this batch.
+            batch = self._pending.pop(guild.id, [])
+            inviter_id = self._diff(guild.id, invites, len(batch)) if invites is not None else None
+            for future in batch:
+                if not future.done():
+                    future.set_result(inviter_id)
+            if len(batch) > 1:
+                logger.info(f"Resolved {len(batch)} joins in guild {guild.id} with one invite fetch.")
+
+    def _diff(self, guild_id: int, invites, joined: int):
+        before = self.invites.get(guild_id, {})
+        gained = {}
+        for invite in invites:
+            previous = before.get(invite.code)
+            uses = (invite.uses or 0) - (previous.uses if previous else 0)
+            if uses > 0:
+                inviter_id = invite.inviter.id if invite.inviter else None
+                gained[inviter_id] = gained.get(inviter_id, 0) + uses
+        current = {invite.code for invite in invites}
+        for code, entry in self._deleted.pop(guild_id, {}).items():
+            # Only an invite one use short of its limit was used up by a join; otherwise it was revoked or expired.
+            if code not in current and entry.max_uses and entry.uses == entry.max_uses - 1:
+                gained[entry.inviter_id] = gained.get(entry.inviter_id, 0) + 1
+        self.invites[guild_id] = {invite.code: InviteEntry(invite) for invite in invites}
+        # Uses seen before their join event arrived belong to the next batch, if it follows closely.
+        surplus, _ = self._surplus.pop(guild_id, ({}, None))
+        for inviter_id, uses in surplus.items():
+            gained[inviter_id] = gained.get(inviter_id, 0) + uses
+
+        if len(gained) == 1 and sum(gained.values()) >= joined:
+            inviter_id = next(iter(gained))
+            if gained[inviter_id] > joined:
+                self._surplus[guild_id] = ({inviter_id: gained[inviter_id] - joined}, time.monotonic())
+            if inviter_id is not None:
+                self.attributed += joined
+            return inviter_id
+        if gained:
+            self.ambiguous += joined
+            logger.warning(f"⚠️ {joined} join(s) in guild {guild_id} matched invites from {len(gained)} inviters. "
+                           f"Leaving them unattributed.")
+        return None
+
+    def stats(self):
+        return {
+            "tracked_invites": sum(len(invites) for invites in self.invites.values()),
+            "joins": self.joins,
+            "fetches": self.fetches,
+            "attributed": self.attributed,
+            "ambiguous": self.ambiguous,
+        }
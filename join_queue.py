@@ -0,0 +1,226 @@
+import asyncio
+import time
+from collections import deque
+from datetime import datetime, UTC
+
+import discord
+
+import config
+from logger import bot_logger as logger
+from utils import join_within_limit
+
+
+class JoinQueue:
+    """
+    Referral processing for new members, batched during join bursts.
+
+    Normally each join is processed as soon as it arrives. Once `JOIN_BURST_THRESHOLD` joins
+    land within `JOIN_BURST_WINDOW_SECONDS`, burst mode queues joins and processes them every
+    `JOIN_BURST_BATCH_SECONDS`: one referred-users lookup, one coalesced invite diff, one
+    pending-referrals upsert and one grouped announcement per batch.
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.pending = []
+        self.burst_active = False
+        self.joins = 0
+        self.batches = 0
+        self.largest_batch = 0
+        self.referrals = 0
+        self.bursts = 0
+        self._recent = deque()
+        self._burst_started = None
+        self._burst_joins = 0
+        self._has_items = asyncio.Event()
+        self._worker = None
+
+    def add(self, member: discord.Member):
+        now = time.monotonic()
+        self.joins += 1
+        self._recent.append(now)
+        self._trim(now)
+        if not self.burst_active and len(self._recent) >= config.JOIN_BURST_THRESHOLD:
+            self.burst_active = True
+            self.bursts += 1
+            self._burst_started = now
+            self._burst_joins = 0
+            # Outside bursts each join gets its own invite diff, so joins through different invites stay attributable.
+            self.bot.invite_tracker.coalescing = True
+            logger.warning(f"⚠️ Join burst detected ({len(self._recent)} joins in "
+                           f"{config.JOIN_BURST_WINDOW_SECONDS}s). Batching referral processing.")
+        if self.burst_active:
+            self._burst_joins += 1
+
+        # The invite diff starts now, so it lines up with the invite uses this join just added.
+        self.pending.append((member, asyncio.ensure_future(self.bot.invite_tracker.resolve_inviter(member))))
+        self._has_items.set()
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run())
+
+    def _trim(self, now: float):
+        while self._recent and now - self._recent[0] > config.JOIN_BURST_WINDOW_SECONDS:
+            self._recent.popleft()
+
+    async def _run(self):
+        while True:
+            if self.burst_active:
+                try:
+                    await asyncio.wait_for(self._has_items.wait(), timeout=config.JOIN_BURST_BATCH_SECONDS)
+                    # Let the batch fill up before processing it.
+                    await asyncio.sleep(config.JOIN_BURST_BATCH_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+            else:
+                await self._has_items.wait()
+            self._has_items.clear()
+
+            batch, self.pending = self.pending, []
+            if batch:
+                try:
+                    await self._process(batch)
+                except Exception as e:
+                    logger.error(f"❌ Failed to process {len(batch)} member join(s): {e}", exc_info=True)
+
+            if self.burst_active:
+                self._trim(time.monotonic())
+                if len(self._recent) < config.JOIN_BURST_THRESHOLD and not self.pending:
+                    self.burst_active = False
+                    self.bot.invite_tracker.coalescing = False
+                    logger.info(f"✅ Join burst over: {self._burst_joins} joins in "
+                                f"{time.monotonic() - self._burst_started:.0f}s.")
+
+    async def _process(self, batch):
+        self.batches += 1
+        self.largest_batch = max(self.largest_batch, len(batch))
+
+        # Every joiner takes part in the invite diff, including rejoiners, so the gained uses add up.
+        inviter_ids = await asyncio.gather(*(resolving for _, resolving in batch))
+        already_referred = await self.bot.filter_referred_users(self.bot, [str(member.id) for member, _ in batch])
+
+        referred = []
+        for (member, _), inviter_id in zip(batch, inviter_ids):
+            if str(member.id) in already_referred:
+                logger.info(f"User {member.name} has rejoined but has already been referred. Skipping referral check.")
+                continue
+            if inviter_id and inviter_id != self.bot.user.id:
+                referred.append((member, inviter_id))
+        if not referred:
+            return
+
+        pending = {str(member.id): str(inviter_id) for member, inviter_id in referred}
+        if not await self.bot.upsert_pending_referrals(self.bot, pending):
+            # Their invite uses are already consumed, so retry the save rather than lose the referrals.
+            logger.warning(f"⚠️ Could not save {len(referred)} pending referral(s). Retrying with the next batch.")
+            await asyncio.sleep(config.JOIN_BURST_BATCH_SECONDS)
+            for member, inviter_id in referred:
+                resolved = asyncio.get_running_loop().create_future()
+                resolved.set_result(inviter_id)
+                self.pending.append((member, resolved))
+            self._has_items.set()
+            return
+        # Keep the in-memory copy current, since it is written back on logout.
+        self.bot.pending_referrals.update(pending)
+        self.referrals += len(referred)
+        logger.info(f"Saved {len(referred)} new pending referral(s).")
+        await self._announce(referred)
+
+    async def _announce(self, referred):
+        channel = self.bot.get_channel(config.REFERRAL_CHANNEL_ID)
+        if not channel:
+            return
+        if len(referred) == 1:
+            member, inviter_id = referred[0]
+            embed = discord.Embed(
+                title="✨ New Referral!",
+                description=f"🎉 **{member.mention}** was just referred by <@{inviter_id}>!",
+                color=discord.Color.gold()
+            )
+        else:
+            lines = [f"🎉 **{member.mention}** — referred by <@{inviter_id}>" for member, inviter_id in referred]
+            embed = discord.Embed(
+                title=f"✨ {len(referred)} New Referrals!",
+                description=join_within_limit(lines, limit=4096),
+                color=discord.Color.gold()
+            )
+        embed.set_footer(text="Awaiting verification. They'll receive their points soon!")
+        embed.timestamp = datetime.now(UTC)
+        try:
+            await channel.send(embed=embed)
+        except discord.HTTPException:
+            logger.error(f"❌ Bot missing permissions to send message to referral channel.")
+
+    def stats(self):
+        return {
+            "burst_active": self.burst_active,
+            "joins": self.joins,
+            "batches": self.batches,
+            "largest_batch": self.largest_batch,
+            "referrals": self.referrals,
+            "bursts": self.bursts,
+        }
+
+
+async def simulate_join_storm(joins: int = 500, interval: float = 0.002) -> dict:
+    """
+    Drives a JoinQueue with a real InviteTracker through a burst of joins on one campaign invite,
+    against an in-memory guild. Returns the queue and tracker counters plus the elapsed time.
+    """
+    from types import SimpleNamespace
+
+    from invite_tracker import InviteTracker
+
+    inviter = SimpleNamespace(id=100)
+    invite = SimpleNamespace(code="campaign", url="https://discord.gg/campaign", uses=0, max_uses=0, inviter=inviter)
+
+    async def fetch_invites():
+        await asyncio.sleep(0.01)
+        return [SimpleNamespace(**vars(invite))]
+
+    guild = SimpleNamespace(id=1, invites=fetch_invites)
+    invite.guild = guild
+    counts = {"upserts": 0, "announcements": 0}
+
+    async def filter_referred_users(bot, user_ids):
+        return set()
+
+    async def upsert_pending_referrals(bot, referrals):
+        counts["upserts"] += 1
+        return True
+
+    async def send(embed=None):
+        counts["announcements"] += 1
+
+    bot = SimpleNamespace(
+        user=SimpleNamespace(id=1), pending_referrals={}, filter_referred_users=filter_referred_users,
+        upsert_pending_referrals=upsert_pending_referrals,
+        get_channel=lambda channel_id: SimpleNamespace(send=send),
+    )
+    bot.invite_tracker = InviteTracker(bot)
+    await bot.invite_tracker.refresh(guild)
+    queue = JoinQueue(bot)
+
+    start = time.perf_counter()
+    for member_id in range(1000, 1000 + joins):
+        # Discord counts the invite use before it sends the join event.
+        invite.uses += 1
+        queue.add(SimpleNamespace(id=member_id, name=f"member{member_id}", mention=f"<@{member_id}>", guild=guild))
+        await asyncio.sleep(interval)
+    while len(bot.pending_referrals) < joins and queue.pending or any(
+            not worker.done() for worker in bot.invite_tracker._workers.values()):
+        await asyncio.sleep(0.05)
+    await asyncio.sleep(config.JOIN_BURST_BATCH_SECONDS * 2)
+    queue._worker.cancel()
+    return {**queue.stats(), **bot.invite_tracker.stats(), **counts,
+            "saved": len(bot.pending_referrals), "elapsed": time.perf_counter() - start}
+
+
+if __name__ == "__main__":
+    # Short windows so the simulated storm finishes in a few seconds.
+    config.INVITE_JOIN_COALESCE_SECONDS = 0.05
+    config.JOIN_BURST_BATCH_SECONDS = 0.2
+
+    result = asyncio.run(simulate_join_storm())
+    print(f"Join storm: {result['joins']} joins, {result['saved']} referrals saved, "
+          f"{result['ambiguous']} ambiguous, {result['fetches']} invite fetches, {result['upserts']} upserts, "
+          f"{result['announcements']} announcements, {result['batches']} batches in {result['elapsed']:.1f}s")
@@ -0,0 +1,133 @@
+import time
+from datetime import datetime, UTC
+
+import discord
+
+import config
+
+
+class RankingSnapshot:
+    """
+    A frozen copy of one ranking, shared by every leaderboard view opened while it is fresh.
+
+    Page text is rendered once per snapshot and reused, and a user's position is an O(1) lookup.
+    """
+
+    def __init__(self, entries, label: str):
+        self.entries = entries
+        self.label = label
+        self.positions = {user_id: position for position, (user_id, _) in enumerate(entries)}
+        self.taken_at = time.monotonic()
+        self._pages = {}
+
+    @property
+    def page_count(self) -> int:
+        return max(1, -(-len(self.entries) // config.LEADERBOARD_PAGE_SIZE))
+
+    def rank_of(self, user_id: str):
+        position = self.positions.get(user_id)
+        return position + 1 if position is not None else None
+
+    def page_of(self, user_id: str):
+        position = self.positions.get(user_id)
+        return position // config.LEADERBOARD_PAGE_SIZE if position is not None else None
+
+    def page_text(self, bot, page: int) -> str:
+        text = self._pages.get(page)
+        if text is None:
+            medals = ["🥇", "🥈", "🥉"]
+            start = page * config.LEADERBOARD_PAGE_SIZE
+            lines = []
+            for position, (user_id, score) in enumerate(self.entries[start:start + config.LEADERBOARD_PAGE_SIZE],
+                                                        start):
+                user = bot.get_user(int(user_id))
+                username = user.display_name if user else f"User ID: {user_id}"
+                medal = medals[position] if position < len(medals) else "🏅"
+                lines.append(f"{medal} **#{position + 1}** {username} — **{score:,.2f} MVpts**")
+            text = "\n".join(lines) or "No ranked members on this page."
+            self._pages[page] = text
+        return text
+
+
+class SnapshotCache:
+    """Hands out ranking snapshots, taking a new one only after the previous one is older than the TTL."""
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._snapshots = {}
+
+    def get(self, key, rank_index, label: str) -> RankingSnapshot:
+        snapshot = self._snapshots.get(key)
+        if snapshot is None or time.monotonic() - snapshot.taken_at >= self.ttl_seconds:
+            snapshot = RankingSnapshot(rank_index.top(len(rank_index)), label)
+            self._snapshots[key] = snapshot
+        return snapshot
+
+
+class LeaderboardView(discord.ui.View):
+    """Previous/next/my-rank buttons over a ranking snapshot. Only the member who opened it can page."""
+
+    def __init__(self, bot, snapshot: RankingSnapshot, viewer, page: int = 0):
+        super().__init__(timeout=config.LEADERBOARD_VIEW_TIMEOUT_SECONDS)
+        self.bot = bot
+        self.snapshot = snapshot
+        self.viewer = viewer
+        self.page = min(max(page, 0), snapshot.page_count - 1)
+        self.message = None
+        self._update_buttons()
+
+    def build_embed(self) -> discord.Embed:
+        snapshot = self.snapshot
+        embed = discord.Embed(title="🏆 ManaVerse Leaderboard 🏆",
+                              description=f"Members ranked by {snapshot.label} points.",
+                              color=discord.Color.gold())
+        rank = snapshot.rank_of(str(self.viewer.id))
+        if rank:
+            score = snapshot.entries[rank - 1][1]
+            embed.add_field(name="👑 Your Rank", value=f"**#{rank}** with **{score:,.2f} MVpts**", inline=False)
+        else:
+            embed.add_field(name="👑 Your Rank", value="You are not ranked yet. Start earning points!", inline=False)
+        embed.add_field(name=f"🌟 Mana Legends (Page {self.page + 1}/{snapshot.page_count})",
+                        value=snapshot.page_text(self.bot, self.page), inline=False)
+        embed.set_footer(text=f"{len(snapshot.entries)} ranked members • "
+                              f"Rankings refresh every {config.LEADERBOARD_SNAPSHOT_TTL_SECONDS}s")
+        embed.timestamp = datetime.now(UTC)
+        return embed
+
+    def _update_buttons(self):
+        self.previous_page.disabled = self.page <= 0
+        self.next_page.disabled = self.page >= self.snapshot.page_count - 1
+        self.my_rank.disabled = self.snapshot.page_of(str(self.viewer.id)) is None
+
+    async def _show_page(self, interaction: discord.Interaction, page: int):
+        self.page = page
+        self._update_buttons()
+        await interaction.response.edit_message(embed=self.build_embed(), view=self)
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        if interaction.user.id != self.viewer.id:
+            await interaction.response.send_message("❌ Use `!leaderboard` to open your own leaderboard.",
+                                                    ephemeral=True)
+            return False
+        return True
+
+    @discord.ui.button(label="Previous", emoji="◀️", style=discord.ButtonStyle.secondary)
+    async def previous_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self._show_page(interaction, self.page - 1)
+
+    @discord.ui.button(label="My Rank", emoji="📍", style=discord.ButtonStyle.primary)
+    async def my_rank(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self._show_page(interaction, self.snapshot.page_of(str(self.viewer.id)))
+
+    @discord.ui.button(label="Next", emoji="▶️", style=discord.ButtonStyle.secondary)
+    async def next_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self._show_page(interaction, self.page + 1)
+
+    async def on_timeout(self):
+        for item in self.children:
+            item.disabled = True
+        if self.message:
+            try:
+                await self.message.edit(view=self)
+            except discord.HTTPException:
+                pass
@@ -0,0 +1,75 @@
+import hashlib
+import json
+
+import discord
+
+from logger import bot_logger as logger
+
+
+class LiveEmbedManager:
+    """
+    Keeps each periodically refreshed embed in sync with one managed message.
+
+    Edits are skipped when the rendered content has not changed, messages are edited
+    through cached references instead of being fetched first, and message-ID changes
+    are written to bot_data once per flush rather than once per message.
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+        self._messages = {}
+        self._hashes = {}
+        self._dirty = False
+        self.stats = {"sent": 0, "edited": 0, "skipped": 0}
+
+    @staticmethod
+    def content_hash(embed: discord.Embed) -> str:
+        data = embed.to_dict()
+        # The render time changes on every refresh and is not meaningful content.
+        data.pop("timestamp", None)
+        return hashlib.sha256(json.dumps(data, sort_keys=True, default=str).encode()).hexdigest()
+
+    async def publish(self, channel, key: str, embed: discord.Embed, pin: bool = False) -> bool:
+        """
+        Shows `embed` in the message stored under `key` in bot_data, sending a new message
+        if there is none yet. Returns True if a REST call was made.
+        """
+        digest = self.content_hash(embed)
+        if self._hashes.get(key) == digest:
+            self.stats["skipped"] += 1
+            return False
+
+        bot_data = self.bot.bot_data
+        message = self._messages.get(key)
+        if message is None and bot_data.get(key):
+            message = channel.get_partial_message(bot_data[key])
+
+        try:
+            if message is not None:
+                try:
+                    await message.edit(embed=embed)
+                    self.stats["edited"] += 1
+                except discord.NotFound:
+                    message = None
+
+            if message is None:
+                message = await channel.send(embed=embed)
+                self.stats["sent"] += 1
+                bot_data[key] = message.id
+                self._dirty = True
+                if pin:
+                    await message.pin()
+        except discord.Forbidden:
+            logger.error(f"Bot missing permissions to send, edit or pin message in channel ({channel.id}).")
+            return False
+
+        self._messages[key] = message
+        self._hashes[key] = digest
+        return True
+
+    async def flush(self):
+        """Saves bot_data once if any managed message IDs changed since the last flush."""
+        if not self._dirty:
+            return
+        await self.bot.save_single_json(self.bot, "bot_data", "main", self.bot.bot_data)
+        self._dirty = False
@@ -0,0 +1,191 @@
+import asyncio
+from collections import deque
+
+import discord
+
+import config
+from logger import bot_logger as logger
+
+MAX_EMBEDS_PER_MESSAGE = 10
+MAX_EMBED_CHARACTERS_PER_MESSAGE = 6000
+
+
+class LogChannelQueue:
+    """
+    Outbound queue for one log channel, drained by its own worker task.
+
+    Embeds are packed up to 10 per message (and within Discord's 6000-character total), sent
+    once the batch is full or `LOG_BATCH_INTERVAL_SECONDS` after the first queued embed, and
+    paced to stay inside the channel's rate-limit bucket. When the queue is full the oldest
+    entries are dropped and a summary of how many were lost is posted instead.
+
+    With `LOG_USE_WEBHOOKS` enabled, batches are posted through a webhook owned by the bot in
+    that channel. Webhooks have their own rate-limit buckets, so log traffic stops competing
+    with replies to commands.
+    """
+
+    def __init__(self, bot, channel_id: int):
+        self.bot = bot
+        self.channel_id = channel_id
+        self.pending = deque()
+        self.dropped = 0
+        self.dropped_total = 0
+        self.sent_messages = 0
+        self.sent_embeds = 0
+        self.failures = 0
+        self.webhook_sends = 0
+        self.fallback_sends = 0
+        self.webhook = None
+        self.webhook_unavailable = False
+        self._has_items = asyncio.Event()
+        self._closing = asyncio.Event()
+        self._worker = None
+
+    def post(self, embed: discord.Embed):
+        if len(self.pending) >= config.LOG_QUEUE_MAX_PENDING:
+            self.pending.popleft()
+            self.dropped += 1
+            self.dropped_total += 1
+        self.pending.append(embed)
+        self._has_items.set()
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run())
+
+    def _take_batch(self):
+        batch = []
+        characters = 0
+        if self.dropped:
+            summary = discord.Embed(
+                title="⚠️ Log Entries Dropped",
+                description=f"**{self.dropped}** log entries were dropped because this channel's log queue was full.",
+                color=discord.Color.orange()
+            )
+            batch.append(summary)
+            characters += len(summary)
+            self.dropped = 0
+        while self.pending and len(batch) < MAX_EMBEDS_PER_MESSAGE:
+            size = len(self.pending[0])
+            if batch and characters + size > MAX_EMBED_CHARACTERS_PER_MESSAGE:
+                break
+            batch.append(self.pending.popleft())
+            characters += size
+        return batch
+
+    async def _run(self):
+        while True:
+            await self._has_items.wait()
+            self._has_items.clear()
+            if len(self.pending) < MAX_EMBEDS_PER_MESSAGE and not self._closing.is_set():
+                # Let the batch fill up before sending, unless the bot is shutting down.
+                try:
+                    await asyncio.wait_for(self._closing.wait(), timeout=config.LOG_BATCH_INTERVAL_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+            await self.drain()
+            if self._closing.is_set():
+                return
+
+    async def drain(self):
+        while self.pending or self.dropped:
+            batch = self._take_batch()
+            channel = self.bot.get_channel(self.channel_id)
+            if not channel:
+                logger.error(f"❌ Log channel (ID: {self.channel_id}) not found. Dropped {len(batch)} log entries.")
+                self.failures += 1
+                continue
+            try:
+                await self._deliver(channel, batch)
+                self.sent_messages += 1
+                self.sent_embeds += len(batch)
+            except Exception as e:
+                # Whatever went wrong, the worker keeps going so later batches are still sent.
+                self.failures += 1
+                logger.error(f"❌ Failed to send {len(batch)} log entries to channel {self.channel_id}: {e}")
+            # Stay under the per-channel message bucket even when the queue is backed up.
+            await asyncio.sleep(config.LOG_MIN_SEND_INTERVAL_SECONDS)
+
+    async def _deliver(self, channel, batch):
+        """Sends through the channel webhook in webhook mode, falling back to a normal bot send."""
+        if config.LOG_USE_WEBHOOKS and not self.webhook_unavailable:
+            webhook = await self._get_webhook(channel)
+            if webhook is not None:
+                try:
+                    await webhook.send(embeds=batch, username=self.bot.user.name,
+                                       avatar_url=self.bot.user.display_avatar.url)
+                    self.webhook_sends += 1
+                    return
+                except discord.NotFound:
+                    # Deleted from the channel settings; provision a new one on the next batch.
+                    self.webhook = None
+                    logger.warning(f"⚠️ Log webhook for channel {self.channel_id} was deleted. Falling back.")
+                except Exception as e:
+                    logger.warning(f"⚠️ Log webhook send to channel {self.channel_id} failed ({e}). Falling back.")
+        await channel.send(embeds=batch)
+        if config.LOG_USE_WEBHOOKS:
+            self.fallback_sends += 1
+
+    async def _get_webhook(self, channel):
+        """Returns the cached log webhook for the channel, reusing or creating one on first use."""
+        if self.webhook is not None:
+            return self.webhook
+        try:
+            for webhook in await channel.webhooks():
+                if webhook.name == config.LOG_WEBHOOK_NAME and webhook.token and webhook.user == self.bot.user:
+                    self.webhook = webhook
+                    break
+            else:
+                self.webhook = await channel.create_webhook(name=config.LOG_WEBHOOK_NAME,
+                                                            reason="Log channel delivery")
+                logger.info(f"✅ Created log webhook for channel {self.channel_id}.")
+        except discord.Forbidden:
+            # Without Manage Webhooks this channel always uses normal sends.
+            self.webhook_unavailable = True
+            logger.warning(f"⚠️ Missing Manage Webhooks permission in log channel {self.channel_id}. "
+                           f"Using normal sends.")
+        except Exception as e:
+            logger.warning(f"⚠️ Could not provision a log webhook for channel {self.channel_id}: {e}")
+        return self.webhook
+
+    async def close(self):
+        """Lets the worker finish the batch it is sending and everything still queued, then stops it."""
+        self._closing.set()
+        if self._worker is not None and not self._worker.done():
+            self._has_items.set()
+            await self._worker
+        else:
+            await self.drain()
+        self._worker = None
+
+
+class LogPipeline:
+    """Fire-and-forget posting to log channels. `post` never waits on Discord."""
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.queues = {}
+
+    def post(self, channel_id: int, embed: discord.Embed):
+        queue = self.queues.get(channel_id)
+        if queue is None:
+            queue = self.queues[channel_id] = LogChannelQueue(self.bot, channel_id)
+        queue.post(embed)
+
+    async def close(self):
+        """Sends everything still queued, e.g. before logging out."""
+        for queue in self.queues.values():
+            await queue.close()
+
+    def stats(self):
+        return [
+            {
+                "channel_id": queue.channel_id,
+                "pending": len(queue.pending),
+                "sent_messages": queue.sent_messages,
+                "sent_embeds": queue.sent_embeds,
+                "dropped": queue.dropped_total,
+                "failures": queue.failures,
+                "webhook_sends": queue.webhook_sends,
+                "fallback_sends": queue.fallback_sends,
+            }
+            for queue in self.queues.values()
+        ]
@@ -8,12 +8,33 @@ from datetime import datetime, UTC
 import discord
 from discord.ext import commands, tasks
 from dotenv import load_dotenv
-from concurrent.futures import ThreadPoolExecutor
 
 # Local application imports
 from database import init_db, load_single_json, save_single_json, load_all_json, save_all_json, save_list_values, \
-    load_list_values, save_list_of_json, load_list_of_json, log_points_transaction as db_log_points
+    load_list_values, save_list_of_json, load_list_of_json, log_points_transaction as db_log_points, \
+    get_slow_queries, clear_slow_queries, increment_json_field, increment_score_buckets, load_score_buckets, \
+    prune_score_buckets, load_scheduled_jobs, save_scheduled_job, award_points as db_award_points, \
+    increment_vip_post_count, filter_referred_users, upsert_pending_referrals, get_db_queue_stats, \
+    commit_economy_change, load_due_outbox, complete_outbox, fail_outbox
 from logger import bot_logger as logger
+from utils import join_within_limit
+from xp import XPAccumulator
+from ranking import RankIndex, MemberEligibility
+from live_embeds import LiveEmbedManager
+from hall_of_fame import HallOfFame
+from log_pipeline import LogPipeline
+from command_audit import CommandAuditQueue
+from invite_tracker import InviteTracker
+from join_queue import JoinQueue
+from memory_report import log_cache_memory_report
+from outbox import OutboxDispatcher
+from referrals import ReferralIndex
+from score_windows import ScoreWindows
+from leaderboard_view import SnapshotCache
+from refresh import RefreshScheduler
+from scheduler import Scheduler
+from shards import ShardTracker
+from db_executor import db_busy_raises
 import config
 
 # Load environment variables from .env file
@@ -31,36 +52,63 @@ INITIAL_EXTENSIONS = [
 ]
 
 
-class MyBot(commands.Bot):
+# AutoShardedBot runs every shard in this process; the rest of the bot is the same either way.
+BotBase = commands.AutoShardedBot if config.AUTO_SHARDING else commands.Bot
+
+
+class MyBot(BotBase):
     def __init__(self):
         intents = discord.Intents.default()
         intents.message_content = True
         intents.members = True
         intents.reactions = True
-        intents.presences = True
+        intents.presences = not config.LEAN_MEMBER_CACHE
+
+        member_cache_flags = discord.MemberCacheFlags.from_intents(intents)
+        if config.LEAN_MEMBER_CACHE:
+            member_cache_flags.voice = False
+
+        shard_options = {"shard_count": config.SHARD_COUNT} if config.AUTO_SHARDING and config.SHARD_COUNT else {}
 
         super().__init__(
             command_prefix="!",
             intents=intents,
-            case_insensitive=True
+            member_cache_flags=member_cache_flags,
+            case_insensitive=True,
+            **shard_options
         )
-
-        self.db_executor = ThreadPoolExecutor()
+        self.before_invoke(self.mark_command_context)
 
         self.init_db = init_db
         self.load_single_json = load_single_json
         self.save_single_json = save_single_json
         self.load_all_json = load_all_json
         self.save_all_json = save_all_json
+        self.increment_json_field = increment_json_field
+        self.increment_score_buckets = increment_score_buckets
+        self.load_score_buckets = load_score_buckets
+        self.prune_score_buckets = prune_score_buckets
+        self.load_scheduled_jobs = load_scheduled_jobs
+        self.save_scheduled_job = save_scheduled_job
+        self.increment_vip_post_count = increment_vip_post_count
+        self.filter_referred_users = filter_referred_users
+        self.upsert_pending_referrals = upsert_pending_referrals
+        self.commit_economy_change = commit_economy_change
+        self.load_due_outbox = load_due_outbox
+        self.complete_outbox = complete_outbox
+        self.fail_outbox = fail_outbox
         self.load_list_values = load_list_values
         self.save_list_values = save_list_values
         self.load_list_of_json = load_list_of_json
         self.save_list_of_json = save_list_of_json
         self.log_points_transaction_db = db_log_points
+        self.award_points_db = db_award_points
+        self.get_slow_queries = get_slow_queries
+        self.clear_slow_queries = clear_slow_queries
+        self.get_db_queue_stats = get_db_queue_stats
 
         self.users_points = {}
         self.submissions = {}
-        self.vip_posts = {}
         self.user_xp = {}
         self.weekly_quests = {}
         self.quest_submissions = {}
@@ -73,18 +121,35 @@ class MyBot(commands.Bot):
         self.bot_data = {}
         self.approved_proofs = []
         self.points_history = []
-        self.giveaway_winners_log = []
-        self.all_time_giveaway_winners_log = []
         self.referred_users = set()
         self.processed_reactions = set()
-        self.invite_cache = {}
-        self.invites_before_join = {}
+        self.invite_tracker = InviteTracker(self)
+        self.join_queue = JoinQueue(self)
         self.ticket_messages_to_archive = {}
+        self.xp_accumulator = XPAccumulator(self)
+        self.live_embeds = LiveEmbedManager(self)
+        self.hall_of_fame = HallOfFame(self)
+        self.log_pipeline = LogPipeline(self)
+        self.command_audit = CommandAuditQueue(self)
+        self.outbox = OutboxDispatcher(self)
+        self.points_rank = RankIndex(self.is_rank_eligible)
+        self.xp_rank = RankIndex(self.is_rank_eligible)
+        self.referrals = ReferralIndex(self.is_rank_eligible)
+        self.points_windows = ScoreWindows(self, "points", self.is_rank_eligible)
+        self.xp_windows = ScoreWindows(self, "xp", self.is_rank_eligible)
+        self.leaderboard_snapshots = SnapshotCache(config.LEADERBOARD_SNAPSHOT_TTL_SECONDS)
+        self.refresh_scheduler = RefreshScheduler(config.BOARD_REFRESH_MIN_INTERVAL_SECONDS)
+        self.scheduler = Scheduler(self, config.SCHEDULER_MAX_CONCURRENCY)
+        self.shard_tracker = ShardTracker(self)
+        self.warm_started = False
+        self.eligibility = MemberEligibility([config.ADMIN_ROLE_ID, config.MOD_ROLE_ID],
+                                             indexes=[self.points_rank, self.xp_rank, self.referrals.counts,
+                                                      *self.points_windows.indexes.values(),
+                                                      *self.xp_windows.indexes.values()])
 
     async def load_all_data_from_db(self):
         self.users_points = await self.load_all_json(self, "users_points")
         self.submissions = await self.load_all_json(self, "submissions")
-        self.vip_posts = await self.load_all_json(self, "vip_posts")
         self.user_xp = await self.load_all_json(self, "user_xp")
         self.weekly_quests = await self.load_single_json(self, "weekly_quests", "main", {"week": 0, "quests": []})
         self.quest_submissions = await self.load_all_json(self, "quest_submissions")
@@ -108,8 +173,6 @@ class MyBot(commands.Bot):
         self.processed_reactions = set(await self.load_list_values(self, "processed_reactions", "reaction_identifier"))
 
         self.points_history = await self.load_list_of_json(self, "points_history")
-        self.giveaway_winners_log = await self.load_list_of_json(self, "giveaway_logs")
-        self.all_time_giveaway_winners_log = await self.load_list_of_json(self, "all_time_giveaway_logs")
 
         logger.info("✅ All bot data loaded from the database.")
 
@@ -118,7 +181,6 @@ class MyBot(commands.Bot):
             # Save JSON dictionary data
             await self.save_all_json(self, "users_points", self.users_points)
             await self.save_all_json(self, "submissions", self.submissions)
-            await self.save_all_json(self, "vip_posts", self.vip_posts)
             await self.save_all_json(self, "user_xp", self.user_xp)
             await self.save_single_json(self, "weekly_quests", "main", self.weekly_quests)
             await self.save_all_json(self, "quest_submissions", self.quest_submissions)
@@ -136,16 +198,38 @@ class MyBot(commands.Bot):
             await self.save_list_values(self, "processed_reactions", list(self.processed_reactions),
                                         "reaction_identifier")
 
-            # Save lists of JSON objects
-            await self.save_list_of_json(self, "points_history", self.points_history)
-            await self.save_list_of_json(self, "giveaway_logs", self.giveaway_winners_log)
-            await self.save_list_of_json(self, "all_time_giveaway_logs", self.all_time_giveaway_winners_log)
+            # points_history and all_time_giveaway_logs are append-only logs written as events happen,
+            # so they are never rewritten from the startup snapshot here.
 
             logger.info("✅ All bot data saved to the database.")
 
         except Exception as e:
             logger.error(f"❌ An error occurred while saving all data: {e}", exc_info=True)
 
+    def is_rank_eligible(self, user_id: str) -> bool:
+        """Leaderboards only rank current members who are not bots, admins or mods."""
+        return self.eligibility.is_eligible(user_id)
+
+    def build_rank_indexes(self):
+        guild = self.get_guild(config.SERVER_ID)
+        if guild:
+            self.eligibility.build(guild)
+        else:
+            logger.error(f"❌ Guild with ID {config.SERVER_ID} not found. Leaderboards will be empty.")
+        self.points_rank.rebuild({
+            user_id: data.get("all_time_points", 0.0) for user_id, data in self.users_points.items()
+        })
+        self.xp_rank.rebuild({
+            user_id: self.user_xp.get(user_id, {}).get("xp", 0) + self.xp_accumulator.pending_for(user_id)
+            for user_id in set(self.user_xp) | set(self.xp_accumulator.pending)
+        })
+        self.referrals.rebuild(self.referral_data)
+        # The windows were loaded in setup_hook, before eligibility was known, which hid everyone in them.
+        self.points_windows.reindex()
+        self.xp_windows.reindex()
+        logger.info(f"✅ Rank indexes built ({len(self.points_rank)} points, {len(self.xp_rank)} XP, "
+                    f"{len(self.referrals.counts)} referral entries).")
+
     def ensure_user(self, user_id: str):
         self.users_points.setdefault(user_id, {"all_time_points": 0.0, "available_points": 0.0})
 
@@ -167,22 +251,8 @@ class MyBot(commands.Bot):
         ts_list.append(time.time())
         self.mysterybox_uses[user_id] = ts_list
 
-    async def setup_hook(self):
-        logger.info("Starting the bot...")
-        for extension in INITIAL_EXTENSIONS:
-            try:
-                await self.load_extension(extension)
-                print(f"Loaded {extension}")
-            except Exception as e:
-                print(f"Failed to load {extension}: {e}")
-        logger.info("Cogs loaded. Bot is ready.")
-
-    async def on_ready(self):
-        logger.info('--------------------------------')
-        logger.info(f'Logged in as {self.user.name}')
-        logger.info(f'Bot ID: {self.user.id}')
-        logger.info('--------------------------------')
-
+    async def warm_start(self):
+        """One-time startup: creates the tables and loads every table into memory before connecting."""
         await self.init_db(self)
 
         self.admin_points = await self.load_single_json(self, "admin_points", "main", {
@@ -208,47 +278,105 @@ class MyBot(commands.Bot):
             logger.info("✅ Economy table initialized successfully.")
 
         await self.load_all_data_from_db()
+        await self.points_windows.load()
+        await self.xp_windows.load()
 
-        for guild in self.guilds:
+    async def setup_hook(self):
+        logger.info("Starting the bot...")
+        await self.warm_start()
+        for extension in INITIAL_EXTENSIONS:
             try:
-                self.invite_cache[guild.id] = await guild.invites()
-            except discord.Forbidden:
-                pass
+                await self.load_extension(extension)
+                print(f"Loaded {extension}")
+            except Exception as e:
+                print(f"Failed to load {extension}: {e}")
+        logger.info("Cogs loaded. Bot is ready.")
 
-    async def manage_periodic_message(self, channel, bot_data, message_id_key, embed, pin=False):
-        try:
-            message_id = bot_data.get(message_id_key)
-
-            if message_id:
-                try:
-                    message = await channel.fetch_message(message_id)
-                    await message.edit(embed=embed)
-                except discord.NotFound:
-                    new_message = await channel.send(embed=embed)
-                    bot_data[message_id_key] = new_message.id
-                    await self.save_single_json(self, "bot_data", "main", bot_data)
-                    if pin:
-                        await new_message.pin()
-                except discord.Forbidden:
-                    logger.error(f"Bot missing permissions to edit/pin message in channel ({channel.id}).")
-            else:
-                new_message = await channel.send(embed=embed)
-                bot_data[message_id_key] = new_message.id
-                await self.save_single_json(self, "bot_data", "main", bot_data)
-                if pin:
-                    await new_message.pin()
-
-        except discord.Forbidden:
-            logger.error(f"Bot missing permissions to send message in channel ({channel.id}).")
-        except Exception as e:
-            logger.error(f"An unexpected error occurred in manage_periodic_message: {e}")
+    async def mark_command_context(self, ctx):
+        # A full database lane is reported to the user as "try again"; other callers see a normal failure.
+        db_busy_raises.set(True)
+
+    # --- Gateway connections: AutoShardedBot reports each shard, a plain Bot is tracked as shard 0 ---
+    async def on_connect(self):
+        if not config.AUTO_SHARDING:
+            self.shard_tracker.connected()
+
+    async def on_disconnect(self):
+        if not config.AUTO_SHARDING:
+            self.shard_tracker.disconnected()
 
-    async def log_points_transaction(self, user_id, points, purpose):
+    async def on_resumed(self):
+        if not config.AUTO_SHARDING:
+            self.shard_tracker.resumed()
+
+    async def on_shard_connect(self, shard_id):
+        self.shard_tracker.connected(shard_id)
+
+    async def on_shard_ready(self, shard_id):
+        self.shard_tracker.ready(shard_id)
+        # After startup, a shard becomes ready again only when it had to start a new session.
+        if self.warm_started:
+            await self.reconcile_guilds(self.shard_tracker.guilds_on(shard_id))
+
+    async def on_shard_disconnect(self, shard_id):
+        self.shard_tracker.disconnected(shard_id)
+
+    async def on_shard_resumed(self, shard_id):
+        self.shard_tracker.resumed(shard_id)
+
+    async def on_ready(self):
+        if not config.AUTO_SHARDING:
+            self.shard_tracker.ready()
+        logger.info('--------------------------------')
+        logger.info(f'Logged in as {self.user.name}')
+        logger.info(f'Bot ID: {self.user.id}')
+        logger.info('--------------------------------')
+
+        # on_ready fires again after every reconnect that could not resume the session.
+        # With AUTO_SHARDING the shard's own on_shard_ready reconciles it, so only do it here without.
+        if self.warm_started:
+            if not config.AUTO_SHARDING:
+                await self.reconcile_guilds(self.guilds)
+            return
+        self.warm_started = True
+
+        self.build_rank_indexes()
+        # Background jobs start only once the database and in-memory indexes are ready.
+        await self.scheduler.start()
+        # Delivers notifications committed with economy changes, including any left over from before a restart.
+        self.outbox.start()
+
+        # Seed the invite index once; invite events and the join worker keep it current afterwards.
+        for guild in self.guilds:
+            await self.invite_tracker.refresh(guild)
+
+        log_cache_memory_report(self)
+
+    async def reconcile_guilds(self, guilds):
+        """
+        Catches up on what may have changed while the gateway connection was down: members who
+        joined, left or changed roles, and invites created or deleted. Everything else is the
+        bot's own data and is still current in memory.
+        """
+        for guild in guilds:
+            if guild.id == config.SERVER_ID:
+                changed = self.eligibility.reconcile(guild)
+                logger.info(f"Reconciled leaderboard eligibility after reconnect ({changed} member(s) changed).")
+            await self.invite_tracker.refresh(guild)
+        logger.info(f"✅ Reconciled {len(guilds)} guild(s) after reconnect.")
+
+    async def log_points_transaction(self, user_id, points, purpose, write_ledger=True):
+        """`write_ledger=False` is for changes that already wrote their ledger row in their own transaction."""
         try:
             # 1. First, save the transaction to the database using the correct function.
-            await self.log_points_transaction_db(self, user_id, points, purpose)
+            if write_ledger:
+                await self.log_points_transaction_db(self, user_id, points, purpose)
+            if points > 0:
+                # Windowed leaderboards rank points earned, so spending does not lower them.
+                self.points_windows.record(str(user_id), points)
+            self.refresh_scheduler.mark_dirty("points_leaderboard", "economy")
 
-            # 2. Then, send the Discord message.
+            # 2. Then, queue the Discord log messages; they are batched and never delay the caller.
             user = self.get_user(int(user_id))
             user_mention = user.mention if user else "Unknown User"
             user_name = user.display_name if user else "Unknown User"
@@ -270,33 +398,72 @@ class MyBot(commands.Bot):
             )
             embed.set_footer(text=f"Transaction logged for {user_name}")
 
-            points_history_channel = self.get_channel(config.POINTS_HISTORY_CHANNEL_ID)
-            if points_history_channel:
-                await points_history_channel.send(embed=embed)
-            else:
-                logger.error(f"Points history channel (ID: {config.POINTS_HISTORY_CHANNEL_ID}) not found.")
+            self.log_pipeline.post(config.POINTS_HISTORY_CHANNEL_ID, embed)
 
             if "(burn)" in purpose.lower():
-                burns_channel = self.get_channel(config.BURNS_LOG_CHANNEL_ID)
-                if burns_channel:
-                    burn_embed = discord.Embed(
-                        title="🔥 Point Burn Log",
-                        description=f"A burn transaction for **{user_mention}** was logged.",
-                        color=discord.Color.dark_red()
-                    )
-                    burn_embed.add_field(name="Amount", value=f"**{sign}{points:.2f} MVpts**", inline=True)
-                    burn_embed.add_field(name="Reason", value=f"**{purpose}**", inline=True)
-                    burn_embed.set_footer(text=f"Logged by {self.user.name}")
-                    await burns_channel.send(embed=burn_embed)
-                else:
-                    logger.error(f"Bot missing permissions or burns channel ({config.BURNS_LOG_CHANNEL_ID}) not found.")
+                burn_embed = discord.Embed(
+                    title="🔥 Point Burn Log",
+                    description=f"A burn transaction for **{user_mention}** was logged.",
+                    color=discord.Color.dark_red()
+                )
+                burn_embed.add_field(name="Amount", value=f"**{sign}{points:.2f} MVpts**", inline=True)
+                burn_embed.add_field(name="Reason", value=f"**{purpose}**", inline=True)
+                burn_embed.set_footer(text=f"Logged by {self.user.name}")
+                self.log_pipeline.post(config.BURNS_LOG_CHANNEL_ID, burn_embed)
 
         except Exception as e:
             logger.error(f"An unexpected error occurred while logging a transaction: {e}", exc_info=True)
 
+    async def award_points(self, awards: dict, purpose: str, giveaway: bool = False) -> dict:
+        """
+        Credits {user_id: amount} in one database transaction and posts a single summary to the
+        points history channel. Returns the database result; its "status" is "ok", "insufficient" or "error".
+        """
+        awards = {str(user_id): float(amount) for user_id, amount in awards.items() if amount > 0}
+        if not awards:
+            return {"status": "ok", "all_time_points": {}}
+
+        result = await self.award_points_db(self, awards, purpose, giveaway)
+        if result["status"] != "ok":
+            return result
+
+        self.admin_points = result["admin_points"]
+        for user_id, all_time_points in result["all_time_points"].items():
+            self.ensure_user(user_id)
+            self.users_points[user_id]["all_time_points"] = all_time_points
+            self.users_points[user_id]["available_points"] += awards[user_id]
+            self.points_rank.set_score(user_id, all_time_points)
+            self.points_windows.record(user_id, awards[user_id])
+        self.refresh_scheduler.mark_dirty("points_leaderboard", "economy")
+        if giveaway:
+            self.refresh_scheduler.mark_dirty("giveaway_hall_of_fame")
+
+        try:
+            total = sum(awards.values())
+            lines = [f"<@{user_id}> **+{amount:.2f}**" for user_id, amount in awards.items()]
+
+            embed = discord.Embed(
+                title="🎉 Points Credited",
+                description=f"**{len(awards)}** member(s) received **{total:,.2f} MVpts** for **{purpose}**.",
+                color=discord.Color.green(),
+                timestamp=datetime.now(UTC)
+            )
+            embed.add_field(name="Recipients", value=join_within_limit(lines), inline=False)
+            embed.set_footer(text="Bulk transaction logged")
+
+            self.log_pipeline.post(config.POINTS_HISTORY_CHANNEL_ID, embed)
+        except Exception as e:
+            logger.error(f"An unexpected error occurred while announcing a bulk award: {e}", exc_info=True)
+        return result
+
     async def on_logout(self):
         logger.info("Bot is logging out, saving all data...")
+        await self.xp_accumulator.flush()
+        await self.points_windows.flush()
+        await self.xp_windows.flush()
         await self.save_all_data_to_db()
+        await self.command_audit.close()
+        await self.log_pipeline.close()
         logger.info("✅ All data saved on logout.")
 
 
@@ -0,0 +1,99 @@
+import sys
+import types
+from itertools import islice
+
+import discord
+from discord.state import ConnectionState
+
+from logger import bot_logger as logger
+
+# Caches are measured on a sample and extrapolated, so the report stays cheap in big guilds.
+SAMPLE_SIZE = 500
+
+
+def deep_sizeof(obj, seen=None, sample: int = None) -> int:
+    """
+    Approximate memory held by `obj` and everything it owns.
+
+    Other Discord models (anything holding the connection state), the client itself and
+    callables are shared with the rest of the process, so they are not followed. With `sample`,
+    containers larger than it are measured on their first `sample` items and extrapolated, and
+    nested containers on a tenth of that.
+    """
+    if seen is None:
+        seen = set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+
+    if isinstance(obj, (str, bytes, int, float, bool, type(None))):
+        return size
+    nested = None if sample is None else max(sample // 10, 10)
+    if isinstance(obj, dict):
+        return size + _extrapolate(obj.items(), len(obj), sample,
+                                   lambda item: deep_sizeof(item[0], seen, nested) + deep_sizeof(item[1], seen, nested))
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        return size + _extrapolate(obj, len(obj), sample, lambda item: deep_sizeof(item, seen, nested))
+
+    attributes = []
+    if hasattr(obj, "__dict__"):
+        attributes.extend(vars(obj).values())
+    for cls in type(obj).__mro__:
+        for slot in getattr(cls, "__slots__", ()):
+            if hasattr(obj, slot):
+                attributes.append(getattr(obj, slot))
+    for value in attributes:
+        if _is_shared(value):
+            continue
+        size += deep_sizeof(value, seen, sample)
+    return size
+
+
+def _extrapolate(items, count: int, sample, measure) -> int:
+    if sample is None or count <= sample:
+        return sum(measure(item) for item in items)
+    return int(sum(measure(item) for item in islice(items, sample)) / sample * count)
+
+
+def _is_shared(value) -> bool:
+    return (isinstance(value, (discord.Client, ConnectionState, types.ModuleType, type))
+            or callable(value)
+            or hasattr(value, "_state"))
+
+
+def _sampled_size(objects) -> int:
+    objects = list(objects)
+    if not objects:
+        return 0
+    sample = objects[:SAMPLE_SIZE]
+    return int(sum(deep_sizeof(obj) for obj in sample) / len(sample) * len(objects))
+
+
+def cache_memory_report(bot) -> list:
+    """Returns (cache name, entry count, approximate bytes) for the Discord caches and the bot's own caches."""
+    members = [member for guild in bot.guilds for member in guild.members]
+    report = [
+        ("Members", len(members), _sampled_size(members)),
+        ("Users", len(bot.users), _sampled_size(bot.users)),
+        ("Messages", len(bot.cached_messages), _sampled_size(bot.cached_messages)),
+    ]
+    for name, cache in (
+        ("Points balances", bot.users_points),
+        ("XP", bot.user_xp),
+        ("Referrals", bot.referral_data),
+        ("Points ranking", bot.points_rank),
+        ("XP ranking", bot.xp_rank),
+        ("Leaderboard eligibility", bot.eligibility),
+        ("Invite index", bot.invite_tracker.invites),
+    ):
+        count = len(cache) if hasattr(cache, "__len__") else len(getattr(cache, "member_ids", ()))
+        report.append((name, count, deep_sizeof(cache, sample=SAMPLE_SIZE)))
+    return report
+
+
+def log_cache_memory_report(bot):
+    report = cache_memory_report(bot)
+    lines = [f"  {name}: {count:,} entries, ~{size / 1024 / 1024:.2f} MB" for name, count, size in report]
+    total = sum(size for _, _, size in report)
+    logger.info(f"🧠 Cache memory report (~{total / 1024 / 1024:.2f} MB total):\n" + "\n".join(lines))
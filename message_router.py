@@ -0,0 +1,86 @@
+import time
+
+from logger import bot_logger as logger
+
+
+class Stage:
+    """A single on_message pipeline stage and its timing statistics."""
+
+    def __init__(self, name, handler, channels=None, exclude_channels=None, predicate=None, cost=0):
+        self.name = name
+        self.handler = handler
+        self.channels = set(channels) if channels else None
+        self.exclude_channels = set(exclude_channels or ())
+        self.predicate = predicate
+        self.cost = cost
+        self.calls = 0
+        self.failures = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def applies_to_channel(self, channel_id) -> bool:
+        if channel_id in self.exclude_channels:
+            return False
+        return self.channels is None or channel_id in self.channels
+
+    def record(self, duration_ms: float):
+        self.calls += 1
+        self.total_ms += duration_ms
+        self.max_ms = max(self.max_ms, duration_ms)
+
+
+class MessageRouter:
+    """
+    Routes each message only through the stages registered for its channel, cheapest first.
+
+    A stage handler is an async callable taking the message and returning True when it has
+    fully handled the message, which stops the remaining stages from running.
+    """
+
+    def __init__(self):
+        self.stages = []
+        self._routes = {}
+
+    def register(self, name, handler, *, channels=None, exclude_channels=None, predicate=None, cost=0):
+        self.stages.append(Stage(name, handler, channels, exclude_channels, predicate, cost))
+        # Stable sort keeps registration order between stages of equal cost.
+        self.stages.sort(key=lambda stage: stage.cost)
+        self._routes.clear()
+
+    def route_for(self, channel_id):
+        route = self._routes.get(channel_id)
+        if route is None:
+            route = [stage for stage in self.stages if stage.applies_to_channel(channel_id)]
+            self._routes[channel_id] = route
+        return route
+
+    async def dispatch(self, message):
+        for stage in self.route_for(message.channel.id):
+            if stage.predicate and not stage.predicate(message):
+                continue
+
+            start = time.perf_counter()
+            try:
+                handled = await stage.handler(message)
+            except Exception as e:
+                stage.failures += 1
+                logger.error(f"❌ Message stage '{stage.name}' failed: {e}", exc_info=True)
+                handled = False
+            finally:
+                stage.record((time.perf_counter() - start) * 1000)
+
+            if handled:
+                return
+
+    def stats(self):
+        return [
+            {
+                "name": stage.name,
+                "cost": stage.cost,
+                "calls": stage.calls,
+                "failures": stage.failures,
+                "avg_ms": stage.total_ms / stage.calls if stage.calls else 0.0,
+                "max_ms": stage.max_ms,
+            }
+            for stage in self.stages
+        ]
@@ -0,0 +1,97 @@
+import asyncio
+from datetime import datetime, timedelta, UTC
+
+import discord
+
+import config
+from db_executor import db_priority, BACKGROUND
+from logger import bot_logger as logger
+
+
+def notification(channel_id: int, content: str = None, embed: discord.Embed = None) -> dict:
+    """An outbox row for `commit_economy_change`."""
+    return {"channel_id": channel_id, "content": content, "embed": embed.to_dict() if embed else None}
+
+
+class OutboxDispatcher:
+    """
+    Delivers Discord notifications written to the outbox table with an economy change.
+
+    Because the rows are committed together with the change, a notification survives crashes and
+    restarts until it has been sent. Commands call `wake` after committing so delivery starts
+    right away; otherwise the outbox is polled every `OUTBOX_POLL_SECONDS`. Failed sends are
+    retried with exponential backoff, and after `OUTBOX_MAX_ATTEMPTS` a message is parked with
+    its last error instead of being retried forever.
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.sent = 0
+        self.retried = 0
+        self.parked = 0
+        self._wakeup = asyncio.Event()
+        self._worker = None
+
+    def start(self):
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run())
+
+    def stop(self):
+        if self._worker is not None:
+            self._worker.cancel()
+            self._worker = None
+
+    def wake(self):
+        self._wakeup.set()
+
+    async def _run(self):
+        db_priority.set(BACKGROUND)
+        while True:
+            try:
+                await self.drain()
+            except Exception as e:
+                logger.error(f"❌ Outbox dispatch failed: {e}", exc_info=True)
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=config.OUTBOX_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+
+    async def drain(self):
+        while True:
+            messages = await self.bot.load_due_outbox(self.bot, config.OUTBOX_BATCH_SIZE)
+            for message in messages:
+                if not await self._deliver(message):
+                    # The row is still due, so reloading now would send it again. Wait for the next poll.
+                    return
+            if len(messages) < config.OUTBOX_BATCH_SIZE:
+                return
+
+    async def _deliver(self, message: dict) -> bool:
+        """Attempts one message. Returns False if its outcome could not be recorded in the outbox."""
+        try:
+            channel = self.bot.get_channel(message["channel_id"]) or \
+                await self.bot.fetch_channel(message["channel_id"])
+            embed = discord.Embed.from_dict(message["embed"]) if message["embed"] else None
+            await channel.send(content=message["content"], embed=embed)
+        except Exception as e:
+            # Any failure (a missing channel, one that cannot take messages, a bad stored embed) goes
+            # through the same retry and parking path, so one bad row cannot block those behind it.
+            attempts = message["attempts"] + 1
+            if attempts >= config.OUTBOX_MAX_ATTEMPTS:
+                self.parked += 1
+                logger.error(f"❌ Giving up on outbox message {message['id']} for channel "
+                             f"{message['channel_id']} after {attempts} attempts: {e}")
+                return await self.bot.fail_outbox(self.bot, message["id"], str(e), None)
+            self.retried += 1
+            delay = min(config.OUTBOX_RETRY_BASE_SECONDS * 2 ** (attempts - 1), config.OUTBOX_RETRY_MAX_SECONDS)
+            return await self.bot.fail_outbox(self.bot, message["id"], str(e),
+                                              datetime.now(UTC) + timedelta(seconds=delay))
+        self.sent += 1
+        if not await self.bot.complete_outbox(self.bot, message["id"]):
+            logger.warning(f"⚠️ Outbox message {message['id']} was sent but could not be marked as delivered.")
+            return False
+        return True
+
+    def stats(self):
+        return {"sent": self.sent, "retried": self.retried, "parked": self.parked}
@@ -0,0 +1,136 @@
+from sortedcontainers import SortedList
+
+
+class RankIndex:
+    """
+    Order-statistics index of user scores, updated incrementally on every score change.
+
+    Answers rank-of-user and top-N in O(log n). Users can be hidden from the ranking
+    (bots, admins, members who left) without losing their score.
+    """
+
+    def __init__(self, is_eligible=None):
+        self._is_eligible = is_eligible
+        self._scores = {}
+        self._hidden = set()
+        self._ranked = SortedList()  # (-score, user_id), so the highest score comes first
+
+    def _is_ranked(self, user_id: str) -> bool:
+        return user_id not in self._hidden and self._scores.get(user_id, 0) > 0
+
+    def rebuild(self, scores: dict):
+        """Replaces the whole index, e.g. after loading all scores from the database."""
+        self._scores = dict(scores)
+        self._hidden = {user_id for user_id in self._scores
+                        if self._is_eligible and not self._is_eligible(user_id)}
+        self._ranked = SortedList(
+            (-score, user_id) for user_id, score in self._scores.items() if self._is_ranked(user_id)
+        )
+
+    def set_score(self, user_id: str, score):
+        if user_id not in self._scores and self._is_eligible and not self._is_eligible(user_id):
+            self._hidden.add(user_id)
+        if self._is_ranked(user_id):
+            self._ranked.remove((-self._scores[user_id], user_id))
+        self._scores[user_id] = score
+        if self._is_ranked(user_id):
+            self._ranked.add((-score, user_id))
+
+    def add(self, user_id: str, delta):
+        self.set_score(user_id, self.score_of(user_id) + delta)
+
+    def score_of(self, user_id: str):
+        return self._scores.get(user_id, 0)
+
+    def hide(self, user_id: str):
+        if self._is_ranked(user_id):
+            self._ranked.remove((-self._scores[user_id], user_id))
+        self._hidden.add(user_id)
+
+    def show(self, user_id: str):
+        if user_id not in self._hidden:
+            return
+        self._hidden.discard(user_id)
+        if self._is_ranked(user_id):
+            self._ranked.add((-self._scores[user_id], user_id))
+
+    def rank_of(self, user_id: str):
+        """Returns the user's 1-based rank, or None if they are not ranked."""
+        if not self._is_ranked(user_id):
+            return None
+        return self._ranked.index((-self._scores[user_id], user_id)) + 1
+
+    def top(self, count: int, start: int = 0):
+        """Returns up to `count` (user_id, score) pairs, starting at the 0-based position `start`."""
+        return [(user_id, -score) for score, user_id in self._ranked.islice(start, start + count)]
+
+    def __len__(self):
+        return len(self._ranked)
+
+
+class MemberEligibility:
+    """
+    Cached leaderboard eligibility for guild members, built once and kept current from member events.
+
+    Excluded members (bots, admins, mods) and members who are not in the guild are hidden from
+    every registered rank index, so eligibility filtering is an O(1) set lookup.
+    """
+
+    def __init__(self, excluded_role_ids, indexes=()):
+        self.excluded_role_ids = set(excluded_role_ids)
+        self.indexes = list(indexes)
+        self.member_ids = set()
+        self.excluded_ids = set()
+
+    def _is_excluded(self, member) -> bool:
+        return member.bot or any(role.id in self.excluded_role_ids for role in member.roles)
+
+    def build(self, guild):
+        self.member_ids = {str(member.id) for member in guild.members}
+        self.excluded_ids = {str(member.id) for member in guild.members if self._is_excluded(member)}
+
+    def reconcile(self, guild):
+        """
+        Rebuilds membership from the guild after a reconnect, when join, leave and role events may
+        have been missed, and shows or hides only the members whose eligibility changed.
+        """
+        previously_eligible = self.member_ids - self.excluded_ids
+        self.build(guild)
+        now_eligible = self.member_ids - self.excluded_ids
+        for user_id in previously_eligible - now_eligible:
+            for index in self.indexes:
+                index.hide(user_id)
+        for user_id in now_eligible - previously_eligible:
+            for index in self.indexes:
+                index.show(user_id)
+        return len(previously_eligible ^ now_eligible)
+
+    def is_eligible(self, user_id: str) -> bool:
+        return user_id in self.member_ids and user_id not in self.excluded_ids
+
+    def update(self, member):
+        """Called when a member joins or their roles change."""
+        user_id = str(member.id)
+        was_eligible = self.is_eligible(user_id)
+        self.member_ids.add(user_id)
+        if self._is_excluded(member):
+            self.excluded_ids.add(user_id)
+        else:
+            self.excluded_ids.discard(user_id)
+        self._sync_indexes(user_id, was_eligible)
+
+    def remove(self, user_id: str):
+        """Called when a member leaves the guild."""
+        was_eligible = self.is_eligible(user_id)
+        self.member_ids.discard(user_id)
+        self.excluded_ids.discard(user_id)
+        self._sync_indexes(user_id, was_eligible)
+
+    def _sync_indexes(self, user_id: str, was_eligible: bool):
+        if self.is_eligible(user_id) == was_eligible:
+            return
+        for index in self.indexes:
+            if was_eligible:
+                index.hide(user_id)
+            else:
+                index.show(user_id)
@@ -0,0 +1,46 @@
+from ranking import RankIndex
+
+
+class ReferralIndex:
+    """
+    Referral relationships indexed both ways, with per-referrer counts kept in a rank index.
+
+    Listing a referrer's referees and reading the referral leaderboard cost O(k) in the size
+    of the answer instead of a scan over every recorded referral.
+    """
+
+    def __init__(self, is_eligible=None):
+        self.referrer_of = {}
+        self._referees = {}
+        self.counts = RankIndex(is_eligible)
+
+    def rebuild(self, referral_data: dict):
+        """Replaces the whole index from the referral_data table (referee -> referrer)."""
+        self.referrer_of = {}
+        self._referees = {}
+        for user_id, referrer_id in referral_data.items():
+            self._link(user_id, referrer_id)
+        self.counts.rebuild({referrer_id: len(referees) for referrer_id, referees in self._referees.items()})
+
+    def _link(self, user_id: str, referrer_id: str) -> bool:
+        # Self-referrals never count towards the leaderboard.
+        if user_id == referrer_id or self.referrer_of.get(user_id) == referrer_id:
+            return False
+        previous = self.referrer_of.get(user_id)
+        if previous is not None:
+            self._referees[previous].remove(user_id)
+            self.counts.add(previous, -1)
+        self.referrer_of[user_id] = referrer_id
+        self._referees.setdefault(referrer_id, []).append(user_id)
+        return True
+
+    def record(self, user_id: str, referrer_id: str):
+        """Called when a referral is completed."""
+        if self._link(user_id, referrer_id):
+            self.counts.add(referrer_id, 1)
+
+    def referees_of(self, referrer_id: str):
+        return list(self._referees.get(referrer_id, ()))
+
+    def count_of(self, referrer_id: str) -> int:
+        return self.counts.score_of(referrer_id)
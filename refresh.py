@@ -0,0 +1,86 @@
+import asyncio
+import time
+
+from db_executor import db_priority, BACKGROUND
+from logger import bot_logger as logger
+
+
+class Board:
+    """A live board (leaderboard or economy message) and its refresh statistics."""
+
+    def __init__(self, name, refresh, min_interval):
+        self.name = name
+        self.refresh = refresh
+        self.min_interval = min_interval
+        self.dirty = False
+        self.task = None
+        self.last_run = 0.0
+        self.requests = 0
+        self.refreshes = 0
+        self.coalesced = 0
+        self.failures = 0
+
+
+class RefreshScheduler:
+    """
+    Refreshes live boards when the data behind them changes, at most once per board every
+    `min_interval` seconds.
+
+    Changes that arrive while a refresh is already pending are coalesced into it, and a board
+    with no changes is never refreshed.
+    """
+
+    def __init__(self, min_interval: float):
+        self.min_interval = min_interval
+        self.boards = {}
+
+    def register(self, name, refresh, min_interval=None):
+        """`refresh` is an async callable taking no arguments."""
+        self.boards[name] = Board(name, refresh, self.min_interval if min_interval is None else min_interval)
+
+    def unregister_all(self):
+        for board in self.boards.values():
+            if board.task and not board.task.done():
+                board.task.cancel()
+        self.boards.clear()
+
+    def mark_dirty(self, *names):
+        for name in names:
+            board = self.boards.get(name)
+            if board is None:
+                continue
+            board.requests += 1
+            if board.dirty:
+                board.coalesced += 1
+                continue
+            board.dirty = True
+            if board.task is None or board.task.done():
+                board.task = asyncio.create_task(self._run(board))
+
+    async def _run(self, board: Board):
+        db_priority.set(BACKGROUND)
+        # Changes made while a refresh is running mark the board dirty again, so loop until it is clean.
+        while board.dirty:
+            wait = board.last_run + board.min_interval - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            board.dirty = False
+            board.last_run = time.monotonic()
+            try:
+                await board.refresh()
+                board.refreshes += 1
+            except Exception as e:
+                board.failures += 1
+                logger.error(f"❌ Refresh of '{board.name}' failed: {e}", exc_info=True)
+
+    def stats(self):
+        return [
+            {
+                "name": board.name,
+                "requests": board.requests,
+                "refreshes": board.refreshes,
+                "coalesced": board.coalesced,
+                "failures": board.failures,
+            }
+            for board in self.boards.values()
+        ]
@@ -0,0 +1,181 @@
+import asyncio
+import random
+import time
+from datetime import datetime, timedelta, UTC
+
+from db_executor import db_priority, BACKGROUND
+from logger import bot_logger as logger
+
+
+class Job:
+    """A recurring job and its run statistics."""
+
+    def __init__(self, name, func, interval: timedelta, jitter_seconds=0, persistent=True):
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.jitter_seconds = jitter_seconds
+        self.persistent = persistent
+        self.next_run = None  # Schedule anchor; stored in the database for persistent jobs
+        self.due = None       # Anchor plus this run's jitter
+        self.running = False
+        self.last_run = None
+        self.last_duration_ms = None
+        self.max_duration_ms = 0.0
+        self.runs = 0
+        self.failures = 0
+        self.last_error = None
+
+    def schedule(self, next_run: datetime):
+        self.next_run = next_run
+        self.due = next_run + timedelta(seconds=random.uniform(0, self.jitter_seconds))
+
+    def advance(self, now: datetime):
+        """Moves the anchor forward by whole intervals, so the cadence does not drift with run times."""
+        next_run = self.next_run
+        while next_run <= now:
+            next_run += self.interval
+        self.schedule(next_run)
+
+    def state(self) -> dict:
+        return {
+            "name": self.name,
+            "next_run": self.next_run,
+            "last_run": self.last_run,
+            "last_duration_ms": self.last_duration_ms,
+            "runs": self.runs,
+            "failures": self.failures,
+            "last_error": self.last_error,
+        }
+
+
+class Scheduler:
+    """
+    Runs every background job from one loop.
+
+    Next-run times of persistent jobs are stored in the database, so weekly jobs keep their
+    schedule across restarts, and a run missed while the bot was down is caught up once.
+    Start times are spread with per-job jitter and at most `max_concurrency` jobs run at once.
+    """
+
+    def __init__(self, bot, max_concurrency: int):
+        self.bot = bot
+        self.jobs = {}
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._wakeup = asyncio.Event()
+        self._runner = None
+        self._running_tasks = set()
+        self._retired = {}
+
+    def register(self, name, func, *, seconds=0, minutes=0, hours=0, jitter_seconds=0, persistent=True):
+        """`func` is an async callable taking no arguments."""
+        job = Job(name, func, timedelta(seconds=seconds, minutes=minutes, hours=hours), jitter_seconds, persistent)
+        previous = self._retired.pop(name, None)
+        if previous is not None:
+            # Re-registered after a cog reload: keep the schedule and statistics.
+            for attribute in ("next_run", "due", "last_run", "last_duration_ms", "max_duration_ms", "runs",
+                              "failures", "last_error"):
+                setattr(job, attribute, getattr(previous, attribute))
+        elif self._runner is not None:
+            job.schedule(datetime.now(UTC))
+        self.jobs[name] = job
+        self._wakeup.set()
+
+    def unregister_all(self):
+        self._retired.update(self.jobs)
+        self.jobs.clear()
+        self._wakeup.set()
+
+    async def start(self):
+        """Loads persisted schedules and starts the run loop. Calling it again while running does nothing."""
+        if self._runner is not None and not self._runner.done():
+            return
+
+        saved = await self.bot.load_scheduled_jobs(self.bot)
+        now = datetime.now(UTC)
+        for job in self.jobs.values():
+            state = saved.get(job.name) if job.persistent else None
+            if not state or state.get("next_run") is None:
+                # Never run before: run soon, spread out by jitter.
+                job.schedule(now)
+                continue
+
+            job.runs = state.get("runs") or 0
+            job.failures = state.get("failures") or 0
+            job.last_run = state.get("last_run")
+            job.last_duration_ms = state.get("last_duration_ms")
+            job.last_error = state.get("last_error")
+            if state["next_run"] <= now:
+                # Runs missed while the bot was down are caught up once, not once per missed interval.
+                logger.info(f"⏰ Job '{job.name}' missed its run at {state['next_run']:%Y-%m-%d %H:%M} UTC. "
+                            f"Catching up.")
+                job.next_run = state["next_run"]
+                job.due = now + timedelta(seconds=random.uniform(0, job.jitter_seconds))
+            else:
+                job.schedule(state["next_run"])
+
+        self._runner = asyncio.create_task(self._run_loop())
+        logger.info(f"✅ Scheduler started with {len(self.jobs)} job(s).")
+
+    def stop(self):
+        if self._runner is not None:
+            self._runner.cancel()
+            self._runner = None
+
+    async def _run_loop(self):
+        while True:
+            now = datetime.now(UTC)
+            for job in list(self.jobs.values()):
+                if job.due is not None and job.due <= now and not job.running:
+                    job.running = True
+                    task = asyncio.create_task(self._run_job(job))
+                    self._running_tasks.add(task)
+                    task.add_done_callback(self._running_tasks.discard)
+
+            upcoming = [job.due for job in self.jobs.values() if job.due is not None and not job.running]
+            timeout = max((min(upcoming) - now).total_seconds(), 0.0) if upcoming else None
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _run_job(self, job: Job):
+        # Each job runs in its own task, so this only lowers the priority of this job's database calls.
+        db_priority.set(BACKGROUND)
+        try:
+            async with self._semaphore:
+                start = time.perf_counter()
+                job.last_run = datetime.now(UTC)
+                try:
+                    await job.func()
+                    job.last_error = None
+                except Exception as e:
+                    job.failures += 1
+                    job.last_error = str(e)[:500]
+                    logger.error(f"❌ Scheduled job '{job.name}' failed: {e}", exc_info=True)
+                finally:
+                    job.runs += 1
+                    job.last_duration_ms = (time.perf_counter() - start) * 1000
+                    job.max_duration_ms = max(job.max_duration_ms, job.last_duration_ms)
+
+            job.advance(datetime.now(UTC))
+            if job.persistent:
+                await self.bot.save_scheduled_job(self.bot, job.state())
+        finally:
+            job.running = False
+            self._wakeup.set()
+
+    def stats(self):
+        return [
+            {
+                "name": job.name,
+                "runs": job.runs,
+                "failures": job.failures,
+                "last_duration_ms": job.last_duration_ms,
+                "max_duration_ms": job.max_duration_ms,
+                "next_run": job.due,
+                "last_error": job.last_error,
+            }
+            for job in self.jobs.values()
+        ]
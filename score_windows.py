@@ -0,0 +1,110 @@
+from datetime import datetime, timedelta, UTC
+
+import config
+from logger import bot_logger as logger
+from ranking import RankIndex
+
+
+def _today():
+    return datetime.now(UTC).date()
+
+
+class ScoreWindows:
+    """
+    Daily score buckets for one metric ("points" or "xp"), with a rank index per rolling window.
+
+    Every recorded amount is added to today's bucket and to each window's index. When the day
+    changes, the buckets that fall out of a window are subtracted from it, so windowed rankings
+    never rescan history. New bucket amounts are buffered and written as batched upserts.
+    """
+
+    def __init__(self, bot, metric: str, is_eligible=None):
+        self.bot = bot
+        self.metric = metric
+        self.windows = dict(config.LEADERBOARD_WINDOWS)
+        self.indexes = {name: RankIndex(is_eligible) for name in self.windows}
+        self.retention_days = max(self.windows.values())
+        self.buckets = {}
+        self.pending = {}
+        self.today = None
+        self._pruned_on = None
+
+    def index(self, window: str) -> RankIndex:
+        self.roll_to(_today())
+        return self.indexes[window]
+
+    def record(self, user_id: str, amount, today=None):
+        today = today or _today()
+        self.roll_to(today)
+        for buckets in (self.buckets, self.pending):
+            scores = buckets.setdefault(today, {})
+            scores[user_id] = scores.get(user_id, 0) + amount
+        for index in self.indexes.values():
+            index.add(user_id, amount)
+
+    def roll_to(self, today):
+        """Moves every window forward to `today`, subtracting the buckets that left each window."""
+        if self.today is None:
+            self.today = today
+            return
+        if today <= self.today:
+            return
+        for name, days in self.windows.items():
+            index = self.indexes[name]
+            for day, scores in self.buckets.items():
+                if (self.today - day).days < days <= (today - day).days:
+                    for user_id, amount in scores.items():
+                        # Rounding keeps float residue from leaving users ranked on a zero score.
+                        index.set_score(user_id, round(index.score_of(user_id) - amount, 6))
+        self.today = today
+        self.buckets = {day: scores for day, scores in self.buckets.items()
+                        if (today - day).days < self.retention_days}
+
+    def rebuild(self, buckets: dict, today=None):
+        """Replaces all buckets and recomputes each window's index from them."""
+        self.today = today or _today()
+        self.buckets = {day: dict(scores) for day, scores in buckets.items()
+                        if (self.today - day).days < self.retention_days}
+        for name, days in self.windows.items():
+            totals = {}
+            for day, scores in self.buckets.items():
+                if (self.today - day).days < days:
+                    for user_id, amount in scores.items():
+                        totals[user_id] = totals.get(user_id, 0) + amount
+            self.indexes[name].rebuild(totals)
+
+    def reindex(self):
+        """Recomputes each window's index from the current buckets, e.g. once member eligibility is known."""
+        self.rebuild(self.buckets, self.today)
+
+    async def load(self):
+        """Loads the retained buckets from the database, keeping amounts not flushed yet."""
+        today = _today()
+        since = today - timedelta(days=self.retention_days - 1)
+        buckets = await self.bot.load_score_buckets(self.bot, self.metric, since)
+        for day, scores in self.pending.items():
+            merged = buckets.setdefault(day, {})
+            for user_id, amount in scores.items():
+                merged[user_id] = merged.get(user_id, 0) + amount
+        self.rebuild(buckets, today)
+        logger.info(f"✅ Loaded {len(self.buckets)} daily '{self.metric}' bucket(s) for windowed leaderboards.")
+
+    async def flush(self) -> int:
+        """Writes pending bucket amounts in one batch. Returns the number of bucket rows written."""
+        if not self.pending:
+            return 0
+        pending, self.pending = self.pending, {}
+        if not await self.bot.increment_score_buckets(self.bot, self.metric, pending):
+            for day, scores in pending.items():
+                merged = self.pending.setdefault(day, {})
+                for user_id, amount in scores.items():
+                    merged[user_id] = merged.get(user_id, 0) + amount
+            logger.warning(f"⚠️ '{self.metric}' bucket flush failed. It will be retried on the next flush.")
+            return 0
+
+        today = _today()
+        if self._pruned_on != today:
+            await self.bot.prune_score_buckets(self.bot, self.metric,
+                                               today - timedelta(days=self.retention_days - 1))
+            self._pruned_on = today
+        return sum(len(scores) for scores in pending.values())
@@ -0,0 +1,138 @@
+import math
+from datetime import datetime, UTC
+
+import discord
+
+from logger import bot_logger as logger
+
+
+class ShardState:
+    """Connection state and counters for one gateway shard."""
+
+    def __init__(self, shard_id: int):
+        self.shard_id = shard_id
+        self.connected = False
+        self.ready = False
+        self.connects = 0
+        self.disconnects = 0
+        self.resumes = 0
+        self.last_ready = None
+
+
+class ShardTracker:
+    """
+    Per-shard readiness and latency.
+
+    With `AUTO_SHARDING` off the bot runs a single connection, tracked as shard 0. All shards
+    share one process and event loop, so the bot's in-memory state needs no locking; anything
+    per guild (the invite index, join workers) is keyed by guild ID, whichever shard delivers it.
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.shards = {}
+
+    def _shard(self, shard_id) -> ShardState:
+        shard_id = shard_id or 0
+        state = self.shards.get(shard_id)
+        if state is None:
+            state = self.shards[shard_id] = ShardState(shard_id)
+        return state
+
+    def connected(self, shard_id=None):
+        state = self._shard(shard_id)
+        state.connected = True
+        state.connects += 1
+
+    def ready(self, shard_id=None):
+        state = self._shard(shard_id)
+        state.connected = True
+        state.ready = True
+        state.last_ready = datetime.now(UTC)
+        logger.info(f"✅ Shard {state.shard_id} is ready ({len(self.guilds_on(state.shard_id))} guild(s)).")
+
+    def disconnected(self, shard_id=None):
+        state = self._shard(shard_id)
+        state.connected = False
+        state.ready = False
+        state.disconnects += 1
+        logger.warning(f"⚠️ Shard {state.shard_id} disconnected.")
+
+    def resumed(self, shard_id=None):
+        state = self._shard(shard_id)
+        state.connected = True
+        state.ready = True
+        state.resumes += 1
+        logger.info(f"Shard {state.shard_id} resumed its session.")
+
+    def guilds_on(self, shard_id: int):
+        return [guild for guild in self.bot.guilds if (guild.shard_id or 0) == shard_id]
+
+    def latencies(self) -> dict:
+        """Heartbeat latency in seconds per shard, or None while a shard has not measured one yet."""
+        if isinstance(self.bot, discord.AutoShardedClient):
+            latencies = dict(self.bot.latencies)
+        else:
+            latencies = {0: self.bot.latency}
+        return {shard_id: None if latency is None or math.isinf(latency) or math.isnan(latency) else latency
+                for shard_id, latency in latencies.items()}
+
+    def stats(self):
+        latencies = self.latencies()
+        return [
+            {
+                "shard_id": shard_id,
+                "ready": state.ready,
+                "connected": state.connected,
+                "guilds": len(self.guilds_on(shard_id)),
+                "latency_ms": latencies[shard_id] * 1000 if latencies.get(shard_id) is not None else None,
+                "connects": state.connects,
+                "disconnects": state.disconnects,
+                "resumes": state.resumes,
+                "last_ready": state.last_ready,
+            }
+            for shard_id, state in sorted(self.shards.items())
+        ]
+
+
+def simulate_gateway(tracker: ShardTracker):
+    """
+    Replays a local stand-in for the gateway against `tracker`: two shards connect and become
+    ready, shard 1 drops and resumes, then shard 0 drops and has to start a new session.
+    Raises AssertionError if the tracked state does not follow.
+    """
+    for shard_id in (0, 1):
+        tracker.connected(shard_id)
+        tracker.ready(shard_id)
+    assert all(state.ready and state.connected for state in tracker.shards.values())
+
+    tracker.disconnected(1)
+    assert not tracker.shards[1].connected and not tracker.shards[1].ready
+    assert tracker.shards[0].ready, "a disconnect on one shard must not affect the other"
+    tracker.connected(1)
+    tracker.resumed(1)
+    assert tracker.shards[1].ready and tracker.shards[1].resumes == 1
+
+    tracker.disconnected(0)
+    tracker.connected(0)
+    tracker.ready(0)
+    assert tracker.shards[0].ready and tracker.shards[0].connects == 2 and tracker.shards[0].resumes == 0
+
+    stats = {row["shard_id"]: row for row in tracker.stats()}
+    assert [row["shard_id"] for row in tracker.stats()] == [0, 1]
+    assert stats[0]["guilds"] == stats[1]["guilds"] == 1
+    assert stats[0]["disconnects"] == stats[1]["disconnects"] == 1
+    return stats
+
+
+if __name__ == "__main__":
+    from types import SimpleNamespace
+
+    stand_in_bot = SimpleNamespace(
+        guilds=[SimpleNamespace(id=10, shard_id=0), SimpleNamespace(id=11, shard_id=1)],
+        latency=0.05,
+    )
+    for shard_id, row in simulate_gateway(ShardTracker(stand_in_bot)).items():
+        print(f"Shard {shard_id}: ready={row['ready']} connects={row['connects']} "
+              f"disconnects={row['disconnects']} resumes={row['resumes']} guilds={row['guilds']}")
+    print("Gateway stand-in: all shard transitions tracked.")
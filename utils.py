@@ -22,3 +22,18 @@ def normalize_url(url: str) -> str:
 
     normalized = urlunparse((parsed.scheme, netloc, path, '', '', ''))
     return normalized.lower()
+
+
+def join_within_limit(lines, separator: str = "\n", limit: int = 1024) -> str:
+    """Joins lines for an embed field, ending with "...and N more" if they would not fit in `limit` characters."""
+    shown = []
+    length = 0
+    for index, line in enumerate(lines):
+        hidden_after = len(lines) - index - 1
+        reserve = len(separator) + len(f"...and {hidden_after} more") if hidden_after else 0
+        if length + len(separator) + len(line) + reserve > limit:
+            shown.append(f"...and {hidden_after + 1} more")
+            break
+        shown.append(line)
+        length += len(separator) + len(line)
+    return separator.join(shown)
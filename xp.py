@@ -0,0 +1,52 @@
+import asyncio
+
+from logger import bot_logger as logger
+
+
+class XPAccumulator:
+    """
+    Buffers XP earned from messages in memory and flushes the aggregated deltas
+    to the database as batched server-side increments.
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.pending = {}
+        self.in_flight = {}
+        self._flush_lock = asyncio.Lock()
+
+    def add(self, user_id: str, amount: int):
+        self.pending[user_id] = self.pending.get(user_id, 0) + amount
+
+    def pending_for(self, user_id: str) -> int:
+        """XP earned by a user that has not been written to the database yet."""
+        return self.pending.get(user_id, 0) + self.in_flight.get(user_id, 0)
+
+    async def flush(self) -> int:
+        """Writes all pending XP in one batch. Returns the number of users flushed."""
+        async with self._flush_lock:
+            if not self.pending:
+                return 0
+
+            self.in_flight, self.pending = self.pending, {}
+            try:
+                flushed = await self.bot.increment_json_field(self.bot, "user_xp", "xp", self.in_flight)
+            except Exception as e:
+                logger.error(f"❌ XP flush raised an unexpected error: {e}", exc_info=True)
+                flushed = False
+
+            if not flushed:
+                # Keep the deltas so the next flush retries them.
+                for user_id, amount in self.in_flight.items():
+                    self.add(user_id, amount)
+                self.in_flight = {}
+                logger.warning("⚠️ XP flush failed. Pending XP will be retried on the next flush.")
+                return 0
+
+            for user_id, amount in self.in_flight.items():
+                self.bot.user_xp.setdefault(user_id, {"xp": 0})
+                self.bot.user_xp[user_id]["xp"] = self.bot.user_xp[user_id].get("xp", 0) + amount
+
+            count = len(self.in_flight)
+            self.in_flight = {}
+            return count